@@ -0,0 +1,60 @@
+"""
+Учебный календарь: номер и четность недели
+
+Правило то же, что в приложении (WeekCalculator.kt): неделя 1 - неделя, в которую
+попадает 1 сентября; недели с нечетным номером - нечетные (week_parity = 'odd').
+"""
+from datetime import date, datetime, timedelta
+from typing import Tuple, Union
+
+ACADEMIC_YEAR_START_MONTH = 9
+ACADEMIC_YEAR_START_DAY = 1
+# Второй (весенний) семестр начинается 1 февраля
+SPRING_SEMESTER_START_MONTH = 2
+
+
+def _as_date(value: Union[date, datetime]) -> date:
+    return value.date() if isinstance(value, datetime) else value
+
+
+def academic_year_start(value: Union[date, datetime]) -> date:
+    """1 сентября учебного года, к которому относится дата"""
+    value = _as_date(value)
+    start = date(value.year, ACADEMIC_YEAR_START_MONTH, ACADEMIC_YEAR_START_DAY)
+    if value < start:
+        start = date(value.year - 1, ACADEMIC_YEAR_START_MONTH, ACADEMIC_YEAR_START_DAY)
+    return start
+
+
+def week_number(value: Union[date, datetime]) -> int:
+    """Номер учебной недели (с 1), недели начинаются с понедельника"""
+    value = _as_date(value)
+    start = academic_year_start(value)
+    start_monday = start - timedelta(days=start.weekday())
+    current_monday = value - timedelta(days=value.weekday())
+    return max(1, (current_monday - start_monday).days // 7 + 1)
+
+
+def week_parity(value: Union[date, datetime]) -> str:
+    """Четность недели: 'odd' или 'even'"""
+    return 'odd' if week_number(value) % 2 == 1 else 'even'
+
+
+def lesson_occurs(lesson_parity, value: Union[date, datetime]) -> bool:
+    """Проходит ли занятие с указанной четностью в неделю даты"""
+    return lesson_parity in (None, '', 'both') or lesson_parity == week_parity(value)
+
+
+def semester_bounds(value: Union[date, datetime]) -> Tuple[str, date, date]:
+    """
+    Семестр, к которому относится дата
+
+    Returns:
+        (ключ "ГГГГ_N", где ГГГГ - год начала учебного года, первый день, последний день)
+    """
+    start = academic_year_start(value)
+    spring = date(start.year + 1, SPRING_SEMESTER_START_MONTH, 1)
+    if _as_date(value) < spring:
+        return f"{start.year}_1", start, spring - timedelta(days=1)
+    next_year = date(start.year + 1, ACADEMIC_YEAR_START_MONTH, ACADEMIC_YEAR_START_DAY)
+    return f"{start.year}_2", spring, next_year - timedelta(days=1)
@@ -0,0 +1,202 @@
+"""
+Кэш ответов AI ассистента
+
+- LRU с ограничением размера и временем жизни записей, потокобезопасный
+- single-flight: одинаковые вопросы, пришедшие одновременно, ждут один вызов LLM
+- необязательный второй уровень на диске (SQLite), переживает перезапуск сервера
+"""
+import os
+import time
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Tuple
+
+
+class _Flight:
+    """Вычисление ответа, которое ждут несколько запросов"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value: Optional[str] = None
+        self.error: Optional[BaseException] = None
+
+    def wait(self, timeout: Optional[float] = None) -> str:
+        if not self.done.wait(timeout):
+            raise TimeoutError("Не дождались ответа на такой же запрос")
+        if self.error is not None:
+            raise self.error
+        return self.value
+
+
+class ResponseCache:
+    """LRU+TTL кэш ответов с single-flight и дисковым уровнем"""
+
+    def __init__(self, max_entries: int = 500, ttl: float = 3600, disk_path: Optional[str] = None):
+        """
+        Args:
+            max_entries: Максимум записей в памяти
+            ttl: Время жизни записи, секунд
+            disk_path: Путь к файлу SQLite для второго уровня (None - только память)
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._flights: Dict[str, _Flight] = {}
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'disk_hits': 0, 'misses': 0, 'deduplicated': 0, 'evictions': 0}
+
+        self._disk = None
+        self._disk_lock = threading.Lock()
+        if disk_path:
+            self._disk = sqlite3.connect(disk_path, check_same_thread=False)
+            self._disk.execute("""
+                CREATE TABLE IF NOT EXISTS ai_cache (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    expires_at REAL NOT NULL
+                )
+            """)
+            self._disk.execute("DELETE FROM ai_cache WHERE expires_at < ?", (time.time(),))
+            self._disk.commit()
+
+    def _disk_get(self, key: str) -> Optional[Tuple[str, float]]:
+        if self._disk is None:
+            return None
+        with self._disk_lock:
+            row = self._disk.execute(
+                "SELECT value, expires_at FROM ai_cache WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None or row[1] < time.time():
+            return None
+        return row
+
+    def _disk_set(self, key: str, value: str, expires_at: float):
+        if self._disk is None:
+            return
+        with self._disk_lock:
+            self._disk.execute(
+                "INSERT OR REPLACE INTO ai_cache (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, value, expires_at)
+            )
+            self._disk.commit()
+
+    def _put(self, key: str, value: str, expires_at: float):
+        """Кладет запись в память (под self._lock), вытесняя самые давние"""
+        self._entries[key] = (value, expires_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._stats['evictions'] += 1
+
+    def get(self, key: str) -> Optional[str]:
+        """Ответ из кэша или None"""
+        return self._lookup(key, count=True)
+
+    def _lookup(self, key: str, count: bool) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[1] >= now:
+                    self._entries.move_to_end(key)
+                    if count:
+                        self._stats['hits'] += 1
+                    return entry[0]
+                del self._entries[key]
+
+        disk_entry = self._disk_get(key)
+        with self._lock:
+            if disk_entry is not None:
+                self._put(key, disk_entry[0], disk_entry[1])
+                if count:
+                    self._stats['disk_hits'] += 1
+                return disk_entry[0]
+            if count:
+                self._stats['misses'] += 1
+        return None
+
+    def set(self, key: str, value: str):
+        """Сохраняет ответ в память и на диск"""
+        expires_at = time.time() + self.ttl
+        with self._lock:
+            self._put(key, value, expires_at)
+        self._disk_set(key, value, expires_at)
+
+    def join(self, key: str) -> Tuple[_Flight, bool]:
+        """
+        Регистрирует вычисление ответа для ключа
+
+        Returns:
+            (вычисление, True) - вызывающий должен вычислить ответ и вызвать complete/fail;
+            (вычисление, False) - такой же запрос уже выполняется, достаточно дождаться его
+        """
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is not None:
+                self._stats['deduplicated'] += 1
+                return flight, False
+            flight = _Flight()
+            self._flights[key] = flight
+            return flight, True
+
+    def complete(self, key: str, flight: _Flight, value: str):
+        """Завершает вычисление: сохраняет ответ и будит ожидающих"""
+        self.set(key, value)
+        with self._lock:
+            self._flights.pop(key, None)
+        flight.value = value
+        flight.done.set()
+
+    def fail(self, key: str, flight: _Flight, error: BaseException):
+        """Завершает вычисление ошибкой (ничего не кэшируется)"""
+        with self._lock:
+            self._flights.pop(key, None)
+        flight.error = error
+        flight.done.set()
+
+    def get_or_compute(self, key: str, compute: Callable[[], str], timeout: Optional[float] = None) -> str:
+        """
+        Ответ из кэша, из уже выполняющегося вычисления или вычисленный сейчас
+
+        Проверка кэша здесь не учитывается в hits/misses: обычно перед вызовом уже был get()
+        """
+        cached = self._lookup(key, count=False)
+        if cached is not None:
+            return cached
+
+        flight, leader = self.join(key)
+        if not leader:
+            return flight.wait(timeout)
+        try:
+            # Предыдущее вычисление могло завершиться между проверкой кэша и join()
+            value = self._lookup(key, count=False)
+            if value is None:
+                value = compute()
+        except BaseException as e:
+            self.fail(key, flight, e)
+            raise
+        self.complete(key, flight, value)
+        return value
+
+    def stats(self) -> Dict:
+        """Счетчики кэша для мониторинга"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats.update({
+                'entries': len(self._entries),
+                'in_flight': len(self._flights),
+                'max_entries': self.max_entries,
+                'ttl': self.ttl,
+                'disk': self._disk is not None,
+            })
+        return stats
+
+
+def create_response_cache() -> ResponseCache:
+    """Кэш с настройками из переменных окружения"""
+    return ResponseCache(
+        max_entries=int(os.getenv('AI_CACHE_SIZE', '500')),
+        ttl=float(os.getenv('AI_CACHE_TTL', '3600')),
+        disk_path=os.getenv('AI_CACHE_PATH') or None
+    )
@@ -0,0 +1,187 @@
+"""
+Выполнение запросов к AI провайдерам в отдельном ограниченном пуле потоков
+
+Запросы к LLM идут секунды, поэтому они не должны занимать все потоки веб-сервера:
+- пул AI_MAX_WORKERS потоков выполняет вызовы провайдеров
+- не больше AI_MAX_QUEUE запросов ждут в очереди, остальные сразу отклоняются (503)
+- у каждого запроса есть срок AI_REQUEST_TIMEOUT секунд (504 по истечении)
+
+Чтобы запросы расписания не голодали, AI_MAX_WORKERS + AI_MAX_QUEUE должно быть
+меньше числа потоков воркера (WEB_THREADS).
+"""
+import os
+import time
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor, Future, TimeoutError as FutureTimeoutError
+from typing import Callable, Dict, Iterator, Optional
+
+
+class AIRequestRejected(Exception):
+    """Очередь AI запросов переполнена"""
+
+
+class AIRequestTimeout(Exception):
+    """AI запрос не уложился в срок"""
+
+
+class AIExecutor:
+    """Ограниченный пул для вызовов AI провайдеров с очередью и сроками выполнения"""
+
+    def __init__(
+        self,
+        max_workers: int = 2,
+        max_queue: int = 2,
+        request_timeout: float = 45.0
+    ):
+        """
+        Args:
+            max_workers: Количество одновременных вызовов провайдеров
+            max_queue: Сколько запросов может ждать свободный поток
+            request_timeout: Срок выполнения запроса по умолчанию, секунд
+        """
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.request_timeout = request_timeout
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='ai-provider')
+        self._slots = threading.BoundedSemaphore(max_workers + max_queue)
+        self._lock = threading.Lock()
+        self._stats = {
+            'submitted': 0,
+            'completed': 0,
+            'rejected': 0,
+            'timeouts': 0,
+            'in_flight': 0,
+        }
+
+    def _count(self, key: str, delta: int = 1):
+        with self._lock:
+            self._stats[key] += delta
+
+    def _on_done(self, future: Future):
+        self._slots.release()
+        self._count('in_flight', -1)
+        self._count('completed')
+
+    def submit(self, fn: Callable, *args, **kwargs) -> Future:
+        """
+        Ставит вызов в очередь без ожидания
+
+        Raises:
+            AIRequestRejected: если все потоки заняты и очередь заполнена
+        """
+        if not self._slots.acquire(blocking=False):
+            self._count('rejected')
+            raise AIRequestRejected("Слишком много одновременных AI запросов")
+        self._count('submitted')
+        self._count('in_flight')
+        try:
+            future = self._executor.submit(fn, *args, **kwargs)
+        except Exception:
+            self._slots.release()
+            self._count('in_flight', -1)
+            raise
+        future.add_done_callback(self._on_done)
+        return future
+
+    def run(self, fn: Callable, *args, timeout: Optional[float] = None, **kwargs):
+        """
+        Выполняет вызов в пуле и ждет результат не дольше срока
+
+        Raises:
+            AIRequestRejected: очередь переполнена
+            AIRequestTimeout: срок истек (сам вызов доработает в фоне и освободит поток)
+        """
+        timeout = self.request_timeout if timeout is None else timeout
+        future = self.submit(fn, *args, **kwargs)
+        try:
+            return future.result(timeout=timeout)
+        except FutureTimeoutError:
+            # Если вызов еще в очереди - отменяем, если уже выполняется - он доработает сам
+            future.cancel()
+            self._count('timeouts')
+            raise AIRequestTimeout(f"AI не ответил за {timeout:.0f} с")
+
+    def stream(self, fn: Callable, *args, timeout: Optional[float] = None, **kwargs) -> Iterator:
+        """
+        Выполняет генератор fn(*args, **kwargs) в пуле и отдает его элементы по мере поступления
+
+        Место в пуле занимается сразу (AIRequestRejected выбрасывается до начала потока),
+        AIRequestTimeout - при чтении, если весь поток не уложился в срок.
+        Если читатель прекратил чтение, генератор в пуле останавливается на следующем элементе.
+        """
+        timeout = self.request_timeout if timeout is None else timeout
+        chunks = queue.Queue()
+        cancelled = threading.Event()
+
+        def produce():
+            try:
+                for chunk in fn(*args, **kwargs):
+                    if cancelled.is_set():
+                        return
+                    chunks.put(('chunk', chunk))
+                chunks.put(('done', None))
+            except Exception as e:
+                chunks.put(('error', e))
+
+        self.submit(produce)
+        deadline = time.monotonic() + timeout
+
+        def consume():
+            try:
+                while True:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._count('timeouts')
+                        raise AIRequestTimeout(f"AI не ответил за {timeout:.0f} с")
+                    try:
+                        kind, value = chunks.get(timeout=remaining)
+                    except queue.Empty:
+                        continue
+                    if kind == 'chunk':
+                        yield value
+                    elif kind == 'error':
+                        raise value
+                    else:
+                        return
+            finally:
+                cancelled.set()
+
+        return consume()
+
+    def deadline(self, timeout: Optional[float] = None) -> float:
+        """Момент (time.monotonic), до которого провайдер должен ответить"""
+        return time.monotonic() + (self.request_timeout if timeout is None else timeout)
+
+    def stats(self) -> Dict:
+        """Счетчики пула для мониторинга"""
+        with self._lock:
+            stats = dict(self._stats)
+        stats.update({
+            'max_workers': self.max_workers,
+            'max_queue': self.max_queue,
+            'request_timeout': self.request_timeout,
+        })
+        return stats
+
+    def shutdown(self):
+        """Останавливает пул (не дожидаясь выполняющихся вызовов)"""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+_executor: Optional[AIExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def get_ai_executor() -> AIExecutor:
+    """Возвращает общий для процесса пул AI запросов (создается лениво)"""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = AIExecutor(
+                    max_workers=int(os.getenv('AI_MAX_WORKERS', '2')),
+                    max_queue=int(os.getenv('AI_MAX_QUEUE', '2')),
+                    request_timeout=float(os.getenv('AI_REQUEST_TIMEOUT', '45'))
+                )
+    return _executor
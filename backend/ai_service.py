@@ -5,29 +5,47 @@ AI сервис для обработки запросов о расписани
 """
 import os
 import json
+import time
 import hashlib
-from typing import Optional, Dict, List, Tuple
+from datetime import date
+from typing import Optional, Dict, Iterator, List, Tuple
 from dotenv import load_dotenv
 from schedule_analytics import ScheduleAnalytics
+from ai_cache import create_response_cache
+from prompt_context import ContextCompiler
+from intent_engine import IntentEngine
 
 load_dotenv()
 
+
+class AIProviderError(Exception):
+    """Провайдер AI не ответил: текст исключения показывается пользователю, в кэш не попадает"""
+
+
 class AIService:
     """Сервис для работы с AI моделями с поддержкой кэширования и аналитики"""
     
     def __init__(self):
         self.api_key = os.getenv('OPENAI_API_KEY') or os.getenv('GEMINI_API_KEY')
         self.provider = os.getenv('AI_PROVIDER', 'openai')  # 'openai' или 'gemini'
-        self.cache = {}  # Простой in-memory кэш (в продакшене использовать Redis)
+        self.cache = create_response_cache()  # LRU+TTL в памяти, опционально SQLite (AI_CACHE_PATH)
         self.analytics = ScheduleAnalytics()
+        self.context_compiler = ContextCompiler()  # бюджет токенов: AI_CONTEXT_TOKENS
+        self.intents = IntentEngine()
         
     def _get_schedule_context(
         self, 
         group_code: Optional[str] = None,
         schedule_data: Optional[Dict] = None,
-        analytics_data: Optional[Dict] = None
+        analytics_data: Optional[Dict] = None,
+        user_message: str = '',
+        prompt_stats: Optional[Dict] = None
     ) -> str:
-        """Получает расширенный контекст расписания с аналитикой"""
+        """
+        Получает контекст расписания с аналитикой: только относящееся к вопросу, в пределах бюджета токенов
+
+        Статистика промпта (ContextCompiler.compile) дописывается в prompt_stats, если он передан
+        """
         context = """Вы - умный AI-ассистент для приложения расписания занятий БТЭУ (Белорусский торгово-экономический университет).
 
 Ваши возможности:
@@ -52,40 +70,63 @@ class AIService:
         if group_code:
             context += f"\n\nГруппа пользователя: {group_code}"
         
-        if schedule_data:
-            context += f"\n\nДанные расписания:\n{json.dumps(schedule_data, ensure_ascii=False, indent=2)}"
-        
         if analytics_data:
-            context += f"\n\nАналитика расписания:\n{json.dumps(analytics_data, ensure_ascii=False, indent=2)}"
-            context += "\n\nИспользуйте эту аналитику для более умных ответов о нагрузке, балансе часов и приоритетах."
+            context += "\nИспользуйте аналитику для более умных ответов о нагрузке, балансе часов и приоритетах."
         
+        context, stats = self.context_compiler.compile(context, user_message, schedule_data, analytics_data)
+        if stats['truncated']:
+            print(f"[AI] Промпт группы {group_code or '-'} обрезан: {stats['tokens']} токенов, "
+                  f"занятий {stats['lessons_included']} из {stats['lessons_total']}")
+        if prompt_stats is not None:
+            prompt_stats.update(stats)
         return context
     
-    def _get_cache_key(self, user_message: str, group_code: Optional[str] = None) -> str:
-        """Генерирует ключ кэша для запроса"""
-        key_string = f"{user_message.lower().strip()}_{group_code or ''}"
+    @staticmethod
+    def schedule_version(schedule_data: Optional[Dict] = None) -> str:
+        """
+        Версия расписания для ключа кэша: ответы устаревают при изменении расписания
+        
+        Берется из schedule_data['version'], если она уже известна, иначе хэш занятий
+        """
+        if not schedule_data:
+            return ''
+        if schedule_data.get('version') is not None:
+            return str(schedule_data['version'])
+        lessons_json = json.dumps(schedule_data.get('lessons', []), ensure_ascii=False, sort_keys=True, default=str)
+        return hashlib.md5(lessons_json.encode()).hexdigest()
+    
+    def _get_cache_key(
+        self,
+        user_message: str,
+        group_code: Optional[str] = None,
+        schedule_version: str = ''
+    ) -> str:
+        """Генерирует ключ кэша для запроса (с датой: вопросы про "сегодня" и "завтра" устаревают)"""
+        key_string = f"{user_message.lower().strip()}_{group_code or ''}_{schedule_version}_{date.today().isoformat()}"
         return hashlib.md5(key_string.encode()).hexdigest()
     
     def _check_cache(self, cache_key: str) -> Optional[str]:
-        """Проверяет кэш (для простых запросов)"""
+        """Проверяет кэш"""
         return self.cache.get(cache_key)
     
     def _save_to_cache(self, cache_key: str, response: str):
         """Сохраняет ответ в кэш"""
-        # Ограничиваем размер кэша (последние 100 запросов)
-        if len(self.cache) > 100:
-            # Удаляем самый старый элемент
-            oldest_key = next(iter(self.cache))
-            del self.cache[oldest_key]
-        self.cache[cache_key] = response
+        self.cache.set(cache_key, response)
+    
+    @staticmethod
+    def _remaining_timeout(deadline: Optional[float], default: float) -> float:
+        """Таймаут вызова провайдера: не дольше оставшегося до срока запроса времени"""
+        if deadline is None:
+            return default
+        return max(1.0, min(default, deadline - time.monotonic()))
     
-    def _call_openai(self, user_message: str, context: str) -> str:
+    def _call_openai(self, user_message: str, context: str, timeout: float = 30) -> str:
         """Вызов OpenAI API"""
         try:
             import openai
             
             if not self.api_key:
-                return "Извините, AI сервис не настроен. Пожалуйста, настройте API ключ."
+                raise AIProviderError("Извините, AI сервис не настроен. Пожалуйста, настройте API ключ.")
             
             openai.api_key = self.api_key
             
@@ -96,36 +137,41 @@ class AIService:
                     {"role": "user", "content": user_message}
                 ],
                 max_tokens=500,
-                temperature=0.7
+                temperature=0.7,
+                request_timeout=timeout
             )
             
             return response.choices[0].message.content.strip()
         except ImportError:
-            return "Библиотека openai не установлена. Установите: pip install openai"
+            raise AIProviderError("Библиотека openai не установлена. Установите: pip install openai")
+        except AIProviderError:
+            raise
         except Exception as e:
-            return f"Ошибка при обращении к AI: {str(e)}"
+            raise AIProviderError(f"Ошибка при обращении к AI: {str(e)}")
     
-    def _call_gemini(self, user_message: str, context: str) -> str:
+    def _call_gemini(self, user_message: str, context: str, timeout: float = 30) -> str:
         """Вызов Google Gemini API"""
         try:
             import google.generativeai as genai
             
             if not self.api_key:
-                return "Извините, AI сервис не настроен. Пожалуйста, настройте API ключ."
+                raise AIProviderError("Извините, AI сервис не настроен. Пожалуйста, настройте API ключ.")
             
             genai.configure(api_key=self.api_key)
             model = genai.GenerativeModel('gemini-pro')
             
             full_prompt = f"{context}\n\nПользователь: {user_message}\n\nАссистент:"
             
-            response = model.generate_content(full_prompt)
+            response = model.generate_content(full_prompt, request_options={'timeout': timeout})
             return response.text.strip()
         except ImportError:
-            return "Библиотека google-generativeai не установлена. Установите: pip install google-generativeai"
+            raise AIProviderError("Библиотека google-generativeai не установлена. Установите: pip install google-generativeai")
+        except AIProviderError:
+            raise
         except Exception as e:
-            return f"Ошибка при обращении к AI: {str(e)}"
+            raise AIProviderError(f"Ошибка при обращении к AI: {str(e)}")
     
-    def _call_ollama(self, user_message: str, context: str) -> str:
+    def _call_ollama(self, user_message: str, context: str, timeout: float = 30) -> str:
         """Вызов локальной модели Ollama (если установлена)"""
         try:
             import requests
@@ -142,22 +188,27 @@ class AIService:
                     "prompt": full_prompt,
                     "stream": False
                 },
-                timeout=30
+                timeout=timeout
             )
             
-            if response.status_code == 200:
-                return response.json().get('response', 'Извините, не удалось получить ответ.')
-            else:
-                return f"Ошибка Ollama: {response.status_code}"
+            if response.status_code != 200:
+                raise AIProviderError(f"Ошибка Ollama: {response.status_code}")
+            answer = response.json().get('response')
+            if not answer:
+                raise AIProviderError('Извините, не удалось получить ответ.')
+            return answer
         except ImportError:
-            return "Библиотека requests не установлена."
+            raise AIProviderError("Библиотека requests не установлена.")
+        except AIProviderError:
+            raise
         except Exception as e:
-            return f"Ошибка при обращении к Ollama: {str(e)}"
+            raise AIProviderError(f"Ошибка при обращении к Ollama: {str(e)}")
     
     def _process_smart_query(
         self, 
         user_message: str, 
-        schedule_data: Optional[Dict] = None
+        schedule_data: Optional[Dict] = None,
+        exams_data: Optional[List[Dict]] = None
     ) -> Optional[str]:
         """
         Обрабатывает умные запросы локально (без LLM) для быстрых ответов
@@ -165,50 +216,224 @@ class AIService:
         Returns:
             Ответ или None, если нужен LLM
         """
-        message_lower = user_message.lower()
+        return self.intents.answer(user_message, schedule_data, exams_data)
+    
+    def _build_llm_context(
+        self,
+        user_message: str,
+        group_code: Optional[str] = None,
+        schedule_data: Optional[Dict] = None,
+        exams_data: Optional[List[Dict]] = None,
+        prompt_stats: Optional[Dict] = None
+    ) -> str:
+        """Системный промпт для LLM: расписание группы и аналитика (статистика - в prompt_stats)"""
+        analytics_data = None
+        if schedule_data and 'lessons' in schedule_data:
+            lessons = schedule_data['lessons']
+            weekly_load = self.analytics.calculate_weekly_load(lessons)
+            hour_balance = self.analytics.calculate_hour_balance(lessons)
+            priorities = self.analytics.identify_priorities(lessons, exams_data)
+            
+            analytics_data = {
+                'weekly_load': weekly_load,
+                'hour_balance': hour_balance,
+                'priorities': {
+                    'high_priority_count': len(priorities['high_priority']),
+                    'upcoming_exams': priorities['upcoming_exams']
+                }
+            }
+        
+        return self._get_schedule_context(
+            group_code=group_code,
+            schedule_data=schedule_data,
+            analytics_data=analytics_data,
+            user_message=user_message,
+            prompt_stats=prompt_stats
+        )
+    
+    def _stream_openai(self, user_message: str, context: str, timeout: float = 30) -> Iterator[str]:
+        """Потоковый вызов OpenAI API: отдает фрагменты ответа по мере генерации"""
+        try:
+            import openai
+        except ImportError:
+            raise AIProviderError("Библиотека openai не установлена. Установите: pip install openai")
+        
+        if not self.api_key:
+            raise AIProviderError("Извините, AI сервис не настроен. Пожалуйста, настройте API ключ.")
+        
+        openai.api_key = self.api_key
+        response = openai.ChatCompletion.create(
+            model="gpt-3.5-turbo",
+            messages=[
+                {"role": "system", "content": context},
+                {"role": "user", "content": user_message}
+            ],
+            max_tokens=500,
+            temperature=0.7,
+            request_timeout=timeout,
+            stream=True
+        )
+        for chunk in response:
+            token = chunk.choices[0].delta.get('content')
+            if token:
+                yield token
+    
+    def _stream_gemini(self, user_message: str, context: str, timeout: float = 30) -> Iterator[str]:
+        """Потоковый вызов Google Gemini API"""
+        try:
+            import google.generativeai as genai
+        except ImportError:
+            raise AIProviderError("Библиотека google-generativeai не установлена. Установите: pip install google-generativeai")
+        
+        if not self.api_key:
+            raise AIProviderError("Извините, AI сервис не настроен. Пожалуйста, настройте API ключ.")
+        
+        genai.configure(api_key=self.api_key)
+        model = genai.GenerativeModel('gemini-pro')
+        
+        full_prompt = f"{context}\n\nПользователь: {user_message}\n\nАссистент:"
+        
+        response = model.generate_content(full_prompt, stream=True, request_options={'timeout': timeout})
+        for chunk in response:
+            if chunk.text:
+                yield chunk.text
+    
+    def _stream_ollama(self, user_message: str, context: str, timeout: float = 30) -> Iterator[str]:
+        """Потоковый вызов Ollama: ответ приходит построчно в JSON"""
+        import requests
+        
+        ollama_url = os.getenv('OLLAMA_URL', 'http://localhost:11434/api/generate')
+        model_name = os.getenv('OLLAMA_MODEL', 'llama2')
+        
+        full_prompt = f"{context}\n\nПользователь: {user_message}\n\nАссистент:"
+        
+        with requests.post(
+            ollama_url,
+            json={
+                "model": model_name,
+                "prompt": full_prompt,
+                "stream": True
+            },
+            timeout=timeout,
+            stream=True
+        ) as response:
+            if response.status_code != 200:
+                raise AIProviderError(f"Ошибка Ollama: {response.status_code}")
+            for line in response.iter_lines():
+                if not line:
+                    continue
+                part = json.loads(line)
+                if part.get('response'):
+                    yield part['response']
+                if part.get('done'):
+                    break
+    
+    def stream_response(
+        self,
+        user_message: str,
+        group_code: Optional[str] = None,
+        schedule_data: Optional[Dict] = None,
+        exams_data: Optional[List[Dict]] = None,
+        use_cache: bool = True,
+        deadline: Optional[float] = None,
+        try_local: bool = True,
+        prompt_stats: Optional[Dict] = None
+    ) -> Iterator[str]:
+        """
+        Потоковый вариант get_response: фрагменты ответа по мере генерации
         
-        # Поиск следующего занятия по предмету
-        if any(word in message_lower for word in ['когда', 'следующ', 'ближайш', 'следующая пара']):
-            if schedule_data and 'lessons' in schedule_data:
-                # Извлекаем название предмета из запроса
-                subject_keywords = ['по', 'предмет', 'матан', 'математик', 'физик', 'химия']
-                for keyword in subject_keywords:
-                    if keyword in message_lower:
-                        # Пытаемся найти предмет в запросе
-                        words = message_lower.split()
-                        for i, word in enumerate(words):
-                            if word in ['по', 'предмет'] and i + 1 < len(words):
-                                subject_query = ' '.join(words[i+1:])
-                                next_lesson = self.analytics.find_next_lesson(
-                                    schedule_data['lessons'], 
-                                    subject_query
-                                )
-                                if next_lesson:
-                                    day_name = next_lesson.get('day_name', '')
-                                    lesson_num = next_lesson.get('lesson_number', '')
-                                    subject = next_lesson.get('subject', '')
-                                    classroom = next_lesson.get('classroom', '')
-                                    days_until = next_lesson.get('days_until', 0)
-                                    
-                                    if days_until == 0:
-                                        return f"Следующая пара по {subject} сегодня, {lesson_num} пара. Аудитория: {classroom}"
-                                    elif days_until == 1:
-                                        return f"Следующая пара по {subject} завтра ({day_name}), {lesson_num} пара. Аудитория: {classroom}"
-                                    else:
-                                        return f"Следующая пара по {subject} через {days_until} дня(ей) ({day_name}), {lesson_num} пара. Аудитория: {classroom}"
+        Ответ из кэша или локальной обработки отдается одним фрагментом.
+        Полный ответ LLM сохраняется в кэш после завершения потока.
+        """
+        if not user_message or not user_message.strip():
+            yield "Пожалуйста, задайте вопрос о расписании."
+            return
         
-        # Вопросы о нагрузке
-        if any(word in message_lower for word in ['нагрузка', 'сколько пар', 'сколько занятий']):
-            if schedule_data and 'lessons' in schedule_data:
-                analytics = self.analytics.calculate_weekly_load(schedule_data['lessons'])
-                return (
-                    f"Нагрузка на неделю:\n"
-                    f"• Всего занятий: {analytics['total_lessons']}\n"
-                    f"• Всего часов: {analytics['total_hours']}\n"
-                    f"• В среднем в день: {analytics['average_per_day']} часов"
-                )
+        if try_local:
+            quick_response = self.get_quick_response(user_message, group_code, schedule_data, use_cache, exams_data)
+            if quick_response:
+                yield quick_response
+                return
+        
+        timeout = self._remaining_timeout(deadline, 30)
+        flight = None
+        if use_cache:
+            cache_key = self._get_cache_key(user_message, group_code, self.schedule_version(schedule_data))
+            flight, leader = self.cache.join(cache_key)
+            if not leader:
+                # Такой же вопрос уже обрабатывается - отдаем его ответ целиком
+                try:
+                    yield flight.wait(timeout)
+                except AIProviderError as e:
+                    yield str(e)
+                return
+        
+        try:
+            context = self._build_llm_context(user_message, group_code, schedule_data, exams_data, prompt_stats)
+            
+            if self.provider == 'gemini':
+                tokens = self._stream_gemini(user_message, context, timeout)
+            elif self.provider == 'ollama':
+                tokens = self._stream_ollama(user_message, context, timeout)
+            else:  # openai по умолчанию
+                tokens = self._stream_openai(user_message, context, timeout)
+            
+            parts = []
+            for token in tokens:
+                parts.append(token)
+                yield token
+        except AIProviderError as e:
+            # Ошибка провайдера показывается пользователю, но не кэшируется
+            if flight is not None:
+                self.cache.fail(cache_key, flight, e)
+            yield str(e)
+            return
+        except BaseException as e:
+            # В том числе GeneratorExit, если клиент отключился: ожидающие не должны висеть
+            if flight is not None:
+                self.cache.fail(cache_key, flight, e if isinstance(e, Exception) else RuntimeError("Запрос прерван"))
+            raise
+        
+        # Кэшируем только полностью полученный ответ
+        if flight is not None:
+            self.cache.complete(cache_key, flight, ''.join(parts).strip())
+    
+    def get_cached_response(
+        self,
+        user_message: str,
+        group_code: Optional[str] = None,
+        schedule_version=None
+    ) -> Optional[str]:
+        """
+        Ответ из кэша по уже известной версии расписания (без загрузки самого расписания)
         
-        return None
+        Версия должна совпадать с schedule_data['version'], с которым ответ сохранялся.
+        """
+        version = '' if schedule_version is None else str(schedule_version)
+        return self._check_cache(self._get_cache_key(user_message, group_code, version))
+    
+    def get_quick_response(
+        self,
+        user_message: str,
+        group_code: Optional[str] = None,
+        schedule_data: Optional[Dict] = None,
+        use_cache: bool = True,
+        exams_data: Optional[List[Dict]] = None
+    ) -> Optional[str]:
+        """
+        Ответ без обращения к LLM: из кэша или локальной обработкой запроса
+        
+        Returns:
+            Ответ или None, если нужен LLM
+        """
+        if use_cache:
+            cache_key = self._get_cache_key(user_message, group_code, self.schedule_version(schedule_data))
+            cached_response = self._check_cache(cache_key)
+            if cached_response:
+                return cached_response
+        
+        # Локальные ответы не кэшируются: они дешевле кэша и зависят от текущей даты
+        return self._process_smart_query(user_message, schedule_data, exams_data)
     
     def get_response(
         self, 
@@ -216,7 +441,10 @@ class AIService:
         group_code: Optional[str] = None,
         schedule_data: Optional[Dict] = None,
         exams_data: Optional[List[Dict]] = None,
-        use_cache: bool = True
+        use_cache: bool = True,
+        deadline: Optional[float] = None,
+        try_local: bool = True,
+        prompt_stats: Optional[Dict] = None
     ) -> str:
         """
         Получить умный ответ от AI на вопрос пользователя
@@ -227,6 +455,11 @@ class AIService:
             schedule_data: Данные расписания для контекста (опционально)
             exams_data: Данные экзаменов для приоритетов (опционально)
             use_cache: Использовать ли кэш
+            deadline: Срок ответа (time.monotonic), ограничивает таймаут провайдера
+            try_local: Проверить кэш и ответить локально (False - вызывающий уже сделал это
+                через get_cached_response и get_quick_response, вопрос учтен в метриках намерений)
+            prompt_stats: Словарь для статистики промпта этого запроса (tokens, lessons_included,
+                truncated, ...); остается пустым, если LLM не вызывался или ответ взят у такого же запроса
         
         Returns:
             Ответ AI
@@ -234,57 +467,35 @@ class AIService:
         if not user_message or not user_message.strip():
             return "Пожалуйста, задайте вопрос о расписании."
         
-        # Проверяем кэш для простых запросов
-        if use_cache:
-            cache_key = self._get_cache_key(user_message, group_code)
-            cached_response = self._check_cache(cache_key)
-            if cached_response:
-                return cached_response
+        if try_local:
+            # Проверяем кэш и пытаемся обработать локально (быстрый ответ)
+            quick_response = self.get_quick_response(user_message, group_code, schedule_data, use_cache, exams_data)
+            if quick_response:
+                return quick_response
         
-        # Пытаемся обработать локально (быстрый ответ)
-        local_response = self._process_smart_query(user_message, schedule_data)
-        if local_response:
-            if use_cache:
-                self._save_to_cache(cache_key, local_response)
-            return local_response
+        timeout = self._remaining_timeout(deadline, 30)
         
-        # Вычисляем аналитику для контекста
-        analytics_data = None
-        if schedule_data and 'lessons' in schedule_data:
-            lessons = schedule_data['lessons']
-            weekly_load = self.analytics.calculate_weekly_load(lessons)
-            hour_balance = self.analytics.calculate_hour_balance(lessons)
-            priorities = self.analytics.identify_priorities(lessons, exams_data)
+        def ask_llm() -> str:
+            context = self._build_llm_context(user_message, group_code, schedule_data, exams_data, prompt_stats)
             
-            analytics_data = {
-                'weekly_load': weekly_load,
-                'hour_balance': hour_balance,
-                'priorities': {
-                    'high_priority_count': len(priorities['high_priority']),
-                    'upcoming_exams': priorities['upcoming_exams']
-                }
-            }
-        
-        # Получаем расширенный контекст
-        context = self._get_schedule_context(
-            group_code=group_code,
-            schedule_data=schedule_data,
-            analytics_data=analytics_data
-        )
+            # Вызываем LLM для сложных запросов
+            if self.provider == 'gemini':
+                return self._call_gemini(user_message, context, timeout)
+            elif self.provider == 'ollama':
+                return self._call_ollama(user_message, context, timeout)
+            else:  # openai по умолчанию
+                return self._call_openai(user_message, context, timeout)
         
-        # Вызываем LLM для сложных запросов
-        if self.provider == 'gemini':
-            response = self._call_gemini(user_message, context)
-        elif self.provider == 'ollama':
-            response = self._call_ollama(user_message, context)
-        else:  # openai по умолчанию
-            response = self._call_openai(user_message, context)
-        
-        # Сохраняем в кэш
-        if use_cache:
-            self._save_to_cache(cache_key, response)
-        
-        return response
+        try:
+            if not use_cache:
+                return ask_llm()
+            
+            # Одинаковые одновременные вопросы ждут один вызов LLM.
+            # Ошибка провайдера - исключение, поэтому в кэш попадают только ответы
+            cache_key = self._get_cache_key(user_message, group_code, self.schedule_version(schedule_data))
+            return self.cache.get_or_compute(cache_key, ask_llm, timeout=timeout)
+        except AIProviderError as e:
+            return str(e)
     
     def is_configured(self) -> bool:
         """Проверяет, настроен ли AI сервис"""
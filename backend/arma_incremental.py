@@ -0,0 +1,342 @@
+"""
+Инкрементальная синхронизация расписания из АРМА в таблицу arma_lessons
+
+Для каждой таблицы АРМА (tmp_graf, fraspz) локально хранится состояние:
+максимальная синхронизированная дата (watermark) и отпечаток каждого дня
+(число строк + md5, считается на сервере АРМА). При запуске:
+
+1. Сервер возвращает отпечатки дней начиная с watermark - ARMA_SYNC_LOOKBACK_DAYS
+   (одна строка на день, данные занятий по VPN не передаются).
+2. Перечитываются только новые дни и дни с изменившимся отпечатком.
+3. Занятия дня сравниваются с arma_lessons по хэшу строки: удаляются исчезнувшие,
+   вставляются новые, совпадающие не трогаются.
+
+Строки дополняются названиями из справочников и временем звонков, поэтому в состоянии
+хранится и версия этих данных (ScheduleSync.enrichment_version). Если она изменилась
+(переименован преподаватель или аудитория, изменены звонки, прошлый запуск шел
+со старыми справочниками), запуск сравнивает все дни, как с --full.
+
+Использование:
+    python arma_incremental.py --year 2024-2025 --semester 1 [--form extramural] [--full]
+"""
+
+import hashlib
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from psycopg2.extras import execute_values
+
+from academic_calendar import semester_bounds
+
+logger = logging.getLogger(__name__)
+
+# Колонки arma_lessons, которые заполняются из строки расписания (без row_hash)
+LESSON_COLUMNS = [
+    'study_form', 'lesson_date', 'lesson_number', 'group_code', 'stream_number',
+    'subject_id', 'subject_name', 'lesson_type_id', 'lesson_type_name',
+    'teacher1_id', 'teacher1_name', 'teacher2_id', 'teacher2_name', 'teacher3_id', 'teacher3_name',
+    'audience1_id', 'audience1_name', 'audience2_id', 'audience2_name', 'audience3_id', 'audience3_name',
+    'building_number', 'time_start', 'time_end', 'academic_year', 'semester',
+]
+
+# Коды АРМА храним строками (типы колонок в АРМА различаются)
+TEXT_COLUMNS = {
+    'group_code', 'stream_number', 'subject_id', 'lesson_type_id',
+    'teacher1_id', 'teacher2_id', 'teacher3_id',
+    'audience1_id', 'audience2_id', 'audience3_id', 'building_number',
+}
+
+DEFAULT_STATE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.arma_sync_state.json')
+
+
+class SyncState:
+    """Локальное состояние синхронизации: watermark и отпечатки дней по таблицам"""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.getenv('ARMA_SYNC_STATE', DEFAULT_STATE_PATH)
+        self.tables: Dict[str, Dict[str, Any]] = {}
+        if os.path.exists(self.path):
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self.tables = json.load(f)
+
+    def table(self, name: str) -> Dict[str, Any]:
+        """Состояние таблицы: {'max_date': 'YYYY-MM-DD' | None, 'dates': {дата: отпечаток}, 'enrichment': версия}"""
+        return self.tables.setdefault(name, {'max_date': None, 'dates': {}})
+
+    def watermark(self, name: str) -> Optional[date]:
+        max_date = self.table(name)['max_date']
+        return date.fromisoformat(max_date) if max_date else None
+
+    def save(self):
+        """Атомарная запись (временный файл + rename), чтобы прерванный запуск не испортил состояние"""
+        directory = os.path.dirname(self.path) or '.'
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.arma_sync_state.', suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(self.tables, f, ensure_ascii=False, sort_keys=True)
+            os.replace(tmp_path, self.path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+
+def lesson_row(lesson: Dict[str, Any]) -> Tuple:
+    """Значения колонок arma_lessons для занятия (коды приведены к строкам)"""
+    values = []
+    for column in LESSON_COLUMNS:
+        value = lesson.get(column)
+        if column in TEXT_COLUMNS and value is not None:
+            value = str(value).strip()
+        values.append(value)
+    return tuple(values)
+
+
+def row_hash(row: Tuple) -> str:
+    """Хэш содержимого занятия"""
+    return hashlib.md5(json.dumps(row, default=str, ensure_ascii=False).encode('utf-8')).hexdigest()
+
+
+def group_by_date(lessons: Iterable[Dict[str, Any]]) -> Iterator[Tuple[date, List[Dict[str, Any]]]]:
+    """Группирует поток занятий, упорядоченный по дате, по дням"""
+    current_date, day = None, []
+    for lesson in lessons:
+        if day and lesson['lesson_date'] != current_date:
+            yield current_date, day
+            day = []
+        current_date = lesson['lesson_date']
+        day.append(lesson)
+    if day:
+        yield current_date, day
+
+
+class IncrementalSync:
+    """Инкрементальная синхронизация датированного расписания АРМА"""
+
+    def __init__(self, schedule_sync, state: Optional[SyncState] = None, lookback_days: Optional[int] = None):
+        """
+        Args:
+            schedule_sync: ScheduleSync с подключением к АРМА
+            state: Локальное состояние (по умолчанию из ARMA_SYNC_STATE)
+            lookback_days: Сколько дней до watermark перепроверять на правки (ARMA_SYNC_LOOKBACK_DAYS)
+        """
+        self.sync = schedule_sync
+        self.state = state or SyncState()
+        self.lookback_days = lookback_days if lookback_days is not None else int(os.getenv('ARMA_SYNC_LOOKBACK_DAYS', '120'))
+
+    def date_fingerprints(self, table: str, start_date: Optional[date], end_date: Optional[date]) -> Dict[str, str]:
+        """Отпечатки дней таблицы АРМА: {дата ISO: 'число строк:md5'}"""
+        query = f"""
+            SELECT t.qdate AS lesson_date,
+                   COUNT(*) || ':' || md5(string_agg(t::text, '|' ORDER BY t::text)) AS fingerprint
+            FROM {table} t
+            WHERE 1=1
+        """
+        params = []
+        if start_date:
+            query += " AND t.qdate >= %s"
+            params.append(start_date)
+        if end_date:
+            query += " AND t.qdate <= %s"
+            params.append(end_date)
+        query += " GROUP BY t.qdate"
+
+        rows = self.sync.arma.execute_query(query, tuple(params) if params else None)
+        return {row['lesson_date'].isoformat(): row['fingerprint'] for row in rows}
+
+    @staticmethod
+    def apply_day(cur, study_form: str, lesson_date: date, lessons: List[Dict[str, Any]]) -> Tuple[int, int]:
+        """
+        Приводит занятия дня в arma_lessons к переданным
+
+        Returns:
+            (вставлено, удалено)
+        """
+        rows = {}
+        for lesson in lessons:
+            row = lesson_row(lesson)
+            rows[row_hash(row)] = row
+
+        cur.execute(
+            "SELECT row_hash FROM arma_lessons WHERE study_form = %s AND lesson_date = %s",
+            (study_form, lesson_date)
+        )
+        existing = {r[0] for r in cur.fetchall()}
+
+        removed = existing - rows.keys()
+        if removed:
+            cur.execute(
+                "DELETE FROM arma_lessons WHERE study_form = %s AND lesson_date = %s AND row_hash = ANY(%s)",
+                (study_form, lesson_date, list(removed))
+            )
+
+        added = [row + (h,) for h, row in rows.items() if h not in existing]
+        if added:
+            execute_values(
+                cur,
+                f"INSERT INTO arma_lessons ({', '.join(LESSON_COLUMNS)}, row_hash) VALUES %s "
+                f"ON CONFLICT (study_form, lesson_date, row_hash) DO NOTHING",
+                added
+            )
+        return len(added), len(removed)
+
+    def run(
+        self,
+        academic_year: str,
+        semester: int,
+        study_form: str = 'full_time',
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        full: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Синхронизация одной формы обучения
+
+        Args:
+            academic_year: Учебный год
+            semester: Номер семестра
+            study_form: 'full_time' (tmp_graf) или 'extramural' (fraspz)
+            start_date: Начало периода (по умолчанию watermark - lookback_days)
+            end_date: Конец периода
+            full: Игнорировать сохраненные отпечатки и сравнить все дни периода
+
+        Returns:
+            Отчет: дни проверены/изменены/удалены, строки вставлены/удалены, время
+
+        Raises:
+            ReferenceLoadError: справочник не загрузился - состояние не меняется
+        """
+        from database import get_db_connection
+
+        started = time.perf_counter()
+        table, extra_columns = self.sync.SCHEDULE_SOURCES[study_form]
+        table_state = self.state.table(table)
+
+        # Отпечатки дней не видят правок справочников и звонков: при смене их версии
+        # перезаписываются все дни, иначе названия и время остались бы устаревшими
+        enrichment = self.sync.enrichment_version()
+        if not full and table_state['dates'] and table_state.get('enrichment') != enrichment:
+            logger.info(f"{table}: изменились справочники или звонки, сравниваются все дни")
+            full = True
+        known = {} if full else table_state['dates']
+
+        watermark = self.state.watermark(table)
+        if start_date is None and watermark and not full:
+            start_date = watermark - timedelta(days=self.lookback_days)
+        # Версию можно сохранить, только если все дни перезаписаны с текущими справочниками
+        whole_period = not known and start_date is None and end_date is None
+
+        fingerprints = self.date_fingerprints(table, start_date, end_date)
+        changed = sorted(d for d, fp in fingerprints.items() if known.get(d) != fp)
+        vanished = sorted(
+            d for d in table_state['dates']
+            if d not in fingerprints
+            and (start_date is None or d >= start_date.isoformat())
+            and (end_date is None or d <= end_date.isoformat())
+        )
+
+        report = {
+            'table': table,
+            'study_form': study_form,
+            'watermark': watermark.isoformat() if watermark else None,
+            'dates_checked': len(fingerprints),
+            'dates_changed': len(changed),
+            'dates_removed': len(vanished),
+            'rows_inserted': 0,
+            'rows_deleted': 0,
+        }
+
+        # Материализация семестра сбрасывается в транзакции каждого дня: иначе чтение между
+        # фиксацией дня и сбросом построит занятия по датам заново и сохранит их как актуальные
+        from occurrences import ensure_partition, invalidate_dates
+
+        conn = get_db_connection()
+        try:
+            cur = conn.cursor()
+            # Секции семестров создаются здесь, а не при чтении расписания по дате
+            for semester_start in sorted({semester_bounds(date.fromisoformat(d))[1] for d in changed}):
+                ensure_partition(cur, semester_start)
+            conn.commit()
+            if changed:
+                lessons = self.sync._iter_schedule(
+                    table, extra_columns, study_form, academic_year, semester,
+                    dates=[date.fromisoformat(d) for d in changed]
+                )
+                seen = set()
+                for lesson_date, day in group_by_date(lessons):
+                    inserted, deleted = self.apply_day(cur, study_form, lesson_date, day)
+                    invalidate_dates(cur, [lesson_date])
+                    conn.commit()
+                    day_key = lesson_date.isoformat()
+                    seen.add(day_key)
+                    table_state['dates'][day_key] = fingerprints[day_key]
+                    report['rows_inserted'] += inserted
+                    report['rows_deleted'] += deleted
+                # День мог исчезнуть между запросом отпечатков и чтением строк
+                vanished += [d for d in changed if d not in seen]
+
+            for day_key in vanished:
+                cur.execute(
+                    "DELETE FROM arma_lessons WHERE study_form = %s AND lesson_date = %s",
+                    (study_form, day_key)
+                )
+                report['rows_deleted'] += cur.rowcount
+                invalidate_dates(cur, [date.fromisoformat(day_key)])
+                conn.commit()
+                table_state['dates'].pop(day_key, None)
+            cur.close()
+            if whole_period:
+                table_state['enrichment'] = enrichment
+        finally:
+            conn.close()
+            if table_state['dates']:
+                table_state['max_date'] = max(table_state['dates'])
+            self.state.save()
+
+        report['elapsed_seconds'] = round(time.perf_counter() - started, 3)
+        logger.info(
+            f"{table}: проверено дней {report['dates_checked']}, изменено {report['dates_changed']}, "
+            f"удалено {report['dates_removed']}; строк +{report['rows_inserted']} -{report['rows_deleted']} "
+            f"за {report['elapsed_seconds']} с"
+        )
+        return report
+
+
+def main():
+    """Главная функция"""
+    import argparse
+    from db_connection import get_connector
+    from sync_schedule import ScheduleSync
+
+    # Исправление кодировки для Windows
+    if sys.platform == 'win32':
+        import io
+        sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    parser = argparse.ArgumentParser(description='Инкрементальная синхронизация расписания из АРМА')
+    parser.add_argument('--year', required=True, help='Учебный год, например 2024-2025')
+    parser.add_argument('--semester', type=int, required=True, help='Номер семестра')
+    parser.add_argument('--form', choices=['full_time', 'extramural'], default='full_time', help='Форма обучения')
+    parser.add_argument('--full', action='store_true', help='Сравнить все дни, игнорируя сохраненные отпечатки')
+    args = parser.parse_args()
+
+    connector = get_connector()
+    try:
+        report = IncrementalSync(ScheduleSync(connector)).run(
+            args.year, args.semester, study_form=args.form, full=args.full
+        )
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+    finally:
+        connector.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,243 @@
+"""
+Кэш справочников АРМА для синхронизации расписания
+
+Справочники (предметы, преподаватели, аудитории, виды занятий, факультеты)
+загружаются один раз за синхронизацию в словари по коду АРМА. Повторная
+загрузка выполняется только если изменился отпечаток таблицы - md5 по всем
+строкам, который считает сам сервер, поэтому проверка не гоняет данные по VPN.
+Строки расписания обогащаются названиями за один проход, без запросов на строку.
+"""
+
+import hashlib
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple
+
+import psycopg2
+from psycopg2 import pool
+
+logger = logging.getLogger(__name__)
+
+# Справочник: (таблица, колонка кода, запрос)
+REFERENCE_TABLES: Dict[str, Tuple[str, str, str]] = {
+    'groups': ('sgrupp', 'okgrup', """
+        SELECT
+            okgrup as code,
+            qkfak as faculty_id,
+            qkolstud as student_count,
+            qnsemest as semester,
+            qgod as academic_year,
+            qsp as specialty_code,
+            qspcl as specialization_code
+        FROM sgrupp
+        WHERE qgod = (SELECT MAX(qgod) FROM sgrupp)
+    """),
+    'subjects': ('spred', 'qkod', """
+        SELECT
+            qkod as id,
+            qkrnam as short_name,
+            qpnam as full_name,
+            qkaf as department_id
+        FROM spred
+    """),
+    'teachers': ('sprep', 'qtnprep', """
+        SELECT
+            qtnprep as id,
+            qfiopr as full_name,
+            qprfpr as position,
+            qkaf as department_id,
+            qus as academic_degree,
+            quz as academic_title
+        FROM sprep
+    """),
+    'audiences': ('saudit', 'qkaud', """
+        SELECT
+            qkaud as id,
+            qiaud as name,
+            onkorp as building_number,
+            qkolmest as capacity,
+            qpk as is_computer_lab
+        FROM saudit
+    """),
+    'lesson_types': ('fvzan', 'okvzan', """
+        SELECT
+            okvzan as id,
+            qivzan as name
+        FROM fvzan
+    """),
+    'faculties': ('sfak', 'qkod', """
+        SELECT
+            qkod as id,
+            oname as name,
+            qkotd as department_code
+        FROM sfak
+    """),
+}
+
+# Справочники, нужные для обогащения занятий
+LESSON_REFERENCES = ('subjects', 'teachers', 'audiences', 'lesson_types')
+
+# Ошибки, после которых запрос имеет смысл повторить (обрыв VPN, занятый пул)
+TRANSIENT_ERRORS = (psycopg2.OperationalError, psycopg2.InterfaceError, pool.PoolError)
+
+
+class ReferenceLoadError(Exception):
+    """Справочник для обогащения занятий не загружен и прежних строк нет: названия были бы пустыми"""
+
+
+class ReferenceCache:
+    """Справочники АРМА в памяти, ключ - код АРМА"""
+
+    def __init__(self):
+        self.tables: Dict[str, Dict[Any, Dict[str, Any]]] = {}
+        self.fingerprints: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def fingerprint_query(name: str) -> str:
+        """Запрос отпечатка справочника (число строк + md5 всех строк по порядку кода)"""
+        table, key, _ = REFERENCE_TABLES[name]
+        return f"""
+            SELECT COUNT(*) || ':' || COALESCE(md5(string_agg(t::text, '|' ORDER BY t.{key})), '') AS fingerprint
+            FROM {table} t
+        """
+
+    def load_table(self, arma, name: str) -> Tuple[int, bool]:
+        """
+        Загрузка одного справочника, если он изменился
+
+        Args:
+            arma: Коннектор к БД АРМА
+            name: Имя справочника из REFERENCE_TABLES
+
+        Returns:
+            (число записей, был ли справочник перечитан)
+        """
+        fingerprint = arma.execute_query(self.fingerprint_query(name))[0]['fingerprint']
+        if name in self.tables and self.fingerprints.get(name) == fingerprint:
+            return len(self.tables[name]), False
+
+        rows = arma.execute_query(REFERENCE_TABLES[name][2])
+        key = 'code' if name == 'groups' else 'id'
+        table = {row[key]: row for row in rows}
+        with self._lock:
+            self.tables[name] = table
+            self.fingerprints[name] = fingerprint
+        return len(table), True
+
+    def _load_with_retry(self, arma, name: str, retries: int, backoff: float) -> Dict[str, Any]:
+        """Загрузка справочника с повтором при временных ошибках; возвращает строку отчета"""
+        started = time.perf_counter()
+        result = {'rows': 0, 'changed': False, 'attempts': 0, 'seconds': 0.0, 'error': None}
+        while True:
+            result['attempts'] += 1
+            try:
+                result['rows'], result['changed'] = self.load_table(arma, name)
+                break
+            except TRANSIENT_ERRORS as e:
+                if result['attempts'] > retries:
+                    result['error'] = str(e)
+                    break
+                logger.warning(f"Справочник {name}: временная ошибка ({e}), повтор {result['attempts']}/{retries}")
+                time.sleep(backoff * 2 ** (result['attempts'] - 1))
+            except Exception as e:
+                result['error'] = str(e)
+                break
+        result['seconds'] = round(time.perf_counter() - started, 3)
+        return result
+
+    def load(
+        self,
+        arma,
+        names: Iterable[str] = LESSON_REFERENCES,
+        max_workers: Optional[int] = None,
+        retries: int = 2,
+        backoff: float = 0.5
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Параллельная загрузка справочников (неизменившиеся не перечитываются)
+
+        Справочники независимы, поэтому запросы идут одновременно по соединениям
+        пула АРМА: потоков не больше arma.max_connections, и каждый поток держит
+        не больше одного соединения. Временные ошибки повторяются с экспоненциальной паузой.
+
+        Args:
+            arma: Коннектор к БД АРМА
+            names: Справочники из REFERENCE_TABLES
+            max_workers: Число потоков (по умолчанию - размер пула АРМА)
+            retries: Число повторов при временной ошибке
+            backoff: Пауза перед первым повтором, секунд
+
+        Returns:
+            Отчет по справочникам: {имя: {rows, changed, attempts, seconds, error}}
+        """
+        names = list(names)
+        limit = getattr(arma, 'max_connections', 1)
+        workers = max(1, min(len(names), max_workers or limit, limit))
+
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='arma-ref') as executor:
+            futures = {
+                name: executor.submit(self._load_with_retry, arma, name, retries, backoff)
+                for name in names
+            }
+            report = {name: future.result() for name, future in futures.items()}
+
+        for name, result in report.items():
+            if result['error']:
+                logger.error(f"Ошибка загрузки справочника {name}: {result['error']}")
+            elif result['changed']:
+                logger.debug(f"Справочник {name} загружен: {result['rows']} записей за {result['seconds']} с")
+        return report
+
+    def require(self, report: Dict[str, Dict[str, Any]]) -> None:
+        """
+        Проверяет отчет load(): справочник с ошибкой допустим, только если в кэше есть прежние строки
+
+        Raises:
+            ReferenceLoadError: справочники, без которых занятия получили бы пустые названия
+        """
+        missing = [name for name, result in report.items() if result['error'] and name not in self.tables]
+        if missing:
+            raise ReferenceLoadError(
+                "Справочники не загружены: " +
+                ", ".join(f"{name} ({report[name]['error']})" for name in missing)
+            )
+
+    def version(self, names: Iterable[str] = LESSON_REFERENCES) -> str:
+        """Версия загруженных справочников: md5 их отпечатков (меняется при любой правке строк)"""
+        fingerprints = [(name, self.fingerprints.get(name)) for name in names]
+        return hashlib.md5(repr(fingerprints).encode('utf-8')).hexdigest()[:8]
+
+    def get(self, name: str, key: Any) -> Optional[Dict[str, Any]]:
+        """Запись справочника по коду АРМА"""
+        return self.tables.get(name, {}).get(key)
+
+    def enrich(self, lessons: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        """
+        Добавляет к занятиям названия из справочников
+
+        Поля: subject_name, subject_short_name, lesson_type_name,
+        teacher1_name..teacher3_name, audience1_name..audience3_name, building_number.
+        """
+        subjects = self.tables.get('subjects', {})
+        teachers = self.tables.get('teachers', {})
+        audiences = self.tables.get('audiences', {})
+        lesson_types = self.tables.get('lesson_types', {})
+        empty: Dict[str, Any] = {}
+
+        for lesson in lessons:
+            subject = subjects.get(lesson.get('subject_id'), empty)
+            lesson['subject_name'] = subject.get('full_name') or subject.get('short_name')
+            lesson['subject_short_name'] = subject.get('short_name')
+            lesson['lesson_type_name'] = lesson_types.get(lesson.get('lesson_type_id'), empty).get('name')
+
+            for i in (1, 2, 3):
+                teacher = teachers.get(lesson.get(f'teacher{i}_id'), empty)
+                lesson[f'teacher{i}_name'] = teacher.get('full_name')
+                audience = audiences.get(lesson.get(f'audience{i}_id'), empty)
+                lesson[f'audience{i}_name'] = audience.get('name')
+                if i == 1:
+                    lesson['building_number'] = audience.get('building_number')
+            yield lesson
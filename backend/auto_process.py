@@ -1,6 +1,6 @@
 """
 Автоматизация процесса: скачать → распарсить → загрузить в БД
-Интегрирует скрипт загрузки файлов с парсером
+Загрузчик, разбор и запись в БД работают одним конвейером в текущем процессе
 """
 import os
 import sys
@@ -9,136 +9,75 @@ import subprocess
 import json
 from pathlib import Path
 from typing import Optional
-import requests
 from dotenv import load_dotenv
 
 # Загружаем переменные окружения
 load_dotenv()
 
 
-def check_api_health(api_url: str = "http://localhost:8000") -> bool:
-    """
-    Проверяет доступность API сервера
-    
-    Args:
-        api_url: URL API сервера
-        
-    Returns:
-        True если сервер доступен, False иначе
-    """
-    try:
-        response = requests.get(f"{api_url}/v1/health", timeout=5)
-        return response.status_code == 200
-    except:
-        return False
-
-
 def run_download_script(download_script_path: Optional[str] = None) -> bool:
     """
-    Запускает скрипт загрузки файлов с сайта
+    Запускает внешний скрипт загрузки файлов (если встроенного загрузчика недостаточно)
     
     Args:
-        download_script_path: Путь к скрипту загрузки (если None, используется стандартный)
+        download_script_path: Путь к скрипту загрузки
         
     Returns:
         True если скрипт выполнен успешно, False иначе
     """
-    if download_script_path and os.path.exists(download_script_path):
-        print(f"Запуск скрипта загрузки: {download_script_path}")
-        try:
-            # Если это Jupyter notebook, нужно конвертировать или запустить через jupyter
-            if download_script_path.endswith('.ipynb'):
-                print("⚠ Обнаружен Jupyter notebook. Рекомендуется запустить его вручную.")
-                print("   Или конвертировать в .py скрипт для автоматического запуска.")
-                return False
-            
-            # Запускаем Python скрипт
-            result = subprocess.run(
-                [sys.executable, download_script_path],
-                capture_output=True,
-                text=True,
-                encoding='utf-8'
-            )
-            
-            if result.returncode == 0:
-                print("✓ Скрипт загрузки выполнен успешно")
-                return True
-            else:
-                print(f"❌ Ошибка выполнения скрипта загрузки:")
-                print(result.stderr)
-                return False
-        except Exception as e:
-            print(f"❌ Ошибка запуска скрипта: {e}")
-            return False
-    else:
-        print("⚠ Скрипт загрузки не указан или не найден")
-        print("   Пропускаем этап загрузки файлов")
-        return True  # Не критично, продолжаем
-
-
-def process_directory_via_api(
-    directory: str,
-    api_url: str = "http://localhost:8000"
-) -> dict:
-    """
-    Обрабатывает директорию через API endpoint batch-parse
-    
-    Args:
-        directory: Путь к директории с Excel файлами
-        api_url: URL API сервера
-        
-    Returns:
-        Словарь с результатами обработки
-    """
-    print(f"\n📤 Отправка запроса на пакетную обработку...")
-    print(f"   Директория: {directory}")
-    print(f"   API: {api_url}")
+    if not download_script_path or not os.path.exists(download_script_path):
+        print("⚠ Скрипт загрузки не найден")
+        return False
     
+    print(f"Запуск скрипта загрузки: {download_script_path}")
     try:
-        response = requests.post(
-            f"{api_url}/v1/admin/batch-parse",
-            json={'directory': directory},
-            timeout=300  # 5 минут на обработку
+        # Если это Jupyter notebook, нужно конвертировать или запустить через jupyter
+        if download_script_path.endswith('.ipynb'):
+            print("⚠ Обнаружен Jupyter notebook. Рекомендуется запустить его вручную.")
+            print("   Или конвертировать в .py скрипт для автоматического запуска.")
+            return False
+        
+        result = subprocess.run(
+            [sys.executable, download_script_path],
+            capture_output=True,
+            text=True,
+            encoding='utf-8'
         )
         
-        if response.status_code == 200:
-            result = response.json()
-            return {
-                'success': True,
-                'data': result
-            }
-        else:
-            error_data = response.json() if response.headers.get('content-type', '').startswith('application/json') else {}
-            return {
-                'success': False,
-                'error': error_data.get('error', f'HTTP {response.status_code}'),
-                'status_code': response.status_code
-            }
-    except requests.exceptions.RequestException as e:
-        return {
-            'success': False,
-            'error': f'Ошибка запроса к API: {str(e)}'
-        }
+        if result.returncode == 0:
+            print("✓ Скрипт загрузки выполнен успешно")
+            return True
+        print(f"❌ Ошибка выполнения скрипта загрузки:")
+        print(result.stderr)
+        return False
+    except Exception as e:
+        print(f"❌ Ошибка запуска скрипта: {e}")
+        return False
 
 
 def auto_process(
     xls_directory: str,
-    api_url: str = "http://localhost:8000",
     download_script: Optional[str] = None,
     skip_download: bool = False
 ) -> dict:
     """
     Автоматизирует весь процесс: скачать → распарсить → загрузить в БД
     
+    Скачивание с сайта, разбор и запись в БД идут одним конвейером (pipeline.py).
+    В папке загрузчика обрабатываются только изменившиеся и еще не разобранные
+    файлы, в обычной папке - все Excel файлы.
+    
     Args:
         xls_directory: Путь к директории с Excel файлами (XLS_DIR)
-        api_url: URL API сервера
-        download_script: Путь к скрипту загрузки файлов (опционально)
+        download_script: Внешний скрипт загрузки вместо встроенного загрузчика (опционально)
         skip_download: Пропустить этап загрузки файлов
         
     Returns:
         Словарь с результатами всего процесса
     """
+    from content_store import ContentStore, is_content_store
+    from pipeline import IngestPipeline, format_report
+    
     print("=" * 70)
     print("АВТОМАТИЧЕСКАЯ ОБРАБОТКА РАСПИСАНИЯ")
     print("=" * 70)
@@ -146,62 +85,63 @@ def auto_process(
     
     results = {
         'download': {'success': False, 'skipped': skip_download},
-        'api_check': {'success': False},
         'processing': {'success': False}
     }
     
-    # Шаг 1: Проверка API
-    print("Шаг 1: Проверка доступности API сервера...")
-    if not check_api_health(api_url):
-        print(f"❌ API сервер недоступен: {api_url}")
-        print("   Убедитесь, что сервер запущен: python backend/server.py")
-        return results
-    print(f"✓ API сервер доступен: {api_url}")
-    results['api_check']['success'] = True
-    print()
-    
-    # Шаг 2: Загрузка файлов (если нужно)
-    if not skip_download and download_script:
-        print("Шаг 2: Загрузка файлов с сайта...")
-        download_success = run_download_script(download_script)
-        results['download']['success'] = download_success
-        if not download_success:
-            print("⚠ Продолжаем без загрузки новых файлов")
-        print()
-    elif skip_download:
-        print("Шаг 2: Пропущен (--skip-download)")
+    download = None
+    store = None
+    if skip_download:
+        print("Загрузка файлов: пропущена (--skip-download)")
         results['download']['skipped'] = True
-        print()
+    elif download_script:
+        print("Загрузка файлов внешним скриптом...")
+        results['download']['success'] = run_download_script(download_script)
+        if not results['download']['success']:
+            print("⚠ Продолжаем без загрузки новых файлов")
     else:
-        print("Шаг 2: Пропущен (скрипт загрузки не указан)")
-        results['download']['skipped'] = True
-        print()
+        from download_schedule import ScheduleDownloader
+        print("Загрузка файлов с сайта и обработка...")
+        downloader = ScheduleDownloader(xls_directory)
+        store = downloader.store
+        download = downloader.download_all
+    print()
     
-    # Шаг 3: Обработка файлов через API
-    print("Шаг 3: Обработка Excel файлов...")
     if not os.path.isdir(xls_directory):
         print(f"❌ Директория не существует: {xls_directory}")
         results['processing']['error'] = f'Директория не существует: {xls_directory}'
         return results
     
-    process_result = process_directory_via_api(xls_directory, api_url)
+    files = []
+    if store is None:
+        if is_content_store(xls_directory):
+            store = ContentStore(xls_directory)
+        else:
+            files = sorted(
+                p for p in Path(xls_directory).iterdir()
+                if p.suffix.lower() in ('.xlsx', '.xls')
+            )
     
-    if process_result['success']:
-        data = process_result['data']
-        print("✓ Обработка завершена успешно!")
-        print()
-        print("Результаты:")
-        print(f"  Всего файлов:     {data.get('total_files', 0)}")
-        print(f"  Обработано:       {data.get('processed', 0)}")
-        print(f"  Успешно:          {data.get('success', 0)}")
-        print(f"  Ошибок:           {data.get('failed', 0)}")
-        print(f"  Пропущено:        {data.get('skipped', 0)}")
-        
-        results['processing']['success'] = True
-        results['processing']['data'] = data
-    else:
-        print(f"❌ Ошибка обработки: {process_result.get('error', 'Неизвестная ошибка')}")
-        results['processing']['error'] = process_result.get('error')
+    pipeline = IngestPipeline(store=store)
+    if download is not None:
+        downloader.on_change = pipeline.submit
+    try:
+        report = pipeline.run(download=download, files=files)
+    except Exception as e:
+        print(f"❌ Ошибка обработки: {e}")
+        results['processing']['error'] = str(e)
+        return results
+    if download is not None:
+        results['download']['success'] = downloader.stats['failed'] == 0
+        results['download']['stats'] = dict(downloader.stats)
+    
+    print()
+    print("✓ Обработка завершена!" if report['failed'] == 0 else "⚠ Обработка завершена с ошибками")
+    print()
+    print("Результаты:")
+    print(format_report(report))
+    
+    results['processing']['success'] = True
+    results['processing']['data'] = report
     
     print()
     print("=" * 70)
@@ -216,14 +156,14 @@ def main():
         formatter_class=argparse.RawDescriptionHelpFormatter,
         epilog="""
 Примеры использования:
-  # Полный автоматический процесс
-  python auto_process.py --xls-dir "G:\\...\\3 XLS" --download-script "path/to/load_files.py"
+  # Полный автоматический процесс (загрузка с сайта BTEU)
+  python auto_process.py --xls-dir "G:\\...\\3 XLS"
   
   # Только обработка (без загрузки)
   python auto_process.py --xls-dir "G:\\...\\3 XLS" --skip-download
   
-  # С указанием API URL
-  python auto_process.py --xls-dir "G:\\...\\3 XLS" --api-url http://localhost:8000
+  # Загрузка внешним скриптом
+  python auto_process.py --xls-dir "G:\\...\\3 XLS" --download-script "path/to/load_files.py"
         """
     )
     
@@ -234,17 +174,10 @@ def main():
         help='Путь к директории с Excel файлами (XLS_DIR)'
     )
     
-    parser.add_argument(
-        '--api-url',
-        type=str,
-        default='http://localhost:8000',
-        help='URL API сервера (по умолчанию: http://localhost:8000)'
-    )
-    
     parser.add_argument(
         '--download-script',
         type=str,
-        help='Путь к скрипту загрузки файлов с сайта'
+        help='Внешний скрипт загрузки файлов (вместо встроенного загрузчика)'
     )
     
     parser.add_argument(
@@ -269,7 +202,6 @@ def main():
     # Запускаем автоматическую обработку
     results = auto_process(
         xls_directory=args.xls_dir,
-        api_url=args.api_url,
         download_script=args.download_script,
         skip_download=args.skip_download
     )
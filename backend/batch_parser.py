@@ -11,6 +11,7 @@ from typing import List, Dict, Optional, Tuple
 import json
 from datetime import datetime
 from file_processor import extract_group_code, parse_filename
+from content_store import ContentStore, is_content_store
 import psycopg2
 from psycopg2.extras import RealDictCursor
 from dotenv import load_dotenv
@@ -128,6 +129,10 @@ def scan_directory(directory: str, extensions: Tuple[str, ...] = ('.xlsx', '.xls
     if not directory_path.exists():
         return []
     
+    # Папка загрузчика: актуальные версии файлов лежат в хранилище по хэшам
+    if is_content_store(directory):
+        return [p for p in ContentStore(directory).current_files() if p.suffix.lower() in extensions]
+    
     files = []
     for ext in extensions:
         files.extend(directory_path.glob(f'*{ext}'))
@@ -140,7 +145,8 @@ def batch_parse_directory(
     api_url: str = "http://localhost:8000",
     dry_run: bool = False,
     skip_errors: bool = True,
-    verbose: bool = True
+    verbose: bool = True,
+    pending_only: bool = False
 ) -> Dict:
     """
     Обрабатывает все Excel файлы в директории
@@ -151,6 +157,8 @@ def batch_parse_directory(
         dry_run: Если True, только показывает что будет сделано (не выполняет)
         skip_errors: Пропускать файлы с ошибками и продолжать обработку
         verbose: Выводить подробную информацию
+        pending_only: Только файлы, содержимое которых изменилось с прошлой обработки
+            (папка загрузчика с хранилищем по хэшам)
         
     Returns:
         Словарь с результатами обработки
@@ -165,7 +173,13 @@ def batch_parse_directory(
     print()
     
     # Сканируем директорию
-    files = scan_directory(directory)
+    store = None
+    if pending_only and is_content_store(directory):
+        store = ContentStore(directory)
+        files = [path for _, path in store.pending() if path.suffix.lower() in ('.xlsx', '.xls')]
+        print(f"Изменившихся файлов: {len(files)}")
+    else:
+        files = scan_directory(directory)
     
     if not files:
         print(f"❌ Не найдено Excel файлов в директории: {directory}")
@@ -277,6 +291,8 @@ def batch_parse_directory(
                 'lessons_saved': lessons_saved,
                 'errors': result.get('errors')
             })
+            if store is not None:
+                store.mark_processed(file_path)
         else:
             error_msg = result.get('error', 'Неизвестная ошибка')
             errors = result.get('errors', [])
@@ -305,6 +321,9 @@ def batch_parse_directory(
         
         results['processed'] += 1
     
+    if store is not None:
+        store.save()
+    
     # Итоговая статистика
     print("=" * 70)
     print("ИТОГОВАЯ СТАТИСТИКА")
@@ -363,6 +382,12 @@ def main():
         help='Останавливать обработку при первой ошибке'
     )
     
+    parser.add_argument(
+        '--pending',
+        action='store_true',
+        help='Только файлы, изменившиеся с прошлой обработки (папка download_schedule.py / download_from_ftp.py)'
+    )
+    
     parser.add_argument(
         '--output',
         type=str,
@@ -382,7 +407,8 @@ def main():
         api_url=args.api_url,
         dry_run=args.dry_run,
         skip_errors=not args.no_skip_errors,
-        verbose=True
+        verbose=True,
+        pending_only=args.pending
     )
     
     # Сохраняем результаты в JSON если указан файл
@@ -0,0 +1,120 @@
+"""
+Расписание звонков: время пары по номеру и номер пары по времени
+
+Таблица bell_schedule читается один раз (и заново раз в BELL_SCHEDULE_TTL секунд)
+и хранится в отсортированных массивах: время пары - словарь по номеру, номер пары
+по времени - бинарный поиск (bisect). Используется разбором Excel, синхронизацией
+с АРМА и API вместо соединения с bell_schedule в каждом запросе занятий.
+
+Если БД недоступна, используется DEFAULT_BELLS (звонки, по которым составлены
+файлы расписания).
+"""
+import hashlib
+import os
+import re
+import threading
+import time as time_module
+from bisect import bisect_right
+from datetime import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# (номер пары, начало, конец)
+DEFAULT_BELLS: Tuple[Tuple[int, time, time], ...] = (
+    (1, time(9, 0), time(10, 35)),
+    (2, time(10, 50), time(12, 25)),
+    (3, time(12, 55), time(14, 30)),
+    (4, time(14, 40), time(16, 15)),
+    (5, time(16, 25), time(18, 0)),
+    (6, time(18, 10), time(19, 45)),
+    (7, time(19, 50), time(21, 25)),
+)
+
+_TIME_RE = re.compile(r'(\d{1,2})[.:](\d{2})')
+
+
+class BellSchedule:
+    """Звонки одной версии таблицы bell_schedule"""
+
+    def __init__(self, bells: Iterable[Tuple[int, time, time]]):
+        bells = sorted(bells, key=lambda bell: bell[1])
+        self.numbers: List[int] = [number for number, _, _ in bells]
+        self.starts: List[time] = [start for _, start, _ in bells]
+        self.ends: List[time] = [end for _, _, end in bells]
+        self._times: Dict[int, Tuple[time, time]] = {number: (start, end) for number, start, end in bells}
+        # Отпечаток звонков: меняется вместе с таблицей bell_schedule (ключи кэшей с временем пар)
+        self.version = hashlib.md5(repr([tuple(bell) for bell in bells]).encode()).hexdigest()[:8]
+
+    def lesson_time(self, lesson_number: int) -> Tuple[Optional[time], Optional[time]]:
+        """(начало, конец) пары или (None, None), если такой пары нет"""
+        return self._times.get(lesson_number, (None, None))
+
+    def lesson_number_at(self, moment: time) -> Optional[int]:
+        """
+        Номер пары, которая идет в moment
+
+        На перемене (и до первой пары) - номер следующей пары, после последней - None.
+        """
+        index = bisect_right(self.starts, moment) - 1
+        if index >= 0 and moment < self.ends[index]:
+            return self.numbers[index]
+        if index + 1 < len(self.numbers):
+            return self.numbers[index + 1]
+        return None
+
+    def lesson_number_from_text(self, text: str) -> int:
+        """
+        Номер пары по времени из ячейки Excel ("9.00-9.45", "9:50-10:35")
+
+        Returns:
+            Номер пары по времени начала или 0, если время не распознано
+        """
+        match = _TIME_RE.search(text or '')
+        if not match:
+            return 0
+        hours, minutes = int(match.group(1)), int(match.group(2))
+        if hours > 23 or minutes > 59:
+            return 0
+        return self.lesson_number_at(time(hours, minutes)) or 0
+
+    def attach(self, lessons: Iterable[Dict]) -> None:
+        """Дописывает lesson_start и lesson_end в занятия (по lesson_number)"""
+        for lesson in lessons:
+            lesson['lesson_start'], lesson['lesson_end'] = self.lesson_time(lesson['lesson_number'])
+
+
+def load_bell_schedule() -> BellSchedule:
+    """Читает bell_schedule из БД (отдельным соединением: вызывается и в процессах разбора)"""
+    import psycopg2
+    from database import DB_CONFIG
+
+    conn = psycopg2.connect(**DB_CONFIG, connect_timeout=5)
+    try:
+        cur = conn.cursor()
+        cur.execute("SELECT lesson_number, lesson_start, lesson_end FROM bell_schedule")
+        rows = cur.fetchall()
+        cur.close()
+    finally:
+        conn.close()
+    return BellSchedule(rows) if rows else BellSchedule(DEFAULT_BELLS)
+
+
+_schedule: Optional[BellSchedule] = None
+_loaded_at = 0.0
+_lock = threading.Lock()
+
+
+def get_bell_schedule() -> BellSchedule:
+    """Звонки текущего процесса (БД перечитывается раз в BELL_SCHEDULE_TTL секунд, по умолчанию 300)"""
+    global _schedule, _loaded_at
+    ttl = float(os.getenv('BELL_SCHEDULE_TTL', '300'))
+    if _schedule is not None and time_module.monotonic() - _loaded_at < ttl:
+        return _schedule
+    with _lock:
+        if _schedule is None or time_module.monotonic() - _loaded_at >= ttl:
+            try:
+                _schedule = load_bell_schedule()
+            except Exception as e:
+                print(f"[WARNING] Расписание звонков не загружено из БД, используется стандартное: {e}")
+                _schedule = BellSchedule(DEFAULT_BELLS)
+            _loaded_at = time_module.monotonic()
+    return _schedule
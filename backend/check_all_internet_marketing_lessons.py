@@ -44,7 +44,7 @@ try:
             day_of_week,
             lesson_number,
             week_parity
-        FROM lessons
+        FROM lesson_details
         WHERE group_id = %s AND subject ILIKE '%интернет%маркетинг%'
         ORDER BY day_of_week, lesson_number, week_parity
     """, (group_id,))
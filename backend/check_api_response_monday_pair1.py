@@ -46,7 +46,7 @@ try:
             l.classroom,
             l.lesson_type,
             l.week_parity
-        FROM lessons l
+        FROM lesson_details l
         WHERE l.group_id = %s 
           AND l.day_of_week = 1 
           AND l.week_parity = 'odd'
@@ -47,7 +47,7 @@ try:
                 WHEN subject ~ '[А-ЯЁ]{2,}' THEN 'Содержит много заглавных'
                 ELSE 'В основном строчные'
             END as case_pattern
-        FROM lessons
+        FROM lesson_details
         WHERE group_id = %s
         ORDER BY lesson_type, subject
         LIMIT 20
@@ -72,7 +72,7 @@ try:
         SELECT 
             lesson_type,
             COUNT(*) as count
-        FROM lessons
+        FROM lesson_details
         WHERE group_id = %s
         GROUP BY lesson_type
         ORDER BY lesson_type
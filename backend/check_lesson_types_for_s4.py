@@ -43,7 +43,7 @@ try:
             l.lesson_type,
             l.day_of_week,
             l.lesson_number
-        FROM lessons l
+        FROM lesson_details l
         WHERE l.group_id = %s
         ORDER BY l.day_of_week, l.lesson_number
         LIMIT 50
@@ -78,7 +78,7 @@ try:
                     subject,
                     lesson_type,
                     COUNT(*) as count
-                FROM lessons
+                FROM lesson_details
                 WHERE group_id = %s AND subject ILIKE %s
                 GROUP BY subject, lesson_type
                 ORDER BY subject
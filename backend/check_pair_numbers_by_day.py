@@ -43,7 +43,7 @@ try:
                 lesson_number,
                 COUNT(*) as count,
                 STRING_AGG(DISTINCT subject, ', ' ORDER BY subject) as subjects
-            FROM lessons
+            FROM lesson_details
             WHERE group_id = %s AND day_of_week = %s AND week_parity = 'odd'
             GROUP BY lesson_number
             ORDER BY lesson_number
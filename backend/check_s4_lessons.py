@@ -51,7 +51,7 @@ try:
             classroom,
             lesson_type,
             week_parity
-        FROM lessons
+        FROM lesson_details
         WHERE group_id = %s AND day_of_week = 1 AND is_active = TRUE
         ORDER BY lesson_number, id
     """, (group_id,))
@@ -106,7 +106,7 @@ try:
             COUNT(CASE WHEN lesson_number < 1 OR lesson_number > 7 THEN 1 END) as invalid_par,
             COUNT(CASE WHEN subject IS NULL OR subject = '' THEN 1 END) as empty_subject,
             COUNT(CASE WHEN LENGTH(subject) < 10 THEN 1 END) as short_subject
-        FROM lessons
+        FROM lesson_details
         WHERE group_id = %s AND is_active = TRUE
     """, (group_id,))
     
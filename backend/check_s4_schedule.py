@@ -50,7 +50,7 @@ try:
             l.classroom,
             l.lesson_type,
             l.week_parity
-        FROM lessons l
+        FROM lesson_details l
         WHERE l.group_id = %s
         ORDER BY l.day_of_week, l.lesson_number
     """, (group_id,))
@@ -87,7 +87,7 @@ try:
             subject,
             week_parity,
             COUNT(*) as count
-        FROM lessons
+        FROM lesson_details
         WHERE group_id = %s
         GROUP BY lesson_number, day_of_week, subject, week_parity
         HAVING COUNT(*) > 1
@@ -45,7 +45,7 @@ try:
             lesson_number,
             teacher,
             classroom
-        FROM lessons
+        FROM lesson_details
         WHERE group_id = %s AND subject ILIKE '%интернет%маркетинг%'
         ORDER BY day_of_week, lesson_number
     """, (group_id,))
@@ -43,7 +43,7 @@ try:
             lesson_type,
             lesson_number,
             week_parity
-        FROM lessons
+        FROM lesson_details
         WHERE group_id = %s AND day_of_week = 2
         ORDER BY lesson_number, week_parity
     """, (group_id,))
@@ -76,7 +76,7 @@ try:
                     subject,
                     lesson_type,
                     lesson_number
-                FROM lessons
+                FROM lesson_details
                 WHERE group_id = %s 
                   AND day_of_week = 2
                   AND subject ILIKE %s
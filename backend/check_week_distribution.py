@@ -39,7 +39,7 @@ try:
             week_parity,
             COUNT(*) as count,
             STRING_AGG(DISTINCT subject, ', ' ORDER BY subject) as subjects
-        FROM lessons
+        FROM lesson_details
         WHERE group_id = %s
         GROUP BY day_of_week, week_parity
         ORDER BY day_of_week, week_parity
@@ -75,7 +75,7 @@ try:
             subject,
             COUNT(DISTINCT week_parity) as parity_count,
             STRING_AGG(DISTINCT week_parity::text, ', ') as parities
-        FROM lessons
+        FROM lesson_details
         WHERE group_id = %s
         GROUP BY day_of_week, lesson_number, subject
         HAVING COUNT(DISTINCT week_parity) > 1
@@ -0,0 +1,379 @@
+"""
+Контентно-адресуемое хранилище скачанных файлов расписания
+
+Каждый файл хранится один раз по SHA-256 содержимого:
+    <папка>/.objects/<первые 2 символа>/<sha256>/<имя файла>
+Имя файла сохраняется, потому что из него извлекается код группы (file_processor);
+если то же содержимое пришло под другим именем, рядом создается жесткая ссылка.
+
+Манифест <папка>/.manifest.json связывает источник (URL сайта или путь на FTP)
+с хэшем и локальным путем, хранит валидаторы источника (ETag, Last-Modified,
+размер, время изменения на FTP) и список хэшей, ожидающих разбора. Одинаковое
+содержимое из разных источников хранится один раз; версии, на которые больше
+не ссылается ни один источник, удаляются при prune().
+
+Манифест ведут несколько процессов (загрузчик сайта, синхронизация с FTP, наблюдатель
+папки), поэтому save() под межпроцессной блокировкой (<папка>/.manifest.lock) заново
+читает манифест и добавляет к нему только изменения этого экземпляра: источники,
+записанные им, и отметки о разборе. Новый объект сразу записывается в манифест
+на диске под той же блокировкой, поэтому prune() другого процесса не удалит файл,
+который уже передан на разбор, но еще не сохранен вызовом save().
+"""
+import hashlib
+import json
+import os
+import tempfile
+import sys
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+MANIFEST_NAME = '.manifest.json'
+LOCK_NAME = '.manifest.lock'
+OBJECTS_DIR = '.objects'
+MANIFEST_VERSION = 2
+
+
+class ContentStore:
+    """Хранилище файлов по SHA-256 с манифестом источников"""
+
+    def __init__(self, root: str):
+        """
+        Args:
+            root: Папка хранилища
+        """
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.objects_dir = self.root / OBJECTS_DIR
+        self.manifest_path = self.root / MANIFEST_NAME
+        self._lock = threading.Lock()
+        self.sources: Dict[str, Dict[str, Any]] = {}
+        self._pending: List[str] = []
+        # Изменения этого экземпляра, которые save() переносит в манифест на диске
+        self._changed_sources: Set[str] = set()
+        self._added_pending: Set[str] = set()
+        self._dropped_pending: Set[str] = set()
+        self.sources, self._pending = self._read_manifest()
+
+    def _read_manifest(self) -> Tuple[Dict[str, Dict[str, Any]], List[str]]:
+        """(источники, очередь разбора) из манифеста на диске"""
+        if not self.manifest_path.exists():
+            return {}, []
+        try:
+            data = json.loads(self.manifest_path.read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            return {}, []
+        # Манифест старого формата (имя файла с датой без хэша) не переносится:
+        # файлы один раз скачаются заново и попадут в хранилище
+        if data.get('version') != MANIFEST_VERSION:
+            return {}, []
+        return data.get('sources', {}), data.get('pending', [])
+
+    @contextmanager
+    def _manifest_lock(self):
+        """Исключительная блокировка манифеста между процессами (файл .manifest.lock)"""
+        with open(self.root / LOCK_NAME, 'a+b') as f:
+            if sys.platform == 'win32':
+                import msvcrt
+                f.seek(0)
+                # LK_LOCK сдается через 10 секунд ожидания - ждем дольше сами
+                while True:
+                    try:
+                        msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                        break
+                    except OSError:
+                        continue
+                try:
+                    yield
+                finally:
+                    f.seek(0)
+                    msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+            else:
+                import fcntl
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+    def save(self):
+        """
+        Сохраняет манифест (через временный файл), объединяя его с записанным другими процессами
+
+        Источники, записанные этим экземпляром, заменяют свои записи на диске, остальные
+        берутся с диска; файлы, разобранные этим экземпляром, убираются из очереди.
+        """
+        with self._manifest_lock(), self._lock:
+            self._merge_manifest()
+
+    def _merge_manifest(self):
+        """Объединение с манифестом на диске и запись (под _manifest_lock и _lock)"""
+        sources, pending = self._read_manifest()
+        for source in self._changed_sources:
+            if source in self.sources:
+                sources[source] = self.sources[source]
+        pending = [p for p in pending if p not in self._dropped_pending]
+        pending += [p for p in self._pending if p in self._added_pending and p not in pending]
+        referenced = {e['path'] for e in sources.values()}
+        pending = [p for p in pending if p in referenced]
+
+        payload = json.dumps(
+            {'version': MANIFEST_VERSION, 'sources': sources, 'pending': pending},
+            ensure_ascii=False, indent=2
+        )
+        tmp_path = self.manifest_path.with_suffix('.tmp')
+        tmp_path.write_text(payload, encoding='utf-8')
+        os.replace(tmp_path, self.manifest_path)
+
+        self.sources, self._pending = sources, pending
+        self._changed_sources.clear()
+        self._added_pending.clear()
+        self._dropped_pending.clear()
+
+    def get(self, source: str) -> Optional[Dict[str, Any]]:
+        """Запись манифеста для источника, если его файл на месте"""
+        entry = self.sources.get(source)
+        if entry and (self.root / entry['path']).exists():
+            return entry
+        return None
+
+    def _object_path(self, sha256: str, filename: str) -> Path:
+        return self.objects_dir / sha256[:2] / sha256 / filename
+
+    def writer(self, source: str, filename: str, meta: Optional[Dict[str, Any]] = None) -> 'ContentWriter':
+        """
+        Запись содержимого источника по частям (для callback API, например ftplib.retrbinary)
+
+        Usage:
+            with store.writer(source, filename) as w:
+                ftp.retrbinary(f'RETR {name}', w.write)
+            sha256, path, changed = w.result
+        """
+        return ContentWriter(self, source, filename, meta)
+
+    def store_chunks(
+        self,
+        source: str,
+        chunks: Iterable[bytes],
+        filename: str,
+        meta: Optional[Dict[str, Any]] = None
+    ) -> Tuple[str, Path, bool]:
+        """
+        Сохраняет содержимое источника, вычисляя SHA-256 по ходу записи
+
+        Args:
+            source: URL или путь на FTP
+            chunks: Части содержимого
+            filename: Имя файла (сохраняется в пути объекта)
+            meta: Валидаторы источника для следующей проверки (etag, last_modified, ...)
+
+        Returns:
+            (sha256, путь к файлу, изменилось ли содержимое источника)
+        """
+        with self.writer(source, filename, meta) as w:
+            for chunk in chunks:
+                w.write(chunk)
+        return w.result
+
+    def store_file(
+        self,
+        source: str,
+        path: str,
+        filename: Optional[str] = None,
+        meta: Optional[Dict[str, Any]] = None
+    ) -> Tuple[str, Path, bool]:
+        """Сохраняет существующий файл (копированием); см. store_chunks"""
+        def chunks():
+            with open(path, 'rb') as f:
+                for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                    yield chunk
+        return self.store_chunks(source, chunks(), filename or os.path.basename(path), meta)
+
+    def adopt(
+        self,
+        source: str,
+        path: str,
+        filename: Optional[str] = None,
+        meta: Optional[Dict[str, Any]] = None
+    ) -> Tuple[str, Path, bool]:
+        """
+        Переносит готовый файл в хранилище без копирования (файл должен лежать на том же диске)
+
+        Файл после вызова удаляется или становится объектом хранилища; см. store_chunks.
+        """
+        hasher = hashlib.sha256()
+        size = 0
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                hasher.update(chunk)
+                size += len(chunk)
+        try:
+            return self._commit(source, Path(path), hasher.hexdigest(), size, filename or os.path.basename(path), meta)
+        finally:
+            if os.path.exists(path):
+                os.remove(path)
+
+    def _commit(
+        self,
+        source: str,
+        tmp_path: Path,
+        sha256: str,
+        size: int,
+        filename: str,
+        meta: Optional[Dict[str, Any]]
+    ) -> Tuple[str, Path, bool]:
+        """Помещает объект в хранилище и записывает источник в манифест на диске"""
+        # Объект и запись о нем появляются под блокировкой манифеста: prune() другого
+        # процесса не увидит объект без ссылки, даже если save() еще не вызван
+        with self._manifest_lock(), self._lock:
+            path = self._object_path(sha256, filename)
+            if not path.exists():
+                path.parent.mkdir(parents=True, exist_ok=True)
+                existing = next((p for p in path.parent.iterdir() if p.is_file()), None)
+                if existing is None:
+                    os.replace(tmp_path, path)
+                else:
+                    # Такое содержимое уже есть под другим именем - второй копии не храним
+                    try:
+                        os.link(existing, path)
+                    except OSError:
+                        os.replace(tmp_path, path)
+
+            relative = path.relative_to(self.root).as_posix()
+            previous = self.sources.get(source, {})
+            previous_path = previous.get('path')
+            # Новое имя того же содержимого (например, другая дата в имени) - не изменение
+            changed = previous.get('sha256') != sha256
+            self._changed_sources.add(source)
+            self.sources[source] = {
+                **(meta or {}),
+                'sha256': sha256,
+                'size': size,
+                'path': relative,
+                'stored_at': datetime.now().isoformat(timespec='seconds'),
+            }
+            if changed and relative not in self._pending:
+                self._pending.append(relative)
+                self._added_pending.add(relative)
+                self._dropped_pending.discard(relative)
+            elif previous_path in self._pending and previous_path != relative:
+                # Еще не разобранная версия переименована - в очереди остается под новым путем
+                self._pending[self._pending.index(previous_path)] = relative
+                self._added_pending.add(relative)
+                self._dropped_pending.add(previous_path)
+            self._merge_manifest()
+            return sha256, path, changed
+
+    def update_meta(self, source: str, meta: Dict[str, Any]):
+        """Обновляет валидаторы источника без изменения содержимого"""
+        with self._lock:
+            if source in self.sources:
+                self.sources[source].update(meta)
+                self._changed_sources.add(source)
+
+    def pending(self) -> List[Tuple[str, Path]]:
+        """Изменившиеся файлы, еще не переданные на разбор: (sha256, путь)"""
+        with self._lock:
+            current = {e['path']: e['sha256'] for e in self.sources.values()}
+            return [(current[p], self.root / p) for p in self._pending if p in current]
+
+    def mark_processed(self, path: Path):
+        """Отмечает файл из pending() как разобранный (файлы вне хранилища пропускаются)"""
+        try:
+            relative = Path(path).relative_to(self.root).as_posix()
+        except ValueError:
+            return
+        with self._lock:
+            if relative in self._pending:
+                self._pending.remove(relative)
+                self._added_pending.discard(relative)
+                self._dropped_pending.add(relative)
+
+    def current_files(self) -> List[Path]:
+        """Актуальные файлы всех источников (без дубликатов)"""
+        with self._lock:
+            paths = {e['path'] for e in self.sources.values()}
+        return sorted(self.root / p for p in paths)
+
+    def prune(self) -> int:
+        """
+        Удаляет версии, на которые не ссылается ни один источник
+
+        Манифест сначала сохраняется (объединяется с диском), чтобы не удалить файлы,
+        записанные другими процессами: _commit() вносит объект в манифест на диске
+        под той же блокировкой. Замененная версия больше не ждет разбора.
+
+        Returns:
+            Число удаленных файлов
+        """
+        with self._manifest_lock(), self._lock:
+            self._merge_manifest()
+            referenced = {e['path'] for e in self.sources.values()}
+            removed = 0
+            if self.objects_dir.exists():
+                for prefix_dir in self.objects_dir.iterdir():
+                    if not prefix_dir.is_dir():
+                        continue
+                    for object_dir in prefix_dir.iterdir():
+                        for path in object_dir.iterdir():
+                            if path.relative_to(self.root).as_posix() not in referenced:
+                                path.unlink()
+                                removed += 1
+                        if not any(object_dir.iterdir()):
+                            object_dir.rmdir()
+                    if not any(prefix_dir.iterdir()):
+                        prefix_dir.rmdir()
+            return removed
+
+
+class ContentWriter:
+    """Временный файл, который при успешном закрытии попадает в хранилище"""
+
+    def __init__(self, store: ContentStore, source: str, filename: str, meta: Optional[Dict[str, Any]]):
+        self.store = store
+        self.source = source
+        self.filename = filename
+        self.meta = meta
+        self.result: Optional[Tuple[str, Path, bool]] = None
+        self._hasher = hashlib.sha256()
+        self._size = 0
+        self._file = None
+        self._tmp_path = None
+
+    def __enter__(self) -> 'ContentWriter':
+        self.store.objects_dir.mkdir(parents=True, exist_ok=True)
+        fd, self._tmp_path = tempfile.mkstemp(dir=self.store.objects_dir, prefix='.incoming-', suffix='.tmp')
+        self._file = os.fdopen(fd, 'wb')
+        return self
+
+    def write(self, chunk: bytes):
+        if chunk:
+            self._hasher.update(chunk)
+            self._file.write(chunk)
+            self._size += len(chunk)
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            self._file.close()
+            if exc_type is None:
+                self.result = self.store._commit(
+                    self.source, Path(self._tmp_path), self._hasher.hexdigest(),
+                    self._size, self.filename, self.meta
+                )
+        finally:
+            if os.path.exists(self._tmp_path):
+                os.remove(self._tmp_path)
+        return False
+
+
+def is_content_store(directory: str) -> bool:
+    """Ведется ли в папке контентно-адресуемое хранилище"""
+    manifest_path = Path(directory) / MANIFEST_NAME
+    if not manifest_path.exists():
+        return False
+    try:
+        return json.loads(manifest_path.read_text(encoding='utf-8')).get('version') == MANIFEST_VERSION
+    except (OSError, ValueError):
+        return False
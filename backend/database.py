@@ -0,0 +1,133 @@
+"""
+Подключение к БД расписания (PostgreSQL)
+Общие настройки для API сервера и скриптов
+"""
+import os
+import threading
+import psycopg2
+from psycopg2 import pool
+from dotenv import load_dotenv
+
+# Загружаем переменные окружения из .env файла
+load_dotenv()
+
+# Настройки подключения к БД
+# Используем прямые значения для надежности
+DB_CONFIG = {
+    'host': os.getenv('DB_HOST', 'localhost'),
+    'port': int(os.getenv('DB_PORT', '5432')),
+    'database': os.getenv('DB_NAME', 'postgres'),
+    'user': os.getenv('DB_USER', 'postgres'),
+    'password': os.getenv('DB_PASSWORD', '7631')
+}
+
+# Размер пула соединений на процесс (0 - без пула, новое соединение на каждый запрос)
+# Количество потоков воркера подбирается под этот размер (см. gunicorn.conf.py, serve.py)
+DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', '8'))
+# Сколько секунд ждать свободное соединение, если все заняты
+DB_POOL_TIMEOUT = float(os.getenv('DB_POOL_TIMEOUT', '10'))
+
+_pool = None
+_pool_pid = None
+_pool_slots = None
+_pool_lock = threading.Lock()
+
+
+class PooledConnection:
+    """
+    Соединение из пула
+
+    Ведет себя как обычное соединение psycopg2, но close() возвращает его в пул.
+    Незакоммиченная транзакция при возврате откатывается.
+    """
+
+    def __init__(self, connection_pool, slots, conn):
+        self._pool = connection_pool
+        self._slots = slots
+        self._conn = conn
+
+    def close(self):
+        """Возвращает соединение в пул"""
+        if self._conn is None:
+            return
+        conn, self._conn = self._conn, None
+        try:
+            broken = bool(conn.closed)
+            if not broken:
+                try:
+                    conn.rollback()
+                except Exception:
+                    broken = True
+            self._pool.putconn(conn, close=broken)
+        finally:
+            self._slots.release()
+
+    @property
+    def closed(self):
+        return 1 if self._conn is None else self._conn.closed
+
+    def __getattr__(self, name):
+        if self._conn is None:
+            raise psycopg2.InterfaceError("connection already returned to pool")
+        return getattr(self._conn, name)
+
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
+
+
+def _get_pool():
+    """Пул создается лениво в каждом процессе (после fork воркера)"""
+    global _pool, _pool_pid, _pool_slots
+    pid = os.getpid()
+    if _pool is None or _pool_pid != pid:
+        with _pool_lock:
+            if _pool is None or _pool_pid != pid:
+                _pool = pool.ThreadedConnectionPool(0, DB_POOL_SIZE, **DB_CONFIG)
+                _pool_slots = threading.BoundedSemaphore(DB_POOL_SIZE)
+                _pool_pid = pid
+    return _pool, _pool_slots
+
+
+def reset_pool():
+    """Сбрасывает пул (вызывается в воркере после fork, соединения родителя не используются)"""
+    global _pool, _pool_pid, _pool_slots
+    with _pool_lock:
+        _pool = None
+        _pool_pid = None
+        _pool_slots = None
+
+
+def close_pool():
+    """Закрывает все соединения пула текущего процесса"""
+    global _pool
+    with _pool_lock:
+        if _pool is not None and _pool_pid == os.getpid():
+            _pool.closeall()
+        _pool = None
+
+
+def get_db_connection():
+    """Создает подключение к БД (из пула, если он включен)"""
+    try:
+        if DB_POOL_SIZE <= 0:
+            return psycopg2.connect(**DB_CONFIG)
+
+        connection_pool, slots = _get_pool()
+        if not slots.acquire(timeout=DB_POOL_TIMEOUT):
+            raise pool.PoolError(f"Нет свободных соединений в пуле за {DB_POOL_TIMEOUT} с")
+        try:
+            conn = connection_pool.getconn()
+            if conn.closed:
+                # Соединение разорвано (например, перезапуск PostgreSQL) - берем новое
+                connection_pool.putconn(conn, close=True)
+                conn = connection_pool.getconn()
+        except Exception:
+            slots.release()
+            raise
+        return PooledConnection(connection_pool, slots, conn)
+    except Exception as e:
+        print(f"Ошибка подключения к БД: {e}")
+        raise
@@ -6,7 +6,8 @@ import psycopg2
 from psycopg2 import pool
 from psycopg2.extras import RealDictCursor
 import os
-from typing import Optional, Dict, List, Any
+import uuid
+from typing import Optional, Dict, List, Any, Iterator
 from contextlib import contextmanager
 import logging
 
@@ -63,7 +64,9 @@ class ARMAPostgreSQLConnector:
             f"password={password}"
         )
         
-        # Пул соединений
+        # Пул соединений (max_connections - предел параллельных запросов к АРМА)
+        self.min_connections = min_connections
+        self.max_connections = max_connections
         self.connection_pool: Optional[pool.ThreadedConnectionPool] = None
         self._init_connection_pool(min_connections, max_connections)
     
@@ -143,6 +146,49 @@ class ARMAPostgreSQLConnector:
             logger.error(f"Запрос: {query}")
             raise
     
+    def stream_query(
+        self,
+        query: str,
+        params: Optional[tuple] = None,
+        itersize: int = 2000
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Выполнение SELECT запроса с построчной выдачей результатов
+        
+        Использует именованный (серверный) курсор: строки приходят с сервера
+        пачками по itersize, поэтому память не растет с размером выборки.
+        Соединение занято, пока генератор не исчерпан или не закрыт.
+        
+        Args:
+            query: SQL запрос
+            params: Параметры запроса
+            itersize: Сколько строк забирать с сервера за один раз
+        
+        Yields:
+            Словари с результатами
+        """
+        conn = self.connection_pool.getconn()
+        cursor = None
+        try:
+            cursor = conn.cursor(name=f"stream_{uuid.uuid4().hex}", cursor_factory=RealDictCursor)
+            cursor.itersize = itersize
+            cursor.execute(query, params)
+            for row in cursor:
+                yield dict(row)
+        except Exception as e:
+            logger.error(f"Ошибка потокового запроса: {e}")
+            logger.error(f"Запрос: {query}")
+            raise
+        finally:
+            try:
+                if cursor is not None and not cursor.closed:
+                    cursor.close()
+                # Серверный курсор живет в транзакции - завершаем ее (только чтение)
+                conn.rollback()
+            except Exception:
+                pass
+            self.connection_pool.putconn(conn)
+    
     def execute_update(self, query: str, params: Optional[tuple] = None) -> int:
         """
         Выполнение INSERT/UPDATE/DELETE запроса
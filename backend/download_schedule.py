@@ -4,16 +4,20 @@
 """
 import os
 import sys
+import time
+import threading
 import requests
 from bs4 import BeautifulSoup
 from pathlib import Path
 from datetime import datetime
 from urllib.parse import urljoin
 from email.utils import parsedate_to_datetime
+from concurrent.futures import ThreadPoolExecutor
 from requests.adapters import HTTPAdapter, Retry
-import json
 import io
 
+from content_store import ContentStore
+
 # Устанавливаем UTF-8 для вывода на Windows
 if sys.platform == 'win32':
     sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
@@ -24,51 +28,46 @@ class ScheduleDownloader:
     
     BASE_URL = "https://bteu.by/studentu/obrazovanie-i-praktika/raspisanie-zanyatij"
     
-    def __init__(self, download_dir: str):
+    def __init__(self, download_dir: str, max_workers: int = None, on_change=None):
         """
         Инициализация загрузчика
         
         Args:
             download_dir: Директория для сохранения файлов
+            max_workers: Число параллельных загрузок (по умолчанию DOWNLOAD_WORKERS или 8)
+            on_change: Вызывается с путем каждого файла, содержимое которого изменилось,
+                сразу после его загрузки (например, pipeline.IngestPipeline.submit)
         """
         self.download_dir = Path(download_dir)
         self.download_dir.mkdir(parents=True, exist_ok=True)
+        self.max_workers = max_workers or int(os.getenv('DOWNLOAD_WORKERS', '8'))
+        self.on_change = on_change
         
-        # Создаем сессию с повторными попытками
+        # Создаем сессию с повторными попытками; пул соединений не меньше числа потоков,
+        # чтобы keep-alive соединения переиспользовались, а не открывались заново
         self.session = requests.Session()
         retries = Retry(total=3, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504])
-        self.session.mount("http://", HTTPAdapter(max_retries=retries))
-        self.session.mount("https://", HTTPAdapter(max_retries=retries))
+        adapter = HTTPAdapter(max_retries=retries, pool_connections=self.max_workers, pool_maxsize=self.max_workers)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
         self.session.headers.update({
             "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) Chrome/91.0.4472.124"
         })
         
-        # Манифест для отслеживания скачанных файлов
-        self.manifest_path = self.download_dir / ".manifest.json"
-        self.manifest = self._load_manifest()
+        # Файлы хранятся по SHA-256 содержимого, манифест - .manifest.json (см. content_store)
+        self.store = ContentStore(str(self.download_dir))
         self.new_files = []
-    
-    def _load_manifest(self) -> dict:
-        """Загружает манифест скачанных файлов"""
-        if self.manifest_path.exists():
-            try:
-                return json.loads(self.manifest_path.read_text(encoding='utf-8'))
-            except:
-                return {}
-        return {}
-    
-    def _save_manifest(self):
-        """Сохраняет манифест"""
-        self.manifest_path.write_text(
-            json.dumps(self.manifest, ensure_ascii=False, indent=2),
-            encoding='utf-8'
-        )
+        self._lock = threading.Lock()
+        self._log_lock = threading.Lock()
+        self.stats = {'files': 0, 'downloaded': 0, 'changed': 0, 'not_modified': 0, 'failed': 0, 'bytes': 0, 'pruned': 0}
     
     def _log(self, message: str):
         """Логирование"""
         timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         log_message = f"[{timestamp}] {message}"
-        print(log_message)
+        # Потоки загрузки пишут в лог одновременно - строка выводится целиком
+        with self._log_lock:
+            print(log_message)
     
     def _get_links(self, url: str) -> list:
         """Получает все ссылки со страницы"""
@@ -85,72 +84,79 @@ class ScheduleDownloader:
         """Проверяет, является ли ссылка Excel файлом"""
         return url.lower().endswith(('.xls', '.xlsx'))
     
-    def _get_file_modification_date(self, url: str) -> str:
-        """Получает дату модификации файла"""
+    @staticmethod
+    def _format_mod_date(last_modified: str) -> str:
+        """Дата модификации файла из заголовка Last-Modified"""
         try:
-            response = self.session.head(url, timeout=10)
-            response.raise_for_status()
-            last_modified = response.headers.get("Last-Modified")
             if last_modified:
-                date_obj = parsedate_to_datetime(last_modified)
-                return date_obj.strftime("%d.%m.%y")
-        except:
+                return parsedate_to_datetime(last_modified).strftime("%d.%m.%y")
+        except (TypeError, ValueError):
             pass
         return "unknown"
     
-    def _should_download(self, url: str, headers: dict) -> bool:
-        """Определяет, нужно ли скачивать файл"""
-        server_len = int(headers.get("Content-Length", 0)) if headers.get("Content-Length", "").isdigit() else None
-        server_lm = headers.get("Last-Modified")
-        server_etag = headers.get("ETag")
-        
-        old = self.manifest.get(url, {})
-        if server_etag and old.get("etag") == server_etag:
-            return False
-        if server_len == old.get("size") and server_lm == old.get("last_modified"):
-            return False
-        return True
+    def _conditional_headers(self, url: str) -> dict:
+        """Заголовки условного запроса по данным манифеста (если локальная копия на месте)"""
+        old = self.store.get(url)
+        if not old:
+            return {}
+        headers = {}
+        if old.get("etag"):
+            headers["If-None-Match"] = old["etag"]
+        if old.get("last_modified"):
+            headers["If-Modified-Since"] = old["last_modified"]
+        return headers
     
     def _download_file(self, url: str):
-        """Скачивает файл"""
+        """
+        Скачивает файл одним условным запросом
+        
+        Сервер отвечает 304, если файл не изменился с прошлой загрузки; иначе содержимое
+        хэшируется по ходу записи во временный файл и попадает в хранилище. Файл считается
+        новым, только если изменился его SHA-256 (а не размер или дата).
+        """
         orig_name = os.path.basename(url)
         name_part, ext = os.path.splitext(orig_name)
-        mod_date = self._get_file_modification_date(url)
-        new_name = f"{name_part} ({mod_date}){ext}"
-        file_path = self.download_dir / new_name
         
-        # Проверяем, нужно ли скачивать
-        need = True
         try:
-            h = self.session.head(url, timeout=10, allow_redirects=True)
-            h.raise_for_status()
-            need = self._should_download(url, h.headers)
-        except:
-            pass
-        
-        if not need and file_path.exists():
-            self._log(f"Пропуск {new_name} (не изменился)")
-            return
-        
-        try:
-            with self.session.get(url, stream=True, timeout=20) as r:
+            with self.session.get(url, stream=True, timeout=20, headers=self._conditional_headers(url)) as r:
+                if r.status_code == 304:
+                    with self._lock:
+                        self.stats['not_modified'] += 1
+                    self._log(f"Пропуск {orig_name} (не изменился)")
+                    return
                 r.raise_for_status()
-                with open(file_path, "wb") as f:
-                    for chunk in r.iter_content(8192):
-                        if chunk:
-                            f.write(chunk)
+                
+                new_name = f"{name_part} ({self._format_mod_date(r.headers.get('Last-Modified'))}){ext}"
+                sha256, file_path, changed = self.store.store_chunks(
+                    url, r.iter_content(65536), new_name,
+                    meta={"last_modified": r.headers.get("Last-Modified"), "etag": r.headers.get("ETag")}
+                )
             
-            self.manifest[url] = {
-                "size": os.path.getsize(file_path),
-                "last_modified": r.headers.get("Last-Modified"),
-                "etag": r.headers.get("ETag"),
-                "local_name": new_name
-            }
-            self.new_files.append(str(file_path))
-            self._log(f"✓ Скачан: {new_name}")
+            size = os.path.getsize(file_path)
+            with self._lock:
+                self.stats['downloaded'] += 1
+                self.stats['bytes'] += size
+                if changed:
+                    self.stats['changed'] += 1
+                    self.new_files.append(str(file_path))
+            if changed:
+                self._log(f"✓ Скачан: {new_name} (sha256 {sha256[:12]})")
+                if self.on_change is not None:
+                    self.on_change(file_path)
+            else:
+                self._log(f"Пропуск {new_name} (содержимое не изменилось)")
         except Exception as e:
+            with self._lock:
+                self.stats['failed'] += 1
             self._log(f"✗ Ошибка скачивания {orig_name}: {e}")
     
+    def _list_subfolder(self, sub: str) -> list:
+        """Excel файлы подпапки"""
+        sub_name = Path(sub.rstrip("/")).name
+        xls_files = [l for l in self._get_links(sub) if self._is_excel_file(l)]
+        self._log(f">>> Подпапка: {sub_name} - Excel файлов: {len(xls_files)}")
+        return xls_files
+    
     def download_all(self):
         """Скачивает все Excel файлы с сайта"""
         self._log("=" * 70)
@@ -158,29 +164,35 @@ class ScheduleDownloader:
         self._log(f"Директория сохранения: {self.download_dir}")
         self._log("=" * 70)
         
+        started = time.perf_counter()
         main_links = self._get_links(self.BASE_URL)
         subfolders = [
             l for l in main_links 
             if self.BASE_URL in l and not self._is_excel_file(l) and l != self.BASE_URL and l.endswith("/")
         ]
         
-        for sub in subfolders:
-            sub_name = Path(sub.rstrip("/")).name
-            self._log(f"\n>>> Подпапка: {sub_name}")
-            
-            links = self._get_links(sub)
-            xls_files = [l for l in links if self._is_excel_file(l)]
-            
-            if not xls_files:
-                self._log(f"Нет Excel файлов в {sub_name}")
-                continue
-            
-            for url in xls_files:
-                self._download_file(url)
+        # Страницы подпапок и файлы обрабатываются параллельно общей сессией
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='download') as executor:
+            xls_files = list(dict.fromkeys(
+                url for files in executor.map(self._list_subfolder, subfolders) for url in files
+            ))
+            self.stats['files'] = len(xls_files)
+            list(executor.map(self._download_file, xls_files))
         
-        self._save_manifest()
+        # Старые версии файлов больше не нужны - на них не ссылается ни один источник
+        self.stats['pruned'] = self.store.prune()
+        self.store.save()
+        elapsed = time.perf_counter() - started
+        megabytes = self.stats['bytes'] / (1024 * 1024)
         self._log(f"\n{'=' * 70}")
         self._log(f"ЗАГРУЗКА ЗАВЕРШЕНА! Скачано новых файлов: {len(self.new_files)}")
+        self._log(
+            f"Файлов: {self.stats['files']}, изменились: {self.stats['changed']}, "
+            f"не изменились: {self.stats['not_modified'] + self.stats['downloaded'] - self.stats['changed']}, "
+            f"ошибок: {self.stats['failed']}, удалено старых версий: {self.stats['pruned']}; "
+            f"{megabytes:.1f} МБ за {elapsed:.1f} с "
+            f"({megabytes / elapsed if elapsed else 0:.2f} МБ/с, потоков: {self.max_workers})"
+        )
         self._log("=" * 70)
         
         return len(self.new_files)
@@ -201,6 +213,13 @@ def main():
         help='Директория для сохранения файлов (по умолчанию: D:\\Excel file)'
     )
     
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=None,
+        help='Число параллельных загрузок (по умолчанию: DOWNLOAD_WORKERS или 8)'
+    )
+    
     args = parser.parse_args()
     
     print("=" * 70)
@@ -208,7 +227,7 @@ def main():
     print("=" * 70)
     print()
     
-    downloader = ScheduleDownloader(args.dir)
+    downloader = ScheduleDownloader(args.dir, max_workers=args.workers)
     files_count = downloader.download_all()
     
     print()
@@ -217,8 +236,8 @@ def main():
     print()
     
     if files_count > 0:
-        print("Следующий шаг: обработайте файлы через batch_parser.py")
-        print(f"  python backend/batch_parser.py --dir \"{args.dir}\"")
+        print("Следующий шаг: обработайте новые файлы через batch_parser.py")
+        print(f"  python backend/batch_parser.py --dir \"{args.dir}\" --pending")
     else:
         print("Новых файлов не найдено. Все файлы уже скачаны.")
 
@@ -9,6 +9,8 @@ from openpyxl import load_workbook, Workbook
 from openpyxl.cell import Cell
 from openpyxl.worksheet.worksheet import Worksheet
 
+from bell_schedule import get_bell_schedule
+
 
 class ExcelScheduleParserV2:
     """Парсер Excel файлов с расписанием (столбцовый формат)"""
@@ -394,34 +396,10 @@ class ExcelScheduleParserV2:
         return None
     
     def _get_lesson_number_from_time(self, time_str: str) -> int:
-        """Определяет номер пары по времени занятия"""
-        time_str_lower = time_str.lower().replace(' ', '')
-        
-        # Соответствие времени и номера пары
-        # Пара 1: 9:00-9:45 и 9:50-10:35
-        if any(t in time_str_lower for t in ['9:00-9:45', '9.00-9.45', '9:50-10:35', '9.50-10.35']):
-            return 1
-        # Пара 2: 10:50-11:35 и 11:40-12:25
-        elif any(t in time_str_lower for t in ['10:50-11:35', '10.50-11.35', '11:40-12:25', '11.40-12.25']):
-            return 2
-        # Пара 3: 12:55-13:40 и 13:45-14:30
-        elif any(t in time_str_lower for t in ['12:55-13:40', '12.55-13.40', '13:45-14:30', '13.45-14.30']):
-            return 3
-        # Пара 4: 14:40-15:25 и 15:30-16:15
-        elif any(t in time_str_lower for t in ['14:40-15:25', '14.40-15.25', '15:30-16:15', '15.30-16.15']):
-            return 4
-        # Пара 5: 16:25-17:10 и 17:15-18:00
-        elif any(t in time_str_lower for t in ['16:25-17:10', '16.25-17.10', '17:15-18:00', '17.15-18.00']):
-            return 5
-        # Пара 6: 18:10-18:55 и 19:00-19:45 (если есть)
-        elif any(t in time_str_lower for t in ['18:10-18:55', '18.10-18.55', '19:00-19:45', '19.00-19.45']):
-            return 6
-        # Пара 7: 19:50-20:35 и 20:40-21:25 (если есть)
-        elif any(t in time_str_lower for t in ['19:50-20:35', '19.50-20.35', '20:40-21:25', '20.40-21.25']):
-            return 7
-        else:
-            # Если время не распознано, возвращаем 0 (будет использовано предыдущее значение)
-            return 0
+        """Определяет номер пары по времени занятия (по расписанию звонков, bell_schedule.py)"""
+        # Половина пары ("9.50-10.35") относится к паре, в которую попадает ее начало;
+        # если время не распознано, возвращаем 0 (будет использовано предыдущее значение)
+        return get_bell_schedule().lesson_number_from_text(time_str)
     
     def _is_time_format(self, time_str: str) -> bool:
         """Проверяет, является ли строка временем"""
@@ -0,0 +1,261 @@
+"""
+Синхронизация папки FTP сервера с локальным хранилищем (content_store)
+
+- список файлов одним запросом MLSD (имя, тип, размер, время изменения);
+  если сервер не поддерживает MLSD - LIST + SIZE/MDTM по файлу
+- файлы с тем же размером и временем изменения, что в манифесте, не скачиваются
+- несколько файлов скачиваются параллельно, у каждого потока свое FTP соединение
+- прерванная загрузка остается в .partial/ и при следующем запуске продолжается
+  с места обрыва командой REST, если файл на сервере не менялся
+"""
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from ftplib import FTP, error_perm
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from content_store import ContentStore
+
+PARTIAL_DIR = '.partial'
+
+
+@dataclass
+class RemoteFile:
+    """Файл на FTP сервере"""
+    name: str
+    size: Optional[int]
+    modified: Optional[str]  # YYYYMMDDHHMMSS (UTC), как в MLSD/MDTM
+
+
+class FtpSync:
+    """Синхронизация одной папки FTP сервера"""
+
+    def __init__(
+        self,
+        local_dir: str,
+        host: str,
+        user: str,
+        password: str,
+        folder: str = '',
+        port: int = 21,
+        workers: Optional[int] = None,
+        timeout: float = 30,
+        log=print,
+        on_change=None
+    ):
+        """
+        Args:
+            local_dir: Папка хранилища
+            host, port, user, password: Параметры FTP сервера
+            folder: Папка на сервере
+            workers: Число параллельных соединений (по умолчанию FTP_WORKERS или 3)
+            timeout: Таймаут операций FTP, секунд
+            log: Функция логирования
+            on_change: Вызывается с путем каждого файла, содержимое которого изменилось
+                (например, pipeline.IngestPipeline.submit)
+        """
+        self.store = ContentStore(local_dir)
+        self.partial_dir = Path(local_dir) / PARTIAL_DIR
+        self.host = host
+        self.port = port
+        self.user = user
+        self.password = password
+        self.folder = folder
+        self.workers = workers or int(os.getenv('FTP_WORKERS', '3'))
+        self.timeout = timeout
+        self.log = log
+        self.on_change = on_change
+        self._local = threading.local()
+        self._connections: List[FTP] = []
+        self._lock = threading.Lock()
+        self.stats = {
+            'files': 0, 'downloaded': 0, 'changed': 0, 'skipped': 0,
+            'resumed': 0, 'failed': 0, 'bytes': 0, 'pruned': 0,
+        }
+
+    def source(self, name: str) -> str:
+        """Идентификатор источника в манифесте"""
+        return f"ftp://{self.host}/{self.folder.strip('/')}/{name}" if self.folder else f"ftp://{self.host}/{name}"
+
+    def connect(self) -> FTP:
+        """Новое соединение: вход, переход в папку, двоичный режим"""
+        ftp = FTP(timeout=self.timeout)
+        ftp.connect(self.host, self.port)
+        ftp.login(self.user, self.password)
+        if self.folder:
+            ftp.cwd(self.folder)
+        ftp.voidcmd('TYPE I')
+        return ftp
+
+    def _thread_connection(self) -> FTP:
+        """Соединение текущего потока (переиспользуется для всех его файлов)"""
+        ftp = getattr(self._local, 'ftp', None)
+        if ftp is None:
+            ftp = self.connect()
+            self._local.ftp = ftp
+            with self._lock:
+                self._connections.append(ftp)
+        return ftp
+
+    def _drop_thread_connection(self):
+        ftp = getattr(self._local, 'ftp', None)
+        self._local.ftp = None
+        if ftp is not None:
+            try:
+                ftp.close()
+            except Exception:
+                pass
+
+    def list_files(self, ftp: FTP) -> List[RemoteFile]:
+        """Файлы папки: MLSD одним запросом, иначе LIST + SIZE/MDTM"""
+        try:
+            return [
+                RemoteFile(name, int(facts['size']) if 'size' in facts else None, facts.get('modify', '')[:14] or None)
+                for name, facts in ftp.mlsd(facts=['type', 'size', 'modify'])
+                if facts.get('type') == 'file'
+            ]
+        except error_perm:
+            pass
+
+        files = []
+        for name in ftp.nlst():
+            if name in ('.', '..'):
+                continue
+            try:
+                size = ftp.size(name)
+            except error_perm:
+                # Папка или нет доступа
+                continue
+            try:
+                modified = ftp.voidcmd(f"MDTM {name}").split()[-1][:14]
+            except error_perm:
+                modified = None
+            files.append(RemoteFile(name, size, modified))
+        return files
+
+    def is_current(self, remote: RemoteFile) -> bool:
+        """Локальная копия актуальна: совпадают размер и время изменения на сервере"""
+        entry = self.store.get(self.source(remote.name))
+        return bool(
+            entry and remote.modified
+            and entry.get('modified') == remote.modified
+            and entry.get('size') == remote.size
+        )
+
+    def _partial_path(self, remote: RemoteFile) -> Path:
+        # Время изменения в имени: если файл на сервере поменялся, старый обрывок не продолжается
+        return self.partial_dir / f"{remote.name}.{remote.modified or 'unknown'}.part"
+
+    def download(self, remote: RemoteFile):
+        """Скачивает файл (с продолжением обрыва) и кладет его в хранилище"""
+        partial = self._partial_path(remote)
+        offset = partial.stat().st_size if partial.exists() else 0
+        if remote.size is not None and offset > remote.size:
+            partial.unlink()
+            offset = 0
+
+        try:
+            ftp = self._thread_connection()
+            if remote.size is None or offset < remote.size:
+                with open(partial, 'ab') as f:
+                    ftp.retrbinary(f"RETR {remote.name}", f.write, rest=offset or None)
+            if offset:
+                with self._lock:
+                    self.stats['resumed'] += 1
+        except Exception as e:
+            # Обрывок не удаляется - следующий запуск продолжит с этого места
+            self._drop_thread_connection()
+            with self._lock:
+                self.stats['failed'] += 1
+            self.log(f"✗ Ошибка скачивания {remote.name}: {e}")
+            return
+
+        size = partial.stat().st_size
+        if remote.size is not None and size != remote.size:
+            with self._lock:
+                self.stats['failed'] += 1
+            self.log(f"✗ {remote.name}: получено {size} из {remote.size} байт")
+            return
+
+        sha256, path, changed = self.store.adopt(
+            self.source(remote.name), str(partial), remote.name,
+            meta={'modified': remote.modified}
+        )
+        with self._lock:
+            self.stats['downloaded'] += 1
+            self.stats['bytes'] += size - offset
+            if changed:
+                self.stats['changed'] += 1
+        if changed:
+            self.log(f"✓ Скачан: {remote.name} ({size:,} байт, sha256 {sha256[:12]})"
+                     + (f", продолжен с {offset:,}" if offset else ""))
+            if self.on_change is not None:
+                self.on_change(path)
+        else:
+            self.log(f"⏭ {remote.name}: содержимое не изменилось")
+
+    def sync(self) -> Dict:
+        """
+        Синхронизирует папку
+
+        Returns:
+            Отчет: files, downloaded, changed, skipped, resumed, failed, bytes, pruned, elapsed_seconds
+        """
+        started = time.perf_counter()
+        self.partial_dir.mkdir(parents=True, exist_ok=True)
+
+        ftp = self.connect()
+        try:
+            remote_files = self.list_files(ftp)
+        finally:
+            try:
+                ftp.quit()
+            except Exception:
+                ftp.close()
+
+        self.stats['files'] = len(remote_files)
+        to_download = []
+        for remote in remote_files:
+            if self.is_current(remote):
+                self.stats['skipped'] += 1
+            else:
+                to_download.append(remote)
+        self.log(f"Файлов на сервере: {len(remote_files)}, к загрузке: {len(to_download)}")
+
+        try:
+            with ThreadPoolExecutor(max_workers=max(1, min(self.workers, len(to_download) or 1)),
+                                    thread_name_prefix='ftp') as executor:
+                list(executor.map(self.download, to_download))
+        finally:
+            for connection in self._connections:
+                try:
+                    connection.quit()
+                except Exception:
+                    connection.close()
+            self._connections.clear()
+
+        # Обрывки файлов, которых больше нет на сервере или которые изменились
+        expected = {self._partial_path(r).name for r in to_download}
+        for partial in self.partial_dir.glob('*.part'):
+            if partial.name not in expected:
+                partial.unlink()
+
+        self.stats['pruned'] = self.store.prune()
+        self.store.save()
+        self.stats['elapsed_seconds'] = round(time.perf_counter() - started, 3)
+        return dict(self.stats)
+
+
+def format_report(report: Dict) -> str:
+    """Строка отчета для лога"""
+    megabytes = report['bytes'] / (1024 * 1024)
+    elapsed = report.get('elapsed_seconds') or 0
+    return (
+        f"Файлов: {report['files']}, скачано: {report['downloaded']} (изменились {report['changed']}, "
+        f"продолжено {report['resumed']}), пропущено: {report['skipped']}, ошибок: {report['failed']}, "
+        f"удалено старых версий: {report['pruned']}; {megabytes:.1f} МБ за {elapsed:.1f} с"
+    )
+
@@ -0,0 +1,76 @@
+"""
+Конфигурация gunicorn для продакшена (Linux)
+
+Запуск:
+    gunicorn -c gunicorn.conf.py
+Плавный перезапуск с новым кодом:
+    WEB_PRELOAD включен (по умолчанию) - замена мастера:
+        kill -USR2 $(cat gunicorn.pid)           # новый мастер с новым кодом
+        kill -QUIT $(cat gunicorn.pid.oldbin)    # после старта новых воркеров
+    WEB_PRELOAD=0:
+        kill -HUP $(cat gunicorn.pid)
+
+Все параметры переопределяются переменными окружения (WEB_WORKERS, WEB_THREADS, ...).
+"""
+import multiprocessing
+import os
+from database import DB_POOL_SIZE
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ('1', 'true', 'yes', 'on')
+
+
+# Приложение, собранное при импорте server.py (набор компонентов задается API_COMPONENTS).
+# Не 'server:create_app()': импорт модуля уже создает app, и фабрика собрала бы второе
+wsgi_app = 'server:app'
+
+bind = os.getenv('BIND', f"{os.getenv('HOST', '0.0.0.0')}:{os.getenv('PORT', '8000')}")
+
+# Воркеры: 2 * CPU + 1, но не больше WEB_MAX_WORKERS (каждый воркер держит свой пул соединений с БД)
+_cpu_workers = multiprocessing.cpu_count() * 2 + 1
+workers = int(os.getenv('WEB_WORKERS', min(_cpu_workers, int(os.getenv('WEB_MAX_WORKERS', '9')))))
+
+# Потоки воркера = размер пула соединений: каждый поток получает свое соединение без ожидания
+worker_class = 'gthread'
+threads = int(os.getenv('WEB_THREADS', max(DB_POOL_SIZE, 1)))
+
+# preload: приложение импортируется один раз в мастере, воркеры стартуют быстрее и делят память.
+# Внимание: с preload сигнал HUP не подхватывает новый код - нужна замена мастера (USR2 + QUIT)
+preload_app = _env_bool('WEB_PRELOAD', True)
+reload = _env_bool('WEB_RELOAD', False)
+
+timeout = int(os.getenv('WEB_TIMEOUT', '60'))
+graceful_timeout = int(os.getenv('WEB_GRACEFUL_TIMEOUT', '30'))
+keepalive = int(os.getenv('WEB_KEEPALIVE', '5'))
+
+# Периодический перезапуск воркеров защищает от утечек памяти
+max_requests = int(os.getenv('WEB_MAX_REQUESTS', '2000'))
+max_requests_jitter = int(os.getenv('WEB_MAX_REQUESTS_JITTER', '200'))
+
+pidfile = os.getenv('WEB_PIDFILE', 'gunicorn.pid')
+accesslog = os.getenv('WEB_ACCESS_LOG', '-')
+errorlog = os.getenv('WEB_ERROR_LOG', '-')
+loglevel = os.getenv('WEB_LOG_LEVEL', 'info')
+
+
+def post_fork(server, worker):
+    """Каждый воркер создает собственный пул соединений"""
+    from database import reset_pool
+    reset_pool()
+
+
+def worker_exit(server, worker):
+    """Закрываем соединения с БД при остановке воркера"""
+    from database import close_pool
+    close_pool()
+
+
+def when_ready(server):
+    server.log.info(
+        f"BTEU Schedule API: {workers} воркеров x {threads} потоков, "
+        f"пул БД {DB_POOL_SIZE} на воркер, preload={'on' if preload_app else 'off'}"
+    )
@@ -0,0 +1,232 @@
+"""
+Общий путь загрузки расписания из Excel файлов в БД
+
+Разбор и проверка файла (parse_schedule_file) не обращаются к БД, поэтому могут
+выполняться в отдельном процессе; запись (save_lessons) идет в транзакции вызывающего.
+Используется API (parse-excel, batch-parse) и конвейером pipeline.py.
+"""
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from psycopg2.extras import execute_batch, execute_values
+
+# Доля ошибок валидации, при которой файл не загружается
+MAX_VALIDATION_ERROR_SHARE = 0.3
+
+# Справочники текстовых полей занятия (миграция 004_lesson_dimensions):
+# поле -> (написания, канонические строки, ссылка написания на них)
+DIMENSIONS = (
+    ('subject', 'subject_names', 'subjects', 'subject_id'),
+    ('teacher', 'teacher_names', 'teachers', 'teacher_id'),
+    ('classroom', 'classroom_names', 'classrooms', 'classroom_id'),
+)
+
+
+def is_valid_lesson(lesson: Dict) -> bool:
+    """Базовая проверка занятия перед сохранением"""
+    return bool(
+        lesson.get('subject') and
+        lesson.get('day_of_week') and 1 <= lesson['day_of_week'] <= 6 and
+        lesson.get('lesson_number') and 1 <= lesson['lesson_number'] <= 7 and
+        lesson.get('group_id') and
+        lesson.get('week_parity')
+    )
+
+
+def parse_schedule_file(file_path: str, group_code: str, group_id: int) -> Dict:
+    """
+    Разбирает и проверяет файл расписания группы
+
+    Args:
+        file_path: Путь к Excel файлу
+        group_code: Код группы
+        group_id: ID группы
+
+    Returns:
+        {'lessons': валидные занятия, 'lessons_parsed', 'lessons_filtered',
+         'validation_errors': список ошибок валидации (до 10),
+         'error': причина отказа или None, 'warning': пустой файл или None}
+    """
+    from excel_parser import ExcelScheduleParser
+
+    parser = ExcelScheduleParser(str(file_path))
+    lessons = parser.parse(group_code, group_id)
+    is_valid, errors = parser.validate_lessons(lessons)
+
+    result = {
+        'lessons': [],
+        'lessons_parsed': len(lessons),
+        'lessons_filtered': 0,
+        'validation_errors': errors[:10],
+        'errors_count': len(errors),
+        'error': None,
+        'warning': None,
+    }
+    if not is_valid:
+        # Если занятий нет, это не ошибка валидации, а пустой файл
+        if not lessons:
+            result['warning'] = 'Файл не содержит занятий или имеет неподдерживаемый формат'
+            return result
+        if len(errors) >= len(lessons) * MAX_VALIDATION_ERROR_SHARE:
+            result['error'] = 'Слишком много ошибок валидации'
+            return result
+
+    valid_lessons = [lesson for lesson in lessons if is_valid_lesson(lesson)]
+    result['lessons'] = valid_lessons
+    result['lessons_filtered'] = len(lessons) - len(valid_lessons)
+    return result
+
+
+def normalize_name(value: str) -> str:
+    """Ключ справочника: без учета регистра и лишних пробелов (как lesson_name_key в БД)"""
+    return ' '.join(value.split()).lower()
+
+
+def intern_names(cur, names_table: str, table: str, column: str,
+                 names: Iterable[Optional[str]]) -> Dict[str, int]:
+    """
+    ID написания справочника для каждого текста: один запрос на известные, два на новые
+
+    Новое написание ссылается на каноническую строку своего ключа (normalize_name),
+    поэтому варианты регистра и пробелов получают один ID справочника.
+    Словарь строится заново в каждой транзакции записи: ID, вставленные в откатанной
+    точке сохранения, не должны попасть в следующий файл.
+
+    Args:
+        cur: Курсор (кортежи)
+        names_table: subject_names, teacher_names или classroom_names
+        table: subjects, teachers или classrooms
+        column: Ссылка написания на каноническую строку (subject_id, ...)
+        names: Тексты из занятий (пустые пропускаются)
+
+    Returns:
+        {текст: ID написания}
+    """
+    names = sorted({name for name in names if name and normalize_name(name)})
+    if not names:
+        return {}
+    cur.execute(f"SELECT name, id FROM {names_table} WHERE name = ANY(%s)", (names,))
+    ids = dict(cur.fetchall())
+    missing = [name for name in names if name not in ids]
+    if missing:
+        # Каноническое название ключа - первое написание (как в миграции)
+        keys: Dict[str, str] = {}
+        for name in missing:
+            keys.setdefault(normalize_name(name), name)
+        # DO UPDATE, чтобы RETURNING вернул и строки, вставленные параллельной загрузкой
+        canonical = dict(execute_values(cur, f"""
+            INSERT INTO {table} (name, name_key) VALUES %s
+            ON CONFLICT (name_key) DO UPDATE SET name_key = EXCLUDED.name_key
+            RETURNING name_key, id
+        """, [(name, key) for key, name in keys.items()], fetch=True))
+        rows = execute_values(cur, f"""
+            INSERT INTO {names_table} (name, {column}) VALUES %s
+            ON CONFLICT (name) DO UPDATE SET name = EXCLUDED.name
+            RETURNING name, id
+        """, [(name, canonical[normalize_name(name)]) for name in missing], fetch=True)
+        ids.update(rows)
+    return ids
+
+
+def save_lessons(cur, lessons: List[Dict]) -> Tuple[int, int]:
+    """
+    Сохраняет занятия (в транзакции вызывающего)
+
+    Занятие с тем же днем, номером пары и четностью обновляется, остальные вставляются.
+    Существующие занятия читаются одним запросом на группу, запись идет пакетами.
+    Предмет, преподаватель и аудитория записываются ID написания из справочника.
+
+    Args:
+        cur: Курсор (кортежи)
+        lessons: Валидные занятия (см. parse_schedule_file)
+
+    Returns:
+        (сохранено занятий, из них обновлено)
+    """
+    if not lessons:
+        return 0, 0
+
+    group_ids = sorted({lesson['group_id'] for lesson in lessons})
+    cur.execute("""
+        SELECT DISTINCT ON (group_id, day_of_week, lesson_number, week_parity)
+            group_id, day_of_week, lesson_number, week_parity, id
+        FROM lessons
+        WHERE group_id = ANY(%s) AND is_active = TRUE
+        ORDER BY group_id, day_of_week, lesson_number, week_parity, id
+    """, (group_ids,))
+    existing = {tuple(row[:4]): row[4] for row in cur.fetchall()}
+
+    # Одно занятие на слот: при повторе в файле побеждает последнее
+    slots: Dict[Tuple, Dict] = {}
+    updated = 0
+    for lesson in lessons:
+        key = (lesson['group_id'], lesson['day_of_week'], lesson['lesson_number'], lesson['week_parity'])
+        if key in existing or key in slots:
+            updated += 1
+        slots[key] = lesson
+
+    dictionaries = {
+        field: intern_names(cur, names_table, table, column, (lesson.get(field) for lesson in slots.values()))
+        for field, names_table, table, column in DIMENSIONS
+    }
+
+    updates = []
+    inserts = []
+    for key, lesson in slots.items():
+        values = (lesson['lesson_type'], lesson.get('building'), lesson.get('notes'))
+        ids = tuple(dictionaries[field].get(lesson.get(field)) for field, *_ in DIMENSIONS)
+        if key in existing:
+            updates.append(ids + values + (existing[key],))
+        else:
+            inserts.append(key + ids + values)
+
+    if updates:
+        execute_batch(cur, """
+            UPDATE lessons SET
+                subject_name_id = %s,
+                teacher_name_id = %s,
+                classroom_name_id = %s,
+                lesson_type = %s,
+                building = %s,
+                notes = %s,
+                updated_at = NOW()
+            WHERE id = %s
+        """, updates)
+    if inserts:
+        execute_values(cur, """
+            INSERT INTO lessons (
+                group_id, day_of_week, lesson_number, week_parity,
+                subject_name_id, teacher_name_id, classroom_name_id,
+                lesson_type, building, notes,
+                is_active, created_at
+            ) VALUES %s
+        """, inserts, template="(%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, TRUE, NOW())")
+    return len(lessons), updated
+
+
+def load_group_ids(cur) -> Dict[str, int]:
+    """Коды активных групп -> ID (один запрос на всю загрузку)"""
+    cur.execute("SELECT code, id FROM groups WHERE is_active = TRUE")
+    return {code: group_id for code, group_id in cur.fetchall()}
+
+
+def run_post_ingest_checks() -> Optional[Dict[str, int]]:
+    """Пост-обработка после загрузки расписания: поиск конфликтов между группами"""
+    from database import get_db_connection
+    from schedule_conflicts import detect_conflicts
+
+    try:
+        conn = get_db_connection()
+        try:
+            report = detect_conflicts(conn)
+        finally:
+            conn.close()
+        summary = {
+            'teacher': len(report['teacher']),
+            'classroom': len(report['classroom'])
+        }
+        if report['total_conflicts']:
+            print(f"[WARNING] Найдено конфликтов расписания: преподаватели {summary['teacher']}, аудитории {summary['classroom']}")
+        return summary
+    except Exception as e:
+        print(f"[ERROR] Ошибка поиска конфликтов: {e}")
+        return None
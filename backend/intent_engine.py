@@ -0,0 +1,505 @@
+"""
+Локальные ответы на типовые вопросы о расписании (без LLM)
+
+Вопрос сопоставляется с заранее скомпилированными шаблонами намерений:
+расписание на день, первая/последняя пара, занятия преподавателя, окна,
+аудитория, следующая пара по предмету, экзамены, четность недели, нагрузка.
+Названия предметов и фамилии преподавателей ищутся нечетко (difflib)
+среди реальных предметов и преподавателей группы.
+"""
+import re
+import time
+from datetime import date, datetime, timedelta
+from difflib import SequenceMatcher
+from typing import Callable, Dict, List, Optional, Tuple
+
+from academic_calendar import lesson_occurs, week_number, week_parity
+from metrics import ai_metrics
+from schedule_analytics import ScheduleAnalytics
+
+DAY_NAMES = {
+    1: 'Понедельник', 2: 'Вторник', 3: 'Среда', 4: 'Четверг',
+    5: 'Пятница', 6: 'Суббота', 7: 'Воскресенье'
+}
+LESSON_TYPES = {'lecture': 'лекция', 'practice': 'практика', 'lab': 'лабораторная', 'seminar': 'семинар'}
+
+# Упоминания дней (падежные формы: "в среду", "на понедельник", "по пятницам")
+DAY_PATTERNS = [
+    (1, re.compile(r'\bпонедельн')),
+    (2, re.compile(r'\bвторн')),
+    (3, re.compile(r'\bсред[ауые]\b')),
+    (4, re.compile(r'\bчетверг')),
+    (5, re.compile(r'\bпятниц')),
+    (6, re.compile(r'\bсуббот')),
+    (7, re.compile(r'\bвоскресен')),
+]
+TODAY = re.compile(r'\bсегодня')
+TOMORROW = re.compile(r'\bпослезавтра|\bзавтра')
+AFTER_TOMORROW = re.compile(r'\bпослезавтра')
+NEXT_WEEK = re.compile(r'\bследующ\w*\s+недел|\bна\s+следующей\s+неделе')
+
+# Шаблоны намерений (проверяются по порядку)
+# Четность - только вопрос о самой неделе ("какая сейчас неделя", "четная ли неделя"),
+# а не о занятиях по четным неделям
+PARITY = re.compile(
+    r'\b(как|котор)(ая|ой)\s+(сейчас\s+|сегодня\s+|будет\s+|эта\s+|следующая\s+|у\s+нас\s+|мы\s+)*недел'
+    r'|\b(не)?четная\s+(ли|или\s+(не)?четная)\b'
+    r'|\bнеделя\s+(сейчас\s+|сегодня\s+)?((не)?четная|какая)\b'
+)
+EXAM = re.compile(r'\bэкзамен|\bзач[её]т|\bсесси')
+LOAD = re.compile(r'\bнагрузк|\bсколько\s+(пар|занятий|часов)')
+FIRST = re.compile(r'\bперв\w*\s+пар|\bво\s+сколько\s+(начина|мне\s+на\s+пары|на\s+пары)|\bкогда\s+начина')
+LAST = re.compile(r'\bпоследн\w*\s+пар|\bзаканчива|\bво\s+сколько\s+(конча|заканч|освобо)|\bкогда\s+(конча|освобо)')
+WINDOWS = re.compile(r'\bокн[оаы]\b|\bокон\b|\bсвободн|\bперерыв')
+ROOM = re.compile(r'\bгде\b|\bаудитори|\bкабинет|\bкорпус')
+# "Где" без предмета и дня отвечается аудиторией, только если про нее спросили прямо
+ROOM_WORD = re.compile(r'\bаудитори|\bкабинет')
+TEACHER = re.compile(r'\bпреподават|\bпрепод\b|\bкто\s+(ведет|ведёт|читает)|\bу\s+[а-яё]{3,}')
+NEXT_LESSON = re.compile(r'\bкогда\b|\bследующ|\bближайш')
+DAY_SCHEDULE = re.compile(r'\bрасписан|\bкак\w*\s+(пары|занятия)|\bчто\s+(у\s+нас\s+|у\s+меня\s+)?(сегодня|завтра|послезавтра|в\s|во\s|на\s)|\bпары\b|\bзанятия\b')
+# Уточнения внутри намерений
+WHO = re.compile(r'\bкто\b')
+ABOUT_SUBJECT = re.compile(r'\bпо\s+[а-яa-z]{3,}')
+NEXT_PAIR = re.compile(r'\bследующ\w*\s+пар|\bближайш\w*\s+пар')
+
+WORD = re.compile(r'[а-яёa-z]{2,}')
+# Слова вопроса, которые не могут быть названием предмета или фамилией
+STOP_WORDS = {
+    'когда', 'следующая', 'следующий', 'ближайшая', 'какая', 'какие', 'какой', 'пара', 'пары', 'занятие',
+    'занятия', 'сегодня', 'завтра', 'послезавтра', 'меня', 'нас', 'где', 'будет', 'аудитории', 'аудитория',
+    'кабинет', 'преподаватель', 'преподавателя', 'кто', 'ведет', 'ведёт', 'читает', 'неделе', 'неделя',
+    'экзамен', 'экзамены', 'зачет', 'зачёт', 'через', 'сколько', 'дней', 'первая', 'последняя', 'расписание',
+    'есть', 'что', 'это', 'все', 'мои', 'моя', 'мой', 'лекция', 'практика', 'семинар', 'окна', 'окно',
+    'по', 'на', 'во', 'не', 'до', 'за', 'из', 'от', 'ко', 'ли', 'же', 'бы', 'мы', 'вы', 'он', 'то', 'уже',
+}
+
+# Разговорные названия предметов -> основа официального названия
+SUBJECT_ALIASES = {
+    'матан': 'математ', 'матеш': 'математ', 'матем': 'математ', 'вышка': 'высшая',
+    'физра': 'физичес', 'физкульт': 'физичес', 'англ': 'иностра', 'инглиш': 'иностра',
+    'бухуч': 'бухгалт', 'эконометр': 'эконометр',
+}
+
+# Минимальная похожесть слова вопроса на слово названия/фамилии
+MATCH_THRESHOLD = 0.78
+# Сравниваются основы слов: "математике" и "математика" -> "математ"
+STEM_LENGTH = 7
+
+
+def _stem(word: str) -> str:
+    return word[:STEM_LENGTH]
+
+
+def _similar(a: str, b: str) -> float:
+    """Похожесть основ двух слов (0..1)"""
+    a, b = _stem(a), _stem(b)
+    if a == b:
+        return 1.0
+    if len(a) >= 4 and (a.startswith(b) or b.startswith(a)):
+        return 0.9
+    # Общее начало из 4+ букв ("матеше" и "математика") - вероятно, то же слово
+    common = 0
+    for x, y in zip(a, b):
+        if x != y:
+            break
+        common += 1
+    if common >= 4:
+        return 0.8 + 0.02 * (common - 4)
+    return SequenceMatcher(None, a, b).ratio()
+
+
+def _time(value) -> str:
+    return str(value)[:5] if value else ''
+
+
+def _parse_exam_date(value) -> Optional[date]:
+    """Дата экзамена: '15.01.2025' (exam_parser) или '2025-01-15'"""
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    for fmt in ('%d.%m.%Y', '%Y-%m-%d', '%d.%m.%y'):
+        try:
+            return datetime.strptime(str(value).strip(), fmt).date()
+        except (TypeError, ValueError):
+            continue
+    return None
+
+
+def _days_word(n: int) -> str:
+    if n % 10 == 1 and n % 100 != 11:
+        return 'день'
+    if 2 <= n % 10 <= 4 and not 12 <= n % 100 <= 14:
+        return 'дня'
+    return 'дней'
+
+
+class IntentEngine:
+    """Распознавание намерения и ответ по данным расписания группы"""
+
+    def __init__(self):
+        # Порядок важен: более конкретные намерения раньше общих.
+        # Если "исключительное" намерение распознано, но ответить не удалось (например,
+        # нет данных об экзаменах), вопрос уходит в LLM, а не в следующие шаблоны
+        self._intents: List[Tuple[str, re.Pattern, Callable, bool]] = [
+            ('parity', PARITY, self._answer_parity, True),
+            ('exam', EXAM, self._answer_exam, True),
+            ('load', LOAD, self._answer_load, False),
+            ('first_pair', FIRST, self._answer_first, False),
+            ('last_pair', LAST, self._answer_last, False),
+            ('windows', WINDOWS, self._answer_windows, False),
+            ('room', ROOM, self._answer_room, False),
+            ('teacher', TEACHER, self._answer_teacher, False),
+            ('next_lesson', NEXT_LESSON, self._answer_next_lesson, False),
+            ('day_schedule', DAY_SCHEDULE, self._answer_day, False),
+        ]
+
+    def wants_exams(self, message: str) -> bool:
+        """
+        Вопрос об экзаменах: только для него answer() нужны exams_data
+
+        Вызывающий загружает экзамены (парсинг сайта) лишь для таких вопросов.
+        """
+        message = message.lower().replace('ё', 'е')
+        # Четность проверяется раньше экзаменов и исключает остальные намерения
+        return not PARITY.search(message) and bool(EXAM.search(message))
+
+    # ----- Разбор вопроса -----
+
+    @staticmethod
+    def _query_words(message: str) -> List[str]:
+        words = []
+        for word in WORD.findall(message):
+            if word in STOP_WORDS:
+                continue
+            for alias, stem in SUBJECT_ALIASES.items():
+                if word.startswith(alias):
+                    word = stem
+                    break
+            words.append(word)
+        return words
+
+    @staticmethod
+    def match_name(words: List[str], names: List[str], surname_only: bool = False) -> Optional[str]:
+        """
+        Нечеткий поиск названия предмета (или фамилии преподавателя) среди имеющихся
+
+        Учитываются совпадения основ слов и аббревиатуры ("ит" -> "Информационные технологии").
+        """
+        best_name, best_score = None, 0.0
+        for name in names:
+            name_words = WORD.findall(name.lower())
+            if surname_only:
+                name_words = name_words[:1]
+            if not name_words:
+                continue
+            acronym = ''.join(w[0] for w in name_words)
+            candidates = [w for w in name_words if len(w) >= 3]
+            for word in words:
+                if len(acronym) >= 2 and word == acronym:
+                    score = 1.0
+                elif candidates and len(word) >= 3:
+                    score = max(_similar(word, candidate) for candidate in candidates)
+                else:
+                    continue
+                if score > best_score:
+                    best_name, best_score = name, score
+        return best_name if best_score >= MATCH_THRESHOLD else None
+
+    @staticmethod
+    def resolve_day(message: str, now: datetime) -> Tuple[Optional[date], bool]:
+        """
+        Дата, о которой спрашивают
+
+        Returns:
+            (дата или None, если день не указан; True, если день указан явно)
+        """
+        today = now.date()
+        if AFTER_TOMORROW.search(message):
+            return today + timedelta(days=2), True
+        if TOMORROW.search(message):
+            return today + timedelta(days=1), True
+        if TODAY.search(message):
+            return today, True
+        for day, pattern in DAY_PATTERNS:
+            if pattern.search(message):
+                offset = (day - today.isoweekday()) % 7
+                if NEXT_WEEK.search(message):
+                    offset += 7
+                return today + timedelta(days=offset), True
+        return None, False
+
+    # ----- Данные -----
+
+    @staticmethod
+    def lessons_on(lessons: List[Dict], day: date) -> List[Dict]:
+        """Занятия в конкретную дату с учетом четности недели"""
+        weekday = day.isoweekday()
+        result = [
+            l for l in lessons
+            if l.get('day_of_week') == weekday and lesson_occurs(l.get('week_parity'), day)
+        ]
+        return sorted(result, key=lambda l: l.get('lesson_number') or 0)
+
+    def next_occurrence(
+        self,
+        lessons: List[Dict],
+        now: datetime,
+        predicate: Callable[[Dict], bool] = lambda l: True
+    ) -> Optional[Tuple[date, Dict]]:
+        """Ближайшее занятие (сегодня - только еще не начавшееся) в пределах двух недель"""
+        current_time = now.strftime('%H:%M')
+        for offset in range(15):
+            day = now.date() + timedelta(days=offset)
+            for lesson in self.lessons_on(lessons, day):
+                if not predicate(lesson):
+                    continue
+                if offset == 0 and lesson.get('lesson_start') and _time(lesson['lesson_start']) <= current_time:
+                    continue
+                return day, lesson
+        return None
+
+    @staticmethod
+    def format_lesson(lesson: Dict, with_teacher: bool = True) -> str:
+        """Строка занятия: "2 пара (10:50-12:25) — Маркетинг, лекция, ауд. 101" """
+        text = f"{lesson.get('lesson_number')} пара"
+        if lesson.get('lesson_start'):
+            text += f" ({_time(lesson['lesson_start'])}-{_time(lesson.get('lesson_end'))})"
+        text += f" — {lesson.get('subject', '')}"
+        lesson_type = LESSON_TYPES.get(lesson.get('lesson_type'))
+        if lesson_type:
+            text += f", {lesson_type}"
+        if lesson.get('classroom'):
+            text += f", ауд. {lesson['classroom']}"
+        if with_teacher and lesson.get('teacher'):
+            text += f", {lesson['teacher']}"
+        return text
+
+    @staticmethod
+    def day_label(day: date, now: datetime) -> str:
+        offset = (day - now.date()).days
+        name = DAY_NAMES[day.isoweekday()]
+        if offset == 0:
+            return f"Сегодня ({name.lower()})"
+        if offset == 1:
+            return f"Завтра ({name.lower()})"
+        return f"{name}, {day.strftime('%d.%m')}"
+
+    # ----- Ответы -----
+
+    def _answer_parity(self, message, lessons, exams, now):
+        next_week = bool(NEXT_WEEK.search(message))
+        day = now.date() + timedelta(days=7) if next_week else now.date()
+        parity = 'нечетная' if week_parity(day) == 'odd' else 'четная'
+        return f"{'Следующая' if next_week else 'Текущая'} неделя — {parity} ({week_number(day)}-я учебная)."
+
+    def _answer_exam(self, message, lessons, exams, now):
+        if not exams:
+            return None
+        upcoming = []
+        for exam in exams:
+            exam_date = _parse_exam_date(exam.get('date'))
+            if exam_date and exam_date >= now.date():
+                upcoming.append((exam_date, exam))
+        if not upcoming:
+            return "Ближайших экзаменов и зачетов в расписании нет."
+        upcoming.sort(key=lambda item: item[0])
+
+        subject = self.match_name(self._query_words(message), [e.get('subject', '') for _, e in upcoming])
+        if subject:
+            upcoming = [item for item in upcoming if item[1].get('subject') == subject]
+
+        exam_date, exam = upcoming[0]
+        days_left = (exam_date - now.date()).days
+        kind = 'Зачет' if exam.get('type') == 'test' else 'Экзамен'
+        text = f"{kind}: {exam.get('subject', '')} — {exam_date.strftime('%d.%m.%Y')}"
+        if exam.get('time'):
+            text += f" в {exam['time']}"
+        if exam.get('classroom'):
+            text += f", ауд. {exam['classroom']}"
+        text += ". " + ("Сегодня!" if days_left == 0 else f"Осталось {days_left} {_days_word(days_left)}.")
+        if not subject and len(upcoming) > 1:
+            text += f" Всего впереди: {len(upcoming)}."
+        return text
+
+    def _answer_load(self, message, lessons, exams, now):
+        day, explicit = self.resolve_day(message, now)
+        if explicit:
+            count = len(self.lessons_on(lessons, day))
+            return f"{self.day_label(day, now)}: {count} пар(ы), {count * 1.5} часа."
+        analytics = ScheduleAnalytics.calculate_weekly_load(lessons)
+        return (
+            f"Нагрузка на неделю:\n"
+            f"• Всего занятий: {analytics['total_lessons']}\n"
+            f"• Всего часов: {analytics['total_hours']}\n"
+            f"• В среднем в день: {analytics['average_per_day']} часов"
+        )
+
+    def _day_or_today(self, message, now) -> date:
+        day, _ = self.resolve_day(message, now)
+        return day or now.date()
+
+    def _answer_first(self, message, lessons, exams, now):
+        day = self._day_or_today(message, now)
+        day_lessons = self.lessons_on(lessons, day)
+        if not day_lessons:
+            return f"{self.day_label(day, now)} пар нет."
+        return f"{self.day_label(day, now)} первая пара: {self.format_lesson(day_lessons[0])}"
+
+    def _answer_last(self, message, lessons, exams, now):
+        day = self._day_or_today(message, now)
+        day_lessons = self.lessons_on(lessons, day)
+        if not day_lessons:
+            return f"{self.day_label(day, now)} пар нет."
+        last = day_lessons[-1]
+        text = f"{self.day_label(day, now)} последняя пара: {self.format_lesson(last)}"
+        if last.get('lesson_end'):
+            text = text.rstrip('.') + f". Освободитесь в {_time(last['lesson_end'])}"
+        return text
+
+    def _answer_windows(self, message, lessons, exams, now):
+        day, explicit = self.resolve_day(message, now)
+        days = [day] if explicit else [now.date() + timedelta(days=i) for i in range(7)]
+        lines = []
+        for current in days:
+            day_lessons = self.lessons_on(lessons, current)
+            numbers = [l.get('lesson_number') for l in day_lessons if l.get('lesson_number')]
+            gaps = []
+            for prev, nxt in zip(day_lessons, day_lessons[1:]):
+                if (nxt.get('lesson_number') or 0) - (prev.get('lesson_number') or 0) > 1:
+                    start, end = _time(prev.get('lesson_end')), _time(nxt.get('lesson_start'))
+                    span = f" ({start}-{end})" if start and end else ''
+                    missing = range(prev['lesson_number'] + 1, nxt['lesson_number'])
+                    gaps.append(f"{', '.join(map(str, missing))} пара{span}")
+            if gaps:
+                lines.append(f"{self.day_label(current, now)}: окно — {'; '.join(gaps)}")
+            elif explicit:
+                lines.append(
+                    f"{self.day_label(current, now)}: окон нет" + (", пар нет" if not numbers else '')
+                )
+        if not lines:
+            return "На ближайшей неделе окон между парами нет."
+        return "\n".join(lines)
+
+    def _answer_room(self, message, lessons, exams, now):
+        subjects = sorted({l.get('subject') for l in lessons if l.get('subject')})
+        subject = self.match_name(self._query_words(message), subjects)
+        day, explicit = self.resolve_day(message, now)
+        if not (subject or explicit or ROOM_WORD.search(message)):
+            # "Где можно поесть", "где находится корпус 2" - не про занятия группы
+            return None
+        if subject:
+            found = self.next_occurrence(lessons, now, lambda l: l.get('subject') == subject)
+            if explicit:
+                on_day = [l for l in self.lessons_on(lessons, day) if l.get('subject') == subject]
+                found = (day, on_day[0]) if on_day else None
+        elif explicit:
+            on_day = self.lessons_on(lessons, day)
+            found = (day, on_day[0]) if on_day else None
+        else:
+            found = self.next_occurrence(lessons, now)
+        if not found:
+            return None
+        lesson_day, lesson = found
+        if not lesson.get('classroom'):
+            return None
+        text = f"{self.day_label(lesson_day, now)}, {lesson.get('lesson_number')} пара — {lesson.get('subject', '')}: ауд. {lesson['classroom']}"
+        if lesson.get('building'):
+            text += f", корпус {lesson['building']}"
+        return text
+
+    def _answer_teacher(self, message, lessons, exams, now):
+        words = self._query_words(message)
+        subjects = sorted({l.get('subject') for l in lessons if l.get('subject')})
+        teachers = sorted({l.get('teacher') for l in lessons if l.get('teacher')})
+
+        # "Кто ведет маркетинг?"
+        if WHO.search(message):
+            subject = self.match_name(words, subjects)
+            if not subject:
+                return None
+            names = sorted({l.get('teacher') for l in lessons if l.get('subject') == subject and l.get('teacher')})
+            if not names:
+                return None
+            return f"{subject}: {', '.join(names)}"
+
+        # "Когда пары у Иванова?"
+        teacher = self.match_name(words, teachers, surname_only=True)
+        if not teacher:
+            return None
+        lines = []
+        for offset in range(7):
+            day = now.date() + timedelta(days=offset)
+            for lesson in self.lessons_on(lessons, day):
+                if lesson.get('teacher') == teacher:
+                    lines.append(f"{self.day_label(day, now)}: {self.format_lesson(lesson, with_teacher=False)}")
+        if not lines:
+            return f"{teacher}: на ближайшей неделе занятий нет."
+        return f"{teacher} — занятия на ближайшей неделе:\n" + "\n".join(lines)
+
+    def _answer_next_lesson(self, message, lessons, exams, now):
+        subjects = sorted({l.get('subject') for l in lessons if l.get('subject')})
+        subject = self.match_name(self._query_words(message), subjects)
+        if subject:
+            found = self.next_occurrence(lessons, now, lambda l: l.get('subject') == subject)
+            if not found:
+                return f"{subject}: в ближайшие две недели пар нет."
+        elif ABOUT_SUBJECT.search(message):
+            # Спрашивают про предмет, которого нет у группы - пусть разбирается LLM
+            return None
+        elif NEXT_PAIR.search(message):
+            found = self.next_occurrence(lessons, now)
+            if not found:
+                return "В ближайшие две недели пар нет."
+        else:
+            return None
+        day, lesson = found
+        # Название предмета есть в строке занятия (format_lesson)
+        return f"Следующая пара — {self.day_label(day, now)}: {self.format_lesson(lesson)}"
+
+    def _answer_day(self, message, lessons, exams, now):
+        day, explicit = self.resolve_day(message, now)
+        if not explicit:
+            return None
+        day_lessons = self.lessons_on(lessons, day)
+        if not day_lessons:
+            return f"{self.day_label(day, now)} пар нет."
+        return f"{self.day_label(day, now)}:\n" + "\n".join(self.format_lesson(l) for l in day_lessons)
+
+    # ----- Точка входа -----
+
+    def answer(
+        self,
+        message: str,
+        schedule_data: Optional[Dict] = None,
+        exams_data: Optional[List[Dict]] = None,
+        now: Optional[datetime] = None
+    ) -> Optional[str]:
+        """
+        Ответ на вопрос по расписанию группы
+
+        Returns:
+            Текст ответа или None, если вопрос нужно передать LLM
+        """
+        started = time.perf_counter()
+        message = message.lower().replace('ё', 'е')
+        lessons = (schedule_data or {}).get('lessons') or []
+        now = now or datetime.now()
+
+        response, intent = None, None
+        # Без расписания группы можно ответить только про четность недели
+        for name, pattern, handler, exclusive in self._intents:
+            if (lessons or name == 'parity') and pattern.search(message):
+                response = handler(message, lessons, exams_data, now)
+                if response:
+                    intent = name
+                if response or exclusive:
+                    break
+
+        ai_metrics.observe('intent_ms', (time.perf_counter() - started) * 1000)
+        if intent:
+            ai_metrics.increment('intent_hits')
+            ai_metrics.increment(f'intent_{intent}')
+        else:
+            ai_metrics.increment('intent_misses')
+        return response
@@ -0,0 +1,238 @@
+"""
+Нагрузочный тест endpoints расписания
+
+Измеряет пропускную способность (запросов/с) и задержки (p50/p95/p99)
+для уже запущенного сервера или по очереди для нескольких профилей запуска.
+
+Использование:
+    # Сервер уже запущен
+    python load_test.py --url http://localhost:8000 --groups П-1,П-2
+
+    # Сравнение профилей: каждый запускается на --port, тестируется и останавливается
+    python load_test.py --profiles dev,waitress,gunicorn --groups П-1,П-2
+"""
+import os
+import sys
+import time
+import threading
+import subprocess
+import argparse
+from collections import defaultdict
+from typing import Dict, List, Optional
+from urllib.parse import quote
+
+import requests
+
+# Устанавливаем UTF-8 для вывода на Windows
+if sys.platform == 'win32':
+    import io
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Команды запуска профилей (порт передается через переменную окружения PORT)
+PROFILES = {
+    'dev': [sys.executable, 'server.py'],
+    'waitress': [sys.executable, 'serve.py'],
+    'gunicorn': ['gunicorn', '-c', 'gunicorn.conf.py'],
+}
+
+
+def build_requests(groups: List[str]) -> List[tuple]:
+    """Список запросов (имя, метод, путь, json), которые выполняются по кругу"""
+    plan = [('bell-schedule', 'GET', '/v1/bell-schedule', None)]
+    for code in groups:
+        quoted = quote(code)
+        plan.append(('week', 'GET', f'/v1/schedule/group/{quoted}/week?week=odd', None))
+        plan.append(('day', 'GET', f'/v1/schedule/group/{quoted}/day/1?week=odd', None))
+    if len(groups) > 1:
+        plan.append(('batch', 'POST', '/v1/schedule/batch', {'groups': groups, 'week': 'odd'}))
+    return plan
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Перцентиль по отсортированному списку"""
+    if not values:
+        return 0.0
+    index = min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))
+    return values[index]
+
+
+def run_load(base_url: str, groups: List[str], concurrency: int, duration: float) -> Dict:
+    """
+    Нагружает сервер в concurrency потоков в течение duration секунд
+
+    Returns:
+        {'total': {...}, 'endpoints': {имя: {...}}}
+    """
+    plan = build_requests(groups)
+    latencies = defaultdict(list)
+    errors = defaultdict(int)
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def worker(offset: int):
+        session = requests.Session()
+        local_latencies = defaultdict(list)
+        local_errors = defaultdict(int)
+        i = offset
+        while time.perf_counter() < deadline:
+            name, method, path, body = plan[i % len(plan)]
+            i += 1
+            start = time.perf_counter()
+            try:
+                response = session.request(method, base_url + path, json=body, timeout=30)
+                ok = response.status_code < 500
+            except requests.RequestException:
+                ok = False
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            if ok:
+                local_latencies[name].append(elapsed_ms)
+            else:
+                local_errors[name] += 1
+        with lock:
+            for name, values in local_latencies.items():
+                latencies[name].extend(values)
+            for name, count in local_errors.items():
+                errors[name] += count
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(concurrency)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+
+    def summarize(values: List[float], error_count: int) -> Dict:
+        values = sorted(values)
+        return {
+            'requests': len(values),
+            'errors': error_count,
+            'rps': round(len(values) / elapsed, 1) if elapsed else 0,
+            'p50_ms': round(percentile(values, 50), 1),
+            'p95_ms': round(percentile(values, 95), 1),
+            'p99_ms': round(percentile(values, 99), 1),
+        }
+
+    all_values = [v for values in latencies.values() for v in values]
+    return {
+        'total': summarize(all_values, sum(errors.values())),
+        'endpoints': {
+            name: summarize(latencies.get(name, []), errors.get(name, 0))
+            for name in sorted(set(latencies) | set(errors))
+        }
+    }
+
+
+def wait_until_ready(base_url: str, timeout: float = 30) -> bool:
+    """Ждет, пока сервер начнет отвечать"""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            if requests.get(base_url + '/', timeout=2).status_code == 200:
+                return True
+        except requests.RequestException:
+            pass
+        time.sleep(0.5)
+    return False
+
+
+def start_profile(profile: str, port: int) -> Optional[subprocess.Popen]:
+    """Запускает сервер в выбранном профиле"""
+    env = dict(os.environ, PORT=str(port), FLASK_DEBUG='False')
+    if profile == 'dev':
+        # Режим как раньше в продакшене: debug с перезагрузчиком
+        env['FLASK_DEBUG'] = 'True'
+    try:
+        return subprocess.Popen(
+            PROFILES[profile],
+            cwd=BACKEND_DIR,
+            env=env,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL
+        )
+    except FileNotFoundError:
+        return None
+
+
+def stop_profile(process: subprocess.Popen):
+    """Останавливает сервер"""
+    process.terminate()
+    try:
+        process.wait(timeout=15)
+    except subprocess.TimeoutExpired:
+        process.kill()
+
+
+def print_report(title: str, report: Dict):
+    """Выводит результаты одного прогона"""
+    print(f"\n{title}")
+    print("-" * 70)
+    print(f"{'endpoint':<16}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'errors':>10}")
+    rows = list(report['endpoints'].items()) + [('ИТОГО', report['total'])]
+    for name, stats in rows:
+        print(
+            f"{name:<16}{stats['rps']:>10}{stats['p50_ms']:>10}"
+            f"{stats['p95_ms']:>10}{stats['p99_ms']:>10}{stats['errors']:>10}"
+        )
+
+
+def main():
+    """Главная функция"""
+    parser = argparse.ArgumentParser(description='Нагрузочный тест endpoints расписания')
+    parser.add_argument('--url', type=str, default=None, help='URL запущенного сервера')
+    parser.add_argument('--profiles', type=str, default=None,
+                        help=f"Профили для сравнения через запятую: {', '.join(PROFILES)}")
+    parser.add_argument('--port', type=int, default=8100, help='Порт для запуска профилей (по умолчанию 8100)')
+    parser.add_argument('--groups', type=str, default='П-1', help='Коды групп через запятую')
+    parser.add_argument('--concurrency', type=int, default=16, help='Количество параллельных клиентов')
+    parser.add_argument('--duration', type=float, default=15, help='Длительность прогона, секунд')
+    args = parser.parse_args()
+
+    groups = [g.strip() for g in args.groups.split(',') if g.strip()]
+
+    print("=" * 70)
+    print("НАГРУЗОЧНЫЙ ТЕСТ РАСПИСАНИЯ")
+    print("=" * 70)
+    print(f"Группы: {', '.join(groups)}")
+    print(f"Клиентов: {args.concurrency}, длительность: {args.duration} с")
+
+    if not args.profiles:
+        base_url = (args.url or 'http://localhost:8000').rstrip('/')
+        if not wait_until_ready(base_url, timeout=5):
+            print(f"[X] Сервер недоступен: {base_url}")
+            sys.exit(1)
+        print_report(base_url, run_load(base_url, groups, args.concurrency, args.duration))
+        return
+
+    summary = {}
+    base_url = f"http://127.0.0.1:{args.port}"
+    for profile in [p.strip() for p in args.profiles.split(',') if p.strip()]:
+        if profile not in PROFILES:
+            print(f"\n[!] Неизвестный профиль: {profile}")
+            continue
+        process = start_profile(profile, args.port)
+        if process is None:
+            print(f"\n[!] Профиль {profile} недоступен (не найдена команда {PROFILES[profile][0]})")
+            continue
+        try:
+            if not wait_until_ready(base_url):
+                print(f"\n[X] Профиль {profile} не запустился")
+                continue
+            report = run_load(base_url, groups, args.concurrency, args.duration)
+            summary[profile] = report['total']
+            print_report(f"Профиль: {profile}", report)
+        finally:
+            stop_profile(process)
+
+    if summary:
+        print("\n" + "=" * 70)
+        print("СРАВНЕНИЕ ПРОФИЛЕЙ")
+        print("=" * 70)
+        for profile, stats in summary.items():
+            print(f"{profile:<12} {stats['rps']:>8} req/s   p95 {stats['p95_ms']} ms   ошибок {stats['errors']}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,244 @@
+"""
+Обслуживание данных расписания: именованные операции над таблицей lessons
+
+Каждая операция - один SQL запрос (или несколько) над всеми группами сразу либо
+над выбранными (--group); все операции запуска идут в одной транзакции. В режиме
+--dry-run изменения выполняются и показываются, после чего транзакция откатывается.
+
+Операции:
+    dedupe        Дубликаты в одном слоте (день, пара, четность) с тем же предметом
+                  без учета регистра и пробелов: остается строчный вариант с
+                  преподавателем и аудиторией, остальные удаляются
+    lesson_types  Тип занятия по регистру названия, как при разборе Excel:
+                  КАПС - лекция, "лаб" - лабораторная, иначе практика (--invert меняет
+                  лекции и практики местами)
+    swap_parity   Нечетная неделя <-> четная ('both' не меняется)
+    repair_nulls  Пустые тип занятия и четность: тип по регистру названия, четность 'both'
+
+Использование:
+    python maintenance.py dedupe lesson_types --dry-run
+    python maintenance.py swap_parity --group S-4
+    python maintenance.py --list
+"""
+import sys
+import time
+from collections import Counter
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence
+
+# Выбор групп: NULL - все группы
+GROUP_FILTER = "(%(groups)s::text[] IS NULL OR g.code = ANY(%(groups)s))"
+
+# Тип занятия по названию (excel_parser.ExcelScheduleParser._detect_lesson_type):
+# больше половины букв заглавные - лекция, иначе "лаб" - лабораторная, иначе практика
+LESSON_TYPE_SQL = """
+    CASE
+        WHEN letters.total = 0 THEN 'practice'
+        WHEN letters.upper * 2 > letters.total THEN %(caps_type)s
+        WHEN lower(l.subject) LIKE '%%лаб%%' THEN 'laboratory'
+        ELSE %(lower_type)s
+    END
+"""
+
+LETTERS_SQL = """
+    CROSS JOIN LATERAL (
+        SELECT
+            count(*) FILTER (WHERE c <> lower(c)) AS upper,
+            count(*) FILTER (WHERE c <> lower(c) OR c <> upper(c)) AS total
+        FROM regexp_split_to_table(COALESCE(l.subject, ''), '') AS c
+    ) letters
+"""
+
+
+def _update_sql(column: str, new_value: str, where: str, joins: str = '') -> str:
+    """
+    UPDATE по подзапросу изменений: RETURNING отдает старое и новое значение для отчета
+
+    Строки, где значение не меняется, не обновляются (ревизии занятий не трогаются).
+    """
+    return f"""
+        UPDATE lessons t SET {column} = c.new_value, updated_at = NOW()
+        FROM (
+            SELECT l.id, g.code AS group_code, l.day_of_week, l.lesson_number, l.subject,
+                   l.{column}::text AS old_value, {new_value} AS new_value
+            FROM lesson_details l
+            JOIN groups g ON g.id = l.group_id
+            {joins}
+            WHERE l.is_active = TRUE AND {GROUP_FILTER} AND ({where})
+        ) c
+        WHERE t.id = c.id AND c.old_value IS DISTINCT FROM c.new_value
+        RETURNING c.group_code, c.day_of_week, c.lesson_number, c.subject, c.old_value, c.new_value
+    """
+
+
+class Statement(NamedTuple):
+    column: str  # Изменяемое поле ('' - строка удаляется)
+    sql: str
+
+
+class Operation(NamedTuple):
+    name: str
+    description: str
+    statements: Sequence[Statement]
+
+
+OPERATIONS: Dict[str, Operation] = {op.name: op for op in (
+    Operation('dedupe', 'Удаление дубликатов занятий в слоте (предмет без учета регистра и пробелов)', [
+        Statement('', f"""
+            DELETE FROM lessons t
+            USING (
+                SELECT l.id, g.code AS group_code, l.day_of_week, l.lesson_number, l.subject,
+                       row_number() OVER (
+                           -- subject_id - строка справочника без учета регистра и пробелов
+                           PARTITION BY l.group_id, l.day_of_week, l.lesson_number, l.week_parity,
+                                        l.subject_id
+                           -- Остается строчный вариант, затем более полный, затем более старый
+                           ORDER BY l.subject = upper(l.subject),
+                                    NULLIF(l.teacher, '') IS NULL,
+                                    NULLIF(l.classroom, '') IS NULL,
+                                    l.id
+                       ) AS rank
+                FROM lesson_details l
+                JOIN groups g ON g.id = l.group_id
+                WHERE l.is_active = TRUE AND {GROUP_FILTER}
+            ) c
+            WHERE t.id = c.id AND c.rank > 1
+            RETURNING c.group_code, c.day_of_week, c.lesson_number, c.subject, c.subject, NULL
+        """),
+    ]),
+    Operation('lesson_types', 'Пересчет типа занятия по регистру названия предмета', [
+        Statement('lesson_type', _update_sql('lesson_type', LESSON_TYPE_SQL, 'TRUE', LETTERS_SQL)),
+    ]),
+    Operation('swap_parity', 'Обмен четной и нечетной недели', [
+        Statement('week_parity', _update_sql(
+            'week_parity',
+            "CASE l.week_parity WHEN 'odd' THEN 'even' ELSE 'odd' END",
+            "l.week_parity IN ('odd', 'even')"
+        )),
+    ]),
+    Operation('repair_nulls', 'Заполнение пустых типа занятия и четности', [
+        Statement('lesson_type', _update_sql(
+            'lesson_type', LESSON_TYPE_SQL, "NULLIF(l.lesson_type, '') IS NULL", LETTERS_SQL
+        )),
+        Statement('week_parity', _update_sql('week_parity', "'both'", "NULLIF(l.week_parity, '') IS NULL")),
+    ]),
+)}
+
+
+def run_operations(
+    conn,
+    names: Iterable[str],
+    groups: Optional[List[str]] = None,
+    dry_run: bool = False,
+    invert: bool = False
+) -> List[Dict]:
+    """
+    Выполняет операции в одной транзакции
+
+    Args:
+        conn: Соединение с БД
+        names: Имена операций (OPERATIONS) в порядке выполнения
+        groups: Коды групп (None - все группы)
+        dry_run: Откатить транзакцию после выполнения
+        invert: lesson_types/repair_nulls: КАПС - практика, строчные - лекция
+
+    Returns:
+        По операции: name, rows, seconds, by_group {код: строк},
+        changes [(группа, день, пара, предмет, было, стало)]
+    """
+    names = list(names)
+    unknown = [name for name in names if name not in OPERATIONS]
+    if unknown:
+        raise ValueError(f"Неизвестные операции: {', '.join(unknown)}")
+
+    params = {
+        'groups': list(groups) if groups else None,
+        'caps_type': 'practice' if invert else 'lecture',
+        'lower_type': 'lecture' if invert else 'practice',
+    }
+    reports = []
+    cur = conn.cursor()
+    try:
+        for name in names:
+            started = time.perf_counter()
+            changes = []
+            for statement in OPERATIONS[name].statements:
+                cur.execute(statement.sql, params)
+                changes.extend(
+                    row[:4] + ((statement.column or 'удалено'),) + row[4:] for row in cur.fetchall()
+                )
+            reports.append({
+                'name': name,
+                'rows': len(changes),
+                'seconds': round(time.perf_counter() - started, 3),
+                'by_group': dict(Counter(change[0] for change in changes)),
+                'changes': changes,
+            })
+        if dry_run:
+            conn.rollback()
+        else:
+            conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cur.close()
+    return reports
+
+
+def format_report(reports: List[Dict], dry_run: bool = False, limit: int = 20) -> str:
+    """Изменения по операциям: счетчики по группам и первые limit строк"""
+    lines = []
+    for report in reports:
+        lines.append(f"{report['name']}: строк {report['rows']} за {report['seconds']:.3f} с")
+        if report['by_group']:
+            lines.append("  по группам: " + ", ".join(
+                f"{code} {count}" for code, count in sorted(report['by_group'].items())
+            ))
+        for group_code, day, number, subject, column, old, new in report['changes'][:limit]:
+            change = 'удалено' if column == 'удалено' else f"{column} {old} → {new}"
+            lines.append(f"  [{group_code}] день {day}, пара {number}, {subject}: {change}")
+        if len(report['changes']) > limit:
+            lines.append(f"  ... еще {len(report['changes']) - limit}")
+    total = sum(report['rows'] for report in reports)
+    lines.append(f"Всего строк: {total}" + (" (пробный запуск, изменения отменены)" if dry_run else ""))
+    return "\n".join(lines)
+
+
+def main():
+    """Главная функция"""
+    import argparse
+
+    # Исправление кодировки для Windows
+    if sys.platform == 'win32':
+        import io
+        sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+
+    parser = argparse.ArgumentParser(description='Обслуживание данных расписания (операции над lessons)')
+    parser.add_argument('operations', nargs='*', help='Операции по порядку: ' + ', '.join(OPERATIONS))
+    parser.add_argument('--group', action='append', dest='groups', help='Код группы (можно несколько раз)')
+    parser.add_argument('--dry-run', action='store_true', help='Показать изменения и откатить транзакцию')
+    parser.add_argument('--invert', action='store_true', help='Тип по регистру наоборот: КАПС - практика')
+    parser.add_argument('--limit', type=int, default=20, help='Сколько изменений показывать по операции')
+    parser.add_argument('--list', action='store_true', help='Список операций')
+    args = parser.parse_args()
+
+    if args.list or not args.operations:
+        for op in OPERATIONS.values():
+            print(f"  {op.name:<14} {op.description}")
+        return
+
+    from database import get_db_connection
+
+    conn = get_db_connection()
+    try:
+        reports = run_operations(conn, args.operations, args.groups, args.dry_run, args.invert)
+    except ValueError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    finally:
+        conn.close()
+    print(format_report(reports, args.dry_run, args.limit))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+"""
+Простые метрики процесса: счетчики и распределения времени/размеров
+
+Хранятся в памяти процесса (у каждого воркера свои), отдаются через служебные endpoints.
+"""
+import threading
+from collections import deque
+from typing import Dict
+
+
+class Metrics:
+    """Потокобезопасный набор счетчиков и наблюдений"""
+
+    def __init__(self, window: int = 1000):
+        """
+        Args:
+            window: Сколько последних наблюдений хранить для перцентилей
+        """
+        self._window = window
+        self._lock = threading.Lock()
+        self._counters: Dict[str, int] = {}
+        self._observations: Dict[str, Dict] = {}
+
+    def increment(self, name: str, value: int = 1):
+        """Увеличивает счетчик"""
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def observe(self, name: str, value: float):
+        """Добавляет наблюдение (время в мс, размер и т.п.)"""
+        with self._lock:
+            data = self._observations.get(name)
+            if data is None:
+                data = {'count': 0, 'sum': 0.0, 'max': value, 'recent': deque(maxlen=self._window)}
+                self._observations[name] = data
+            data['count'] += 1
+            data['sum'] += value
+            data['max'] = max(data['max'], value)
+            data['recent'].append(value)
+
+    def snapshot(self) -> Dict:
+        """Текущие значения: счетчики и для наблюдений count/avg/p50/p95/max"""
+        with self._lock:
+            result = {'counters': dict(self._counters), 'observations': {}}
+            for name, data in self._observations.items():
+                recent = sorted(data['recent'])
+                result['observations'][name] = {
+                    'count': data['count'],
+                    'avg': round(data['sum'] / data['count'], 1),
+                    'p50': round(recent[int(round(0.50 * (len(recent) - 1)))], 1),
+                    'p95': round(recent[int(round(0.95 * (len(recent) - 1)))], 1),
+                    'max': round(data['max'], 1),
+                }
+            return result
+
+
+# Метрики AI ассистента (чат, поток, кэш, контекст)
+ai_metrics = Metrics()
@@ -0,0 +1,260 @@
+"""
+Материализация занятий по датам (lesson_occurrences)
+
+Недельный шаблон группы (lessons: день недели + четность) разворачивается в занятия
+на конкретные даты семестра с помощью academic_calendar. Если для группы и дня есть
+датированные занятия из АРМА (arma_lessons), день берется из АРМА целиком.
+
+Семестр группы материализуется при первом запросе и заново после изменения ее занятий:
+occurrence_ranges хранит ревизию расписания (миграция 001_lesson_revisions), для которой
+строились занятия. Синхронизация с АРМА сбрасывает затронутые семестры (invalidate_dates).
+Время пар шаблона не материализуется: read_date берет его из текущего расписания звонков,
+поэтому изменение звонков не требует перестроения.
+
+Секции семестров создают задания (main, синхронизация с АРМА), а не чтение: до этого
+строки семестра хранятся в секции по умолчанию.
+
+Использование:
+    python occurrences.py [--date YYYY-MM-DD]   # материализовать семестр даты для всех групп
+"""
+import sys
+from datetime import date, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from psycopg2.extras import execute_values
+
+from academic_calendar import lesson_occurs, semester_bounds
+from bell_schedule import get_bell_schedule
+
+# Вид занятия АРМА (fvzan.qivzan) -> lesson_type API, по началу названия
+ARMA_LESSON_TYPES = [('лек', 'lecture'), ('лаб', 'lab'), ('сем', 'seminar'), ('пр', 'practice')]
+
+OCCURRENCE_COLUMNS = [
+    'group_id', 'lesson_date', 'lesson_number', 'source', 'lesson_id', 'subject', 'teacher',
+    'classroom', 'lesson_type', 'week_parity', 'building', 'notes', 'time_start', 'time_end',
+]
+
+# Текущая ревизия расписания группы (как в schedule_cache)
+GROUP_REVISION_SQL = """
+    GREATEST(
+        COALESCE((SELECT MAX(revision) FROM lessons WHERE group_id = g.id), 0),
+        COALESCE((SELECT MAX(revision) FROM lesson_tombstones WHERE group_id = g.id), 0)
+    )
+"""
+
+
+def arma_lesson_type(name: Optional[str]) -> Optional[str]:
+    """lesson_type по названию вида занятия из АРМА"""
+    name = (name or '').strip().lower()
+    for prefix, lesson_type in ARMA_LESSON_TYPES:
+        if name.startswith(prefix):
+            return lesson_type
+    return None
+
+
+def ensure_partition(cur, lesson_date: date) -> str:
+    """
+    Создает секцию lesson_occurrences для семестра даты (в транзакции вызывающего)
+
+    Строки семестра, построенные раньше в секции по умолчанию, удаляются вместе с
+    отметками occurrence_ranges и строятся заново при следующем чтении.
+
+    Returns:
+        Ключ семестра
+    """
+    key, start, end = semester_bounds(lesson_date)
+    # Одна блокировка на все группы: DDL не должен выполняться двумя заданиями сразу
+    cur.execute("SELECT pg_advisory_xact_lock(hashtext('lesson_occurrences'))")
+    cur.execute("SELECT to_regclass(%s) IS NOT NULL", (f'lesson_occurrences_{key}',))
+    if cur.fetchone()[0]:
+        return key
+    # Новая секция не создается, пока в секции по умолчанию есть строки ее диапазона
+    cur.execute("LOCK TABLE lesson_occurrences_default IN ACCESS EXCLUSIVE MODE")
+    cur.execute(
+        "DELETE FROM lesson_occurrences_default WHERE lesson_date BETWEEN %s AND %s", (start, end)
+    )
+    cur.execute("DELETE FROM occurrence_ranges WHERE semester_key = %s", (key,))
+    cur.execute(f"""
+        CREATE TABLE IF NOT EXISTS lesson_occurrences_{key}
+        PARTITION OF lesson_occurrences
+        FOR VALUES FROM (%s) TO (%s)
+    """, (start.isoformat(), (end + timedelta(days=1)).isoformat()))
+    return key
+
+
+def expand_template(group_id: int, lessons: List[Dict], start: date, end: date) -> Dict[date, List[Tuple]]:
+    """Разворачивает недельный шаблон в занятия по датам"""
+    by_day: Dict[int, List[Dict]] = {}
+    for lesson in lessons:
+        by_day.setdefault(lesson['day_of_week'], []).append(lesson)
+
+    days: Dict[date, List[Tuple]] = {}
+    current = start
+    while current <= end:
+        for lesson in by_day.get(current.isoweekday(), []):
+            if lesson_occurs(lesson['week_parity'], current):
+                days.setdefault(current, []).append((
+                    group_id, current, lesson['lesson_number'], 'template', lesson['id'],
+                    lesson['subject'], lesson['teacher'], lesson['classroom'], lesson['lesson_type'],
+                    lesson['week_parity'], lesson['building'], lesson['notes'],
+                    None, None,
+                ))
+        current += timedelta(days=1)
+    return days
+
+
+def arma_days(group_id: int, arma_lessons: List[Dict]) -> Dict[date, List[Tuple]]:
+    """Датированные занятия АРМА по дням"""
+    days: Dict[date, List[Tuple]] = {}
+    for lesson in arma_lessons:
+        days.setdefault(lesson['lesson_date'], []).append((
+            group_id, lesson['lesson_date'], lesson['lesson_number'], 'arma', None,
+            lesson['subject_name'] or '', lesson['teacher1_name'], lesson['audience1_name'],
+            arma_lesson_type(lesson['lesson_type_name']), None, lesson['building_number'], None,
+            lesson['time_start'], lesson['time_end'],
+        ))
+    return days
+
+
+def materialize_group(cur, group_id: int, group_code: str, lesson_date: date) -> int:
+    """
+    Материализует семестр даты для группы (в транзакции вызывающего)
+
+    Args:
+        cur: Курсор (кортежи)
+        group_id: ID группы
+        group_code: Код группы (для сопоставления с arma_lessons)
+        lesson_date: Любая дата семестра
+
+    Returns:
+        Число занятий в семестре
+    """
+    key, start, end = semester_bounds(lesson_date)
+    # Строки одной группы не должны строиться параллельно двумя запросами
+    cur.execute("SELECT pg_advisory_xact_lock(hashtext('lesson_occurrences'), %s)", (group_id,))
+
+    cur.execute(f"SELECT {GROUP_REVISION_SQL} FROM groups g WHERE g.id = %s", (group_id,))
+    revision = cur.fetchone()[0]
+
+    cur.execute("""
+        SELECT l.id, l.day_of_week, l.lesson_number, l.subject, l.teacher, l.classroom,
+               l.lesson_type, l.week_parity, l.building, l.notes
+        FROM lesson_details l
+        WHERE l.group_id = %s AND l.is_active = TRUE
+    """, (group_id,))
+    columns = [c[0] for c in cur.description]
+    template = [dict(zip(columns, row)) for row in cur.fetchall()]
+
+    cur.execute("""
+        SELECT lesson_date, lesson_number, subject_name, teacher1_name, audience1_name,
+               lesson_type_name, building_number, time_start, time_end
+        FROM arma_lessons
+        WHERE group_code = %s AND lesson_date BETWEEN %s AND %s
+    """, (group_code, start, end))
+    columns = [c[0] for c in cur.description]
+    arma = [dict(zip(columns, row)) for row in cur.fetchall()]
+
+    days = expand_template(group_id, template, start, end)
+    # Реальные даты из АРМА важнее расчета по четности
+    days.update(arma_days(group_id, arma))
+    rows = [row for day in sorted(days) for row in days[day]]
+
+    cur.execute(
+        "DELETE FROM lesson_occurrences WHERE group_id = %s AND lesson_date BETWEEN %s AND %s",
+        (group_id, start, end)
+    )
+    if rows:
+        execute_values(cur, f"INSERT INTO lesson_occurrences ({', '.join(OCCURRENCE_COLUMNS)}) VALUES %s", rows)
+    cur.execute("""
+        INSERT INTO occurrence_ranges (group_id, semester_key, source_revision)
+        VALUES (%s, %s, %s)
+        ON CONFLICT (group_id, semester_key) DO UPDATE
+            SET source_revision = EXCLUDED.source_revision, materialized_at = NOW()
+    """, (group_id, key, revision))
+    return len(rows)
+
+
+def read_date(cur, group_code: str, lesson_date: date) -> Tuple[Optional[int], bool, List[Dict]]:
+    """
+    Занятия группы на дату - одно чтение по индексу (group_id, lesson_date)
+
+    Args:
+        cur: Курсор RealDictCursor
+
+    Returns:
+        (ID группы или None, если группы нет; актуальна ли материализация; занятия)
+    """
+    key, _, _ = semester_bounds(lesson_date)
+    cur.execute(f"""
+        SELECT
+            g.id AS found_group_id,
+            r.source_revision = {GROUP_REVISION_SQL} AS is_fresh,
+            o.lesson_id AS id,
+            o.group_id,
+            o.lesson_date,
+            o.lesson_number,
+            o.source,
+            o.subject,
+            o.teacher,
+            o.classroom,
+            o.lesson_type,
+            o.week_parity,
+            o.building,
+            o.notes,
+            o.time_start AS lesson_start,
+            o.time_end AS lesson_end
+        FROM groups g
+        LEFT JOIN occurrence_ranges r ON r.group_id = g.id AND r.semester_key = %s
+        LEFT JOIN lesson_occurrences o ON o.group_id = g.id AND o.lesson_date = %s
+        WHERE g.code = %s AND g.is_active = TRUE
+        ORDER BY o.lesson_number
+    """, (key, lesson_date, group_code))
+    rows = cur.fetchall()
+    if not rows:
+        return None, False, []
+    lessons = [dict(r) for r in rows if r['group_id'] is not None]
+    # У занятий АРМА свое время, у шаблона - по текущим звонкам
+    get_bell_schedule().attach(l for l in lessons if l['source'] == 'template')
+    return rows[0]['found_group_id'], bool(rows[0]['is_fresh']), lessons
+
+
+def invalidate_dates(cur, dates: Iterable[date]):
+    """Сбрасывает материализацию семестров, в которые попадают даты (после синхронизации с АРМА)"""
+    keys = sorted({semester_bounds(d)[0] for d in dates})
+    if keys:
+        cur.execute("DELETE FROM occurrence_ranges WHERE semester_key = ANY(%s)", (keys,))
+
+
+def main():
+    """Главная функция"""
+    import argparse
+    from database import get_db_connection
+
+    # Исправление кодировки для Windows
+    if sys.platform == 'win32':
+        import io
+        sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+
+    parser = argparse.ArgumentParser(description='Материализация занятий по датам')
+    parser.add_argument('--date', type=date.fromisoformat, default=date.today(), help='Дата семестра (YYYY-MM-DD)')
+    args = parser.parse_args()
+
+    conn = get_db_connection()
+    try:
+        cur = conn.cursor()
+        ensure_partition(cur, args.date)
+        conn.commit()
+        cur.execute("SELECT id, code FROM groups WHERE is_active = TRUE ORDER BY code")
+        groups = cur.fetchall()
+        total = 0
+        for group_id, group_code in groups:
+            total += materialize_group(cur, group_id, group_code, args.date)
+            conn.commit()
+        cur.close()
+        print(f"✓ Семестр {semester_bounds(args.date)[0]}: групп {len(groups)}, занятий {total}")
+    finally:
+        conn.close()
+
+
+if __name__ == '__main__':
+    main()
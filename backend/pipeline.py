@@ -0,0 +1,361 @@
+"""
+Конвейер загрузки расписания: скачивание → разбор → запись в БД
+
+Стадии работают одновременно и связаны очередями ограниченного размера:
+    загрузчик ──файлы──▶ пул разбора ──занятия──▶ запись в БД (пакетами)
+Загрузчик отдает изменившиеся файлы через submit(), пока остальные еще скачиваются;
+если разбор не успевает, submit() ждет место в очереди (загрузчик притормаживает).
+Запись идет одним соединением: каждый пакет файлов - одна транзакция, каждый файл -
+точка сохранения, поэтому ошибка одного файла не откатывает остальные. Файлы
+хранилища (content_store) отмечаются разобранными только после фиксации транзакции.
+Если соединение с БД потеряно, запись останавливается: оставшиеся файлы отмечаются
+ошибкой без разбора, а run() после завершения стадий выбрасывает исключение записи.
+
+Использование:
+    downloader = ScheduleDownloader(directory)
+    pipeline = IngestPipeline(store=downloader.store)
+    downloader.on_change = pipeline.submit
+    report = pipeline.run(download=downloader.download_all)
+"""
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from bell_schedule import get_bell_schedule
+from content_store import ContentStore
+from file_processor import parse_filename
+from ingest import load_group_ids, parse_schedule_file, run_post_ingest_checks, save_lessons
+
+EXCEL_EXTENSIONS = ('.xlsx', '.xls')
+
+# Конец потока данных в очереди
+_DONE = object()
+
+
+class IngestPipeline:
+    """Конвейер разбора и загрузки файлов расписания с общим отчетом по стадиям"""
+
+    def __init__(
+        self,
+        store: Optional[ContentStore] = None,
+        parsers: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        queue_size: Optional[int] = None,
+        processes: bool = True,
+        log: Callable[[str], None] = print
+    ):
+        """
+        Args:
+            store: Хранилище загрузчика: его файлы после записи отмечаются разобранными,
+                неразобранные с прошлых запусков тоже попадают в конвейер
+            parsers: Число параллельных разборов (по умолчанию PIPELINE_PARSERS или число ядер, до 4)
+            batch_size: Файлов в одной транзакции записи (PIPELINE_BATCH_SIZE, по умолчанию 20)
+            queue_size: Размер очередей между стадиями (по умолчанию 2 * parsers)
+            processes: Разбирать в отдельных процессах (openpyxl нагружает CPU);
+                False - в потоках текущего процесса (например, внутри API сервера)
+            log: Функция логирования
+        """
+        self.store = store
+        self.parsers = parsers or int(os.getenv('PIPELINE_PARSERS', '0')) or min(4, os.cpu_count() or 1)
+        self.batch_size = batch_size or int(os.getenv('PIPELINE_BATCH_SIZE', '20'))
+        self.processes = processes
+        self.log = log
+        size = queue_size or 2 * self.parsers
+        self._files: queue.Queue = queue.Queue(maxsize=size)
+        self._parsed: queue.Queue = queue.Queue(maxsize=size)
+        self._submitted = set()
+        self._lock = threading.Lock()
+        self._group_ids: Dict[str, int] = {}
+        # Ошибка, после которой запись в БД невозможна (например, потеряно соединение)
+        self._write_error: Optional[Exception] = None
+        self.results: List[Dict[str, Any]] = []
+        self.stages = {
+            'download': {'files': 0, 'seconds': 0.0},
+            'parse': {'files': 0, 'seconds': 0.0},
+            'write': {'files': 0, 'batches': 0, 'seconds': 0.0},
+        }
+
+    def submit(self, path) -> bool:
+        """
+        Ставит файл в очередь разбора (ждет место, если очередь заполнена)
+
+        Returns:
+            False, если файл не Excel или уже в конвейере
+        """
+        path = Path(path)
+        if path.suffix.lower() not in EXCEL_EXTENSIONS:
+            return False
+        with self._lock:
+            if str(path) in self._submitted:
+                return False
+            self._submitted.add(str(path))
+        self._files.put(path)
+        return True
+
+    def _parse_worker(self, executor: Optional[ProcessPoolExecutor]):
+        while True:
+            path = self._files.get()
+            if path is _DONE:
+                return
+            if self._write_error is not None:
+                # Записать результат уже некуда - файл отмечается ошибкой без разбора
+                self._parsed.put({'file': path.name, 'path': path, 'success': False})
+                continue
+            started = time.perf_counter()
+            group_code, modification_date = parse_filename(path.name)
+            result = {'file': path.name, 'path': path, 'success': False}
+            if modification_date:
+                result['modification_date'] = modification_date
+
+            if not group_code:
+                result['error'] = 'Не удалось извлечь код группы из имени файла'
+            elif group_code not in self._group_ids:
+                result['group_code'] = group_code
+                result['error'] = f'Группа "{group_code}" не найдена в БД'
+                result['skipped'] = True
+            else:
+                group_id = self._group_ids[group_code]
+                result.update(group_code=group_code, group_id=group_id)
+                try:
+                    if executor is not None:
+                        parsed = executor.submit(parse_schedule_file, str(path), group_code, group_id).result()
+                    else:
+                        parsed = parse_schedule_file(str(path), group_code, group_id)
+                    result['parsed'] = parsed
+                except Exception as e:
+                    result['error'] = f'Ошибка обработки файла: {e}'
+
+            with self._lock:
+                self.stages['parse']['files'] += 1
+                self.stages['parse']['seconds'] += time.perf_counter() - started
+            self._parsed.put(result)
+
+    def _next_batch(self) -> Optional[List[Dict]]:
+        """Ждет первый результат и добирает уже готовые, не больше batch_size"""
+        first = self._parsed.get()
+        if first is _DONE:
+            return None
+        batch = [first]
+        while len(batch) < self.batch_size:
+            try:
+                item = self._parsed.get_nowait()
+            except queue.Empty:
+                break
+            if item is _DONE:
+                # Вернем признак конца для следующего вызова
+                self._parsed.put(_DONE)
+                break
+            batch.append(item)
+        return batch
+
+    def _write_worker(self, conn):
+        try:
+            cur = conn.cursor()
+            try:
+                while self._write_error is None:
+                    batch = self._next_batch()
+                    if batch is None:
+                        return
+                    self._write_batch(conn, cur, batch)
+            finally:
+                cur.close()
+        except Exception as e:
+            if self._write_error is None:
+                self._write_error = e
+        # Запись остановлена: результаты разбора забираются до конца очереди,
+        # иначе потоки разбора ждут место в ней и run() не завершается
+        self.log(f"  ❌ Запись в БД остановлена: {self._write_error}")
+        while True:
+            result = self._parsed.get()
+            if result is _DONE:
+                return
+            result.pop('parsed', None)
+            result['success'] = False
+            result['error'] = f'Запись в БД остановлена: {self._write_error}'
+            self._log_result(result)
+            with self._lock:
+                self.results.append(result)
+                self.stages['write']['files'] += 1
+
+    def _write_batch(self, conn, cur, batch: List[Dict]):
+        """Пакет файлов - одна транзакция; файлы хранилища отмечаются после фиксации"""
+        started = time.perf_counter()
+        done = []
+        try:
+            for result in batch:
+                parsed = result.pop('parsed', None)
+                if parsed is not None:
+                    self._write_file(cur, result, parsed)
+                done.append(result)
+            conn.commit()
+        except Exception as e:
+            # Пакет не записан целиком; файлы останутся в очереди хранилища до следующего запуска
+            for result in batch:
+                result.pop('parsed', None)
+                result['success'] = False
+                result['error'] = f'Ошибка записи в БД: {e}'
+            done = batch
+            try:
+                conn.rollback()
+            except Exception:
+                # Откат тоже не прошел - соединение потеряно, следующие пакеты не записать
+                self._write_error = e
+
+        for result in done:
+            if result['success'] and self.store is not None:
+                self.store.mark_processed(result['path'])
+            self._log_result(result)
+        with self._lock:
+            self.results.extend(done)
+            self.stages['write']['files'] += len(done)
+            self.stages['write']['batches'] += 1
+            self.stages['write']['seconds'] += time.perf_counter() - started
+
+    @staticmethod
+    def _write_file(cur, result: Dict, parsed: Dict):
+        """Запись занятий одного файла под точкой сохранения"""
+        result['lessons_parsed'] = parsed['lessons_parsed']
+        if parsed['error']:
+            result['error'] = parsed['error']
+            result['validation_errors'] = parsed['validation_errors']
+            result['errors_count'] = parsed['errors_count']
+            return
+        if parsed['warning']:
+            result['warning'] = parsed['warning']
+        elif parsed['errors_count']:
+            result['validation_warnings'] = parsed['validation_errors'][:5]
+
+        cur.execute("SAVEPOINT ingest_file")
+        try:
+            saved, updated = save_lessons(cur, parsed['lessons'])
+        except Exception as e:
+            cur.execute("ROLLBACK TO SAVEPOINT ingest_file")
+            result['error'] = f'Ошибка сохранения занятий: {e}'
+            return
+        cur.execute("RELEASE SAVEPOINT ingest_file")
+        result.update(
+            success=True,
+            lessons_saved=saved,
+            lessons_updated=updated,
+            lessons_filtered=parsed['lessons_filtered'],
+        )
+
+    def _log_result(self, result: Dict):
+        if result['success']:
+            self.log(f"  ✓ {result['file']} → {result['group_code']}: "
+                     f"занятий {result['lessons_saved']} (обновлено {result['lessons_updated']})")
+        else:
+            self.log(f"  ❌ {result['file']}: {result['error']}")
+
+    def run(
+        self,
+        download: Optional[Callable[[], Any]] = None,
+        files: Iterable = (),
+        check_conflicts: bool = True
+    ) -> Dict[str, Any]:
+        """
+        Запускает конвейер и ждет его завершения
+
+        Args:
+            download: Стадия загрузки (например, downloader.download_all), которая отдает
+                изменившиеся файлы через submit(); выполняется в текущем потоке
+            files: Файлы, которые нужно разобрать в любом случае
+            check_conflicts: Искать конфликты расписания после загрузки
+
+        Returns:
+            Отчет: total_files, processed, success, failed, skipped, results,
+            stages (download/parse/write: файлы, секунды, пакеты), elapsed_seconds, conflicts
+
+        Raises:
+            Исключение записи, если соединение с БД потеряно (после завершения всех стадий)
+        """
+        from database import get_db_connection
+
+        started = time.perf_counter()
+        conn = get_db_connection()
+        try:
+            cur = conn.cursor()
+            self._group_ids = load_group_ids(cur)
+            cur.close()
+            conn.commit()
+
+            executor = None
+            if self.processes:
+                # Процессы разбора, созданные через fork, получают уже загруженные звонки
+                # (номер пары по времени) и не подключаются к БД сами
+                get_bell_schedule()
+                executor = ProcessPoolExecutor(max_workers=self.parsers)
+            parsers = [
+                threading.Thread(target=self._parse_worker, args=(executor,), name=f'ingest-parse-{i}', daemon=True)
+                for i in range(self.parsers)
+            ]
+            writer = threading.Thread(target=self._write_worker, args=(conn,), name='ingest-write', daemon=True)
+            for thread in parsers + [writer]:
+                thread.start()
+
+            try:
+                if download is not None:
+                    download_started = time.perf_counter()
+                    download()
+                    self.stages['download']['seconds'] = time.perf_counter() - download_started
+                    self.stages['download']['files'] = len(self._submitted)
+                # Файлы, не разобранные в прошлые запуски (ошибка, остановка), и явно переданные
+                if self.store is not None:
+                    for _, path in self.store.pending():
+                        self.submit(path)
+                for path in files:
+                    self.submit(path)
+            finally:
+                for _ in parsers:
+                    self._files.put(_DONE)
+                for thread in parsers:
+                    thread.join()
+                self._parsed.put(_DONE)
+                writer.join()
+                if executor is not None:
+                    executor.shutdown()
+        finally:
+            conn.close()
+
+        if self.store is not None:
+            self.store.save()
+        if self._write_error is not None:
+            raise self._write_error
+
+        success = sum(1 for r in self.results if r['success'])
+        skipped = sum(1 for r in self.results if r.get('skipped'))
+        report = {
+            'total_files': len(self.results),
+            'processed': success,
+            'success': success,
+            'failed': len(self.results) - success - skipped,
+            'skipped': skipped,
+            'results': [{k: v for k, v in r.items() if k not in ('path', 'skipped')} for r in self.results],
+            'stages': {
+                name: {k: round(v, 3) if isinstance(v, float) else v for k, v in stage.items()}
+                for name, stage in self.stages.items()
+            },
+            'elapsed_seconds': round(time.perf_counter() - started, 3),
+        }
+        report['conflicts'] = run_post_ingest_checks() if check_conflicts and success else None
+        return report
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    """Итоговый отчет конвейера для лога"""
+    stages = report['stages']
+    return "\n".join([
+        f"Всего файлов:        {report['total_files']}",
+        f"Успешно:             {report['success']}",
+        f"Ошибок:              {report['failed']}",
+        f"Пропущено:           {report['skipped']}",
+        f"Скачивание:          {stages['download']['files']} файлов за {stages['download']['seconds']:.1f} с",
+        f"Разбор:              {stages['parse']['files']} файлов, {stages['parse']['seconds']:.1f} с в потоках разбора",
+        f"Запись в БД:         {stages['write']['files']} файлов, пакетов {stages['write']['batches']}, "
+        f"{stages['write']['seconds']:.1f} с",
+        f"Общее время:         {report['elapsed_seconds']:.1f} с",
+    ])
@@ -0,0 +1,223 @@
+"""
+Компактный контекст расписания для промпта LLM
+
+Вместо json.dumps(lessons, indent=2) расписание выводится таблицей:
+- названия предметов и ФИО преподавателей выносятся в словари (П1, Пр1) и не повторяются
+- в промпт попадают только дни и предметы, о которых спрашивают (если их удалось определить)
+- общий размер ограничен бюджетом токенов AI_CONTEXT_TOKENS
+"""
+import os
+import re
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from metrics import ai_metrics
+
+DAY_NAMES = {1: 'Пн', 2: 'Вт', 3: 'Ср', 4: 'Чт', 5: 'Пт', 6: 'Сб', 7: 'Вс'}
+
+# Основы названий дней недели (падежи: "в среду", "по понедельникам")
+DAY_PATTERNS = [
+    (1, re.compile(r'\bпонедельн|\bпн\b')),
+    (2, re.compile(r'\bвторн|\bвт\b')),
+    (3, re.compile(r'\bсред[ауые]\b|\bср\b')),
+    (4, re.compile(r'\bчетверг|\bчт\b')),
+    (5, re.compile(r'\bпятниц|\bпт\b')),
+    (6, re.compile(r'\bсуббот|\bсб\b')),
+]
+TODAY_PATTERN = re.compile(r'\bсегодня')
+TOMORROW_PATTERN = re.compile(r'\bзавтра')
+WORD_PATTERN = re.compile(r'[а-яёa-z]{4,}')
+
+LESSON_TYPES = {'lecture': 'лек', 'practice': 'пр', 'lab': 'лаб', 'seminar': 'сем'}
+PARITY = {'odd': 'неч', 'even': 'чет', 'both': ''}
+
+# Длина основы слова для сравнения с названиями предметов ("математике" -> "матем")
+STEM_LENGTH = 5
+
+
+def estimate_tokens(text: str) -> int:
+    """Оценка числа токенов (для кириллицы у моделей OpenAI/Gemini около 3 символов на токен)"""
+    return len(text) // 3 + 1
+
+
+def _time_range(lesson: Dict) -> str:
+    start, end = lesson.get('lesson_start'), lesson.get('lesson_end')
+    if not start:
+        return ''
+    return f"{str(start)[:5]}-{str(end)[:5]}" if end else str(start)[:5]
+
+
+class ContextCompiler:
+    """Сборка контекста расписания под бюджет токенов"""
+
+    def __init__(self, token_budget: Optional[int] = None):
+        """
+        Args:
+            token_budget: Максимум токенов на весь системный промпт (по умолчанию AI_CONTEXT_TOKENS)
+        """
+        self.token_budget = token_budget or int(os.getenv('AI_CONTEXT_TOKENS', '1500'))
+
+    @staticmethod
+    def relevant_days(message: str, now: Optional[datetime] = None) -> List[int]:
+        """Дни недели, упомянутые в вопросе (включая "сегодня" и "завтра")"""
+        message = message.lower()
+        now = now or datetime.now()
+        days = [day for day, pattern in DAY_PATTERNS if pattern.search(message)]
+        if TODAY_PATTERN.search(message):
+            days.append(now.isoweekday())
+        if TOMORROW_PATTERN.search(message):
+            days.append((now + timedelta(days=1)).isoweekday())
+        return sorted(set(days))
+
+    @staticmethod
+    def relevant_subjects(message: str, subjects: List[str]) -> List[str]:
+        """Предметы группы, упомянутые в вопросе (по основам слов)"""
+        stems = {word[:STEM_LENGTH] for word in WORD_PATTERN.findall(message.lower())}
+        if not stems:
+            return []
+        found = []
+        for subject in subjects:
+            subject_stems = {word[:STEM_LENGTH] for word in WORD_PATTERN.findall(subject.lower())}
+            if stems & subject_stems:
+                found.append(subject)
+        return found
+
+    def select_lessons(self, message: str, lessons: List[Dict]) -> Tuple[List[Dict], str]:
+        """
+        Оставляет занятия, относящиеся к вопросу
+
+        Returns:
+            (занятия, описание фильтра для промпта)
+        """
+        filters = []
+        days = self.relevant_days(message)
+        if days:
+            day_lessons = [l for l in lessons if l.get('day_of_week') in days]
+            if day_lessons:
+                lessons = day_lessons
+                filters.append('дни: ' + ', '.join(DAY_NAMES[d] for d in days))
+
+        subjects = self.relevant_subjects(message, sorted({l.get('subject') or '' for l in lessons}))
+        if subjects:
+            lessons = [l for l in lessons if l.get('subject') in subjects]
+            filters.append('предметы: ' + ', '.join(subjects))
+
+        return lessons, '; '.join(filters)
+
+    @staticmethod
+    def render_lessons(lessons: List[Dict]) -> List[str]:
+        """Таблица занятий со словарями предметов и преподавателей"""
+        subjects: Dict[str, str] = {}
+        teachers: Dict[str, str] = {}
+        rows = []
+        for lesson in sorted(lessons, key=lambda l: (l.get('day_of_week') or 0, l.get('lesson_number') or 0)):
+            subject = lesson.get('subject') or ''
+            teacher = lesson.get('teacher') or ''
+            subject_id = subjects.setdefault(subject, f"П{len(subjects) + 1}") if subject else ''
+            teacher_id = teachers.setdefault(teacher, f"Пр{len(teachers) + 1}") if teacher else ''
+            rows.append('|'.join([
+                DAY_NAMES.get(lesson.get('day_of_week'), ''),
+                str(lesson.get('lesson_number') or ''),
+                _time_range(lesson),
+                subject_id,
+                LESSON_TYPES.get(lesson.get('lesson_type'), lesson.get('lesson_type') or ''),
+                teacher_id,
+                lesson.get('classroom') or '',
+                PARITY.get(lesson.get('week_parity'), lesson.get('week_parity') or ''),
+            ]).rstrip('|'))
+
+        lines = [f"{sid}={name}" for name, sid in subjects.items()]
+        lines += [f"{tid}={name}" for name, tid in teachers.items()]
+        lines.append("день|пара|время|предмет|тип|преподаватель|аудитория|неделя (неч/чет, пусто - каждую)")
+        return lines + rows
+
+    @staticmethod
+    def render_analytics(analytics_data: Dict) -> List[str]:
+        """Аналитика в несколько строк вместо JSON"""
+        lines = []
+        load = analytics_data.get('weekly_load') or {}
+        if load:
+            by_day = ', '.join(f"{DAY_NAMES.get(int(d), d)} {n}" for d, n in sorted(load.get('lessons_by_day', {}).items()))
+            lines.append(
+                f"Нагрузка: {load.get('total_lessons', 0)} пар, {load.get('total_hours', 0)} ч в неделю"
+                + (f" ({by_day})" if by_day else '')
+            )
+        balance = analytics_data.get('hour_balance') or {}
+        if balance:
+            lines.append(
+                f"Часы: лекции {balance.get('lecture_hours', 0)}, практика {balance.get('practice_hours', 0)}, "
+                f"лабораторные {balance.get('lab_hours', 0)}"
+            )
+            lines += [f"- {r}" for r in balance.get('recommendations', [])]
+        priorities = analytics_data.get('priorities') or {}
+        for exam in priorities.get('upcoming_exams', []):
+            lines.append(
+                f"Экзамен: {exam.get('subject', '')} {exam.get('date', '')}"
+                + (f" (через {exam['days_until']} дн.)" if exam.get('days_until') is not None else '')
+            )
+        return lines
+
+    def compile(
+        self,
+        header: str,
+        user_message: str = '',
+        schedule_data: Optional[Dict] = None,
+        analytics_data: Optional[Dict] = None
+    ) -> Tuple[str, Dict]:
+        """
+        Собирает системный промпт под бюджет токенов
+
+        Сначала сокращается аналитика, затем отбрасываются занятия с конца таблицы.
+
+        Returns:
+            (промпт, статистика: tokens, chars, lessons_total, lessons_included, truncated)
+        """
+        lessons = (schedule_data or {}).get('lessons') or []
+        selected, filter_note = self.select_lessons(user_message, lessons)
+        selected = sorted(selected, key=lambda l: (l.get('day_of_week') or 0, l.get('lesson_number') or 0))
+
+        parts = [header]
+        budget_left = self.token_budget - estimate_tokens(header)
+
+        analytics_lines = self.render_analytics(analytics_data) if analytics_data else []
+        if analytics_lines:
+            analytics_text = "\n\nАналитика:\n" + "\n".join(analytics_lines)
+            # Аналитике - не больше четверти бюджета, остальное - расписанию
+            if estimate_tokens(analytics_text) <= budget_left // 4:
+                parts.append(analytics_text)
+                budget_left -= estimate_tokens(analytics_text)
+
+        included = 0
+        truncated = False
+        if selected:
+            title = "\n\nРасписание" + (f" ({filter_note})" if filter_note else '') + ":\n"
+            text = title + "\n".join(self.render_lessons(selected))
+            included = len(selected)
+            if estimate_tokens(text) > budget_left:
+                # Бинарный поиск: сколько первых занятий помещается (с запасом на примечание)
+                low, high = 0, len(selected)
+                while low < high:
+                    mid = (low + high + 1) // 2
+                    candidate = title + "\n".join(self.render_lessons(selected[:mid]))
+                    if estimate_tokens(candidate) <= budget_left - 10:
+                        low = mid
+                    else:
+                        high = mid - 1
+                included, truncated = low, True
+                text = title + "\n".join(self.render_lessons(selected[:low])) if low else title
+                text += f"\n(еще {len(selected) - low} занятий не поместились)"
+            parts.append(text)
+
+        context = ''.join(parts)
+        stats = {
+            'tokens': estimate_tokens(context),
+            'chars': len(context),
+            'lessons_total': len(lessons),
+            'lessons_included': included,
+            'truncated': truncated,
+        }
+        ai_metrics.observe('prompt_tokens', stats['tokens'])
+        ai_metrics.observe('prompt_lessons', included)
+        if truncated:
+            ai_metrics.increment('prompt_truncated')
+        return context, stats
@@ -43,7 +43,7 @@ try:
             lesson_number,
             subject,
             COUNT(DISTINCT week_parity) as parity_count
-        FROM lessons
+        FROM lesson_details
         WHERE group_id = %s
         GROUP BY day_of_week, lesson_number, subject
         HAVING COUNT(DISTINCT week_parity) > 1
@@ -70,7 +70,7 @@ try:
         
         cur.execute("""
             SELECT id, day_of_week, lesson_number, subject
-            FROM lessons
+            FROM lesson_details
             WHERE group_id = %s AND week_parity = 'even'
         """, (group_id,))
         
@@ -86,7 +86,7 @@ try:
     else:
         # Если нет чередующихся занятий, удаляем все занятия четной недели
         cur.execute("""
-            SELECT COUNT(*) FROM lessons
+            SELECT COUNT(*) FROM lesson_details
             WHERE group_id = %s AND week_parity = 'even'
         """, (group_id,))
         
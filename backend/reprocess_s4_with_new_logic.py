@@ -5,6 +5,7 @@ import io
 import psycopg2
 from dotenv import load_dotenv
 from excel_parser import ExcelScheduleParser
+from ingest import save_lessons
 from pathlib import Path
 
 # Исправление кодировки для Windows
@@ -78,37 +79,15 @@ try:
             print(f"      Распарсено занятий: {len(lessons)}")
             total_parsed += len(lessons)
             
-            # Сохраняем в БД
-            saved = 0
-            for lesson in lessons:
-                try:
-                    cur.execute("""
-                        INSERT INTO lessons (
-                            group_id, day_of_week, lesson_number,
-                            subject, teacher, classroom, lesson_type,
-                            week_parity, building, notes, is_active, created_at
-                        ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, TRUE, NOW())
-                    """, (
-                        lesson['group_id'],
-                        lesson['day_of_week'],
-                        lesson['lesson_number'],
-                        lesson['subject'],
-                        lesson.get('teacher'),
-                        lesson.get('classroom'),
-                        lesson['lesson_type'],
-                        lesson['week_parity'],
-                        lesson.get('building'),
-                        lesson.get('notes')
-                    ))
-                    saved += 1
-                except Exception as e:
-                    print(f"      ⚠ Ошибка сохранения занятия: {e}")
+            # Сохраняем в БД (справочники предметов, преподавателей и аудиторий - ingest.py)
+            saved, _ = save_lessons(cur, lessons)
             
             conn.commit()
             print(f"      ✅ Сохранено занятий: {saved}")
             total_saved += saved
             
         except Exception as e:
+            conn.rollback()
             print(f"      ❌ Ошибка обработки файла: {e}")
             import traceback
             traceback.print_exc()
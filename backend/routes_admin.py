@@ -0,0 +1,219 @@
+"""
+Административное API: загрузка и парсинг Excel файлов, проверка конфликтов
+"""
+from flask import Blueprint, jsonify, request, current_app
+from psycopg2.extras import RealDictCursor
+import os
+from pathlib import Path
+from werkzeug.utils import secure_filename
+from content_store import ContentStore, is_content_store
+from schedule_conflicts import detect_conflicts
+from database import get_db_connection
+from ingest import parse_schedule_file, save_lessons, run_post_ingest_checks
+
+admin_bp = Blueprint('admin', __name__)
+
+# Настройки для загрузки файлов
+ALLOWED_EXTENSIONS = {'xlsx', 'xls'}
+
+def allowed_file(filename):
+    """Проверяет, разрешен ли тип файла"""
+    return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
+
+@admin_bp.route('/v1/admin/parse-excel', methods=['POST'])
+def parse_excel():
+    """Парсинг Excel файла с расписанием"""
+    try:
+        # Проверяем наличие файла
+        if 'file' not in request.files:
+            return jsonify({'error': 'Файл не загружен'}), 400
+        
+        file = request.files['file']
+        if file.filename == '':
+            return jsonify({'error': 'Файл не выбран'}), 400
+        
+        if not allowed_file(file.filename):
+            return jsonify({'error': 'Неподдерживаемый формат файла. Используйте .xlsx или .xls'}), 400
+        
+        # Получаем параметры
+        group_code = request.form.get('group_code')
+        group_id = request.form.get('group_id', type=int)
+        
+        if not group_code:
+            return jsonify({'error': 'Не указан код группы'}), 400
+        
+        if not group_id:
+            # Пытаемся найти group_id по коду
+            conn = get_db_connection()
+            cur = conn.cursor(cursor_factory=RealDictCursor)
+            cur.execute("SELECT id FROM groups WHERE code = %s AND is_active = TRUE", (group_code,))
+            group_result = cur.fetchone()
+            cur.close()
+            conn.close()
+            
+            if not group_result:
+                return jsonify({'error': f'Группа с кодом {group_code} не найдена'}), 404
+            
+            group_id = group_result['id']
+        
+        # Сохраняем файл во временную директорию
+        filename = secure_filename(file.filename)
+        file_path = os.path.join(current_app.config['UPLOAD_FOLDER'], filename)
+        file.save(file_path)
+        
+        try:
+            # Парсим и проверяем файл
+            print(f"[DEBUG] Парсинг файла: {file_path}")
+            print(f"[DEBUG] Код группы: {group_code}, ID: {group_id}")
+            parsed = parse_schedule_file(file_path, group_code, group_id)
+            print(f"[DEBUG] Найдено занятий: {parsed['lessons_parsed']}")
+            
+            if parsed['warning']:
+                # Если занятий нет, это не ошибка валидации, а пустой файл
+                return jsonify({
+                    'success': True,
+                    'message': 'Файл обработан, но занятий не найдено',
+                    'lessons_parsed': 0,
+                    'lessons_saved': 0,
+                    'warnings': [parsed['warning']]
+                }), 200
+            
+            if parsed['error']:
+                # Слишком много ошибок - возвращаем ошибку
+                return jsonify({
+                    'error': parsed['error'],
+                    'errors': parsed['validation_errors'],  # Показываем первые 10
+                    'errors_count': parsed['errors_count'],
+                    'lessons_count': parsed['lessons_parsed']
+                }), 400
+            
+            if parsed['errors_count']:
+                print(f"[WARNING] Файл {filename}: {parsed['errors_count']} ошибок валидации из {parsed['lessons_parsed']} занятий")
+            if parsed['lessons_filtered']:
+                print(f"[WARNING] Отфильтровано {parsed['lessons_filtered']} невалидных занятий из {parsed['lessons_parsed']}")
+            
+            # Сохраняем в БД только валидные занятия
+            conn = get_db_connection()
+            try:
+                cur = conn.cursor()
+                saved_count, updated_count = save_lessons(cur, parsed['lessons'])
+                conn.commit()
+                cur.close()
+            finally:
+                conn.close()
+            
+            # Удаляем временный файл
+            try:
+                os.remove(file_path)
+            except:
+                pass
+            
+            conflicts = run_post_ingest_checks()
+            
+            return jsonify({
+                'success': True,
+                'message': f'Обработано занятий: {saved_count}',
+                'lessons_parsed': parsed['lessons_parsed'],
+                'lessons_saved': saved_count,
+                'lessons_updated': updated_count,
+                'lessons_filtered': parsed['lessons_filtered'],
+                'errors': None,
+                'warnings': parsed['validation_errors'][:5] if parsed['errors_count'] else None,
+                'conflicts': conflicts
+            }), 200
+            
+        except Exception as e:
+            # Удаляем временный файл в случае ошибки
+            try:
+                os.remove(file_path)
+            except:
+                pass
+            return jsonify({'error': f'Ошибка парсинга файла: {str(e)}'}), 500
+            
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@admin_bp.route('/v1/admin/batch-parse', methods=['POST'])
+def batch_parse():
+    """Пакетная обработка Excel файлов из директории"""
+    try:
+        data = request.get_json() if request.is_json else request.form.to_dict()
+        
+        # Получаем путь к директории
+        directory = data.get('directory') or request.form.get('directory')
+        if not directory:
+            return jsonify({'error': 'Не указана директория'}), 400
+        
+        if not os.path.isdir(directory):
+            return jsonify({'error': f'Директория не существует: {directory}'}), 400
+        
+        # Сканируем директорию на наличие Excel файлов
+        excel_files = []
+        if is_content_store(directory):
+            # Папка загрузчика: актуальные версии файлов лежат в хранилище по хэшам
+            excel_files = [p for p in ContentStore(directory).current_files() if p.suffix.lower() in ('.xlsx', '.xls')]
+        else:
+            for ext in ['.xlsx', '.xls']:
+                excel_files.extend(Path(directory).glob(f'*{ext}'))
+        
+        if not excel_files:
+            return jsonify({
+                'success': True,
+                'message': 'Файлы не найдены',
+                'files_processed': 0,
+                'results': []
+            }), 200
+        
+        # Разбор в потоках сервера, запись пакетами; конфликты проверяются один раз в конце
+        from pipeline import IngestPipeline
+        results = IngestPipeline(processes=False).run(files=excel_files)
+        
+        return jsonify({
+            'success': True,
+            'message': f'Обработано файлов: {results["processed"]}/{results["total_files"]}',
+            'total_files': results['total_files'],
+            'processed': results['processed'],
+            'success': results['success'],
+            'failed': results['failed'],
+            'skipped': results['skipped'],
+            'results': results['results'],
+            'conflicts': results['conflicts']
+        }), 200
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@admin_bp.route('/v1/admin/conflicts', methods=['GET'])
+def get_conflicts():
+    """Конфликты расписания: преподаватели и аудитории, занятые у разных групп одновременно"""
+    try:
+        resource = request.args.get('type')  # teacher, classroom или null для обоих
+        if resource and resource not in ('teacher', 'classroom'):
+            return jsonify({'error': 'Параметр type должен быть teacher или classroom'}), 400
+        
+        resources = [resource] if resource else None
+        
+        conn = get_db_connection()
+        try:
+            report = detect_conflicts(conn, resources)
+        finally:
+            conn.close()
+        
+        group_code = request.args.get('group')
+        if group_code:
+            for key in ('teacher', 'classroom'):
+                if key in report:
+                    report[key] = [
+                        c for c in report[key]
+                        if any(l['groupCode'] == group_code for l in c['lessons'])
+                    ]
+            report['total_conflicts'] = sum(len(report[k]) for k in ('teacher', 'classroom') if k in report)
+        
+        return jsonify({
+            'lessonsChecked': report['lessons_checked'],
+            'totalConflicts': report['total_conflicts'],
+            'teacher': report.get('teacher', []),
+            'classroom': report.get('classroom', [])
+        }), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
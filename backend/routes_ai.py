@@ -0,0 +1,314 @@
+"""
+AI API: чат-ассистент по расписанию и поиск следующего занятия
+"""
+from flask import Blueprint, Response, jsonify, request
+import json
+import time
+import threading
+from typing import Optional
+from ai_executor import get_ai_executor, AIRequestRejected, AIRequestTimeout
+from metrics import ai_metrics
+from schedule_cache import get_schedule_cache
+
+ai_bp = Blueprint('ai', __name__)
+
+# AI сервис создается при первом обращении: импорт SDK провайдеров
+# не должен замедлять запуск воркеров, которые обслуживают только расписание
+_ai_service = None
+_ai_service_lock = threading.Lock()
+
+
+def get_ai_service():
+    """Возвращает общий экземпляр AIService (создается лениво)"""
+    global _ai_service
+    if _ai_service is None:
+        with _ai_service_lock:
+            if _ai_service is None:
+                from ai_service import AIService
+                _ai_service = AIService()
+    return _ai_service
+
+
+def load_schedule_version(group_code: Optional[str]):
+    """Версия расписания группы из общего кэша (обычно без обращения к БД)"""
+    if not group_code:
+        return None
+    try:
+        return get_schedule_cache().get_version(group_code)
+    except Exception as e:
+        print(f"Ошибка получения версии расписания: {e}")
+        return None
+
+
+def load_schedule_data(group_code: Optional[str]):
+    """Расписание группы для контекста AI (None, если группа не найдена или БД недоступна)"""
+    if not group_code:
+        return None
+    try:
+        return get_schedule_cache().get_schedule(group_code)
+    except Exception as e:
+        print(f"Ошибка получения расписания для контекста: {e}")
+        # Продолжаем без контекста расписания
+        return None
+
+
+def fetch_exams_data(group_code: str):
+    """Экзамены группы для приоритетов (парсинг сайта, выполняется в пуле AI)"""
+    return get_schedule_cache().get_exams(group_code)
+
+
+def local_answer(ai_service, user_message, group_code, schedule_data):
+    """
+    Локальный ответ без пула AI (None - нужен LLM)
+
+    Returns:
+        (ответ или None, экзамены группы, если вопрос о них, иначе None)
+    """
+    exams_data = None
+    if schedule_data and ai_service.intents.wants_exams(user_message):
+        # Вопрос об экзаменах отвечается локально: экзамены из общего кэша (сайт - раз в AI_EXAMS_TTL)
+        exams_data = fetch_exams_data(group_code)
+    response = ai_service.get_quick_response(
+        user_message, group_code, schedule_data, use_cache=False, exams_data=exams_data
+    )
+    return response, exams_data
+
+
+def answer_with_llm(user_message, group_code, schedule_data, exams_data, deadline, prompt_stats=None):
+    """Задача для пула AI: сбор экзаменов и обращение к провайдеру (локальный ответ уже проверен)"""
+    if exams_data is None and schedule_data:
+        exams_data = fetch_exams_data(group_code)
+    return get_ai_service().get_response(
+        user_message=user_message,
+        group_code=group_code,
+        schedule_data=schedule_data,
+        exams_data=exams_data,
+        deadline=deadline,
+        try_local=False,
+        prompt_stats=prompt_stats
+    )
+
+
+def stream_with_llm(user_message, group_code, schedule_data, exams_data, deadline, prompt_stats=None):
+    """Генератор для пула AI: как answer_with_llm, но отдает фрагменты ответа"""
+    if exams_data is None and schedule_data:
+        exams_data = fetch_exams_data(group_code)
+    yield from get_ai_service().stream_response(
+        user_message=user_message,
+        group_code=group_code,
+        schedule_data=schedule_data,
+        exams_data=exams_data,
+        deadline=deadline,
+        try_local=False,
+        prompt_stats=prompt_stats
+    )
+
+
+def sse_event(data: dict, event: Optional[str] = None) -> str:
+    """Событие server-sent events"""
+    payload = json.dumps(data, ensure_ascii=False)
+    return f"event: {event}\ndata: {payload}\n\n" if event else f"data: {payload}\n\n"
+
+@ai_bp.route('/v1/ai/chat', methods=['POST'])
+def ai_chat():
+    """AI чат для вопросов о расписании"""
+    try:
+        data = request.get_json()
+        if not data:
+            return jsonify({'error': 'Необходимо передать JSON данные'}), 400
+        
+        user_message = data.get('message', '').strip()
+        group_code = data.get('group_code')
+        
+        if not user_message:
+            return jsonify({'error': 'Сообщение не может быть пустым'}), 400
+        
+        started = time.perf_counter()
+        ai_service = get_ai_service()
+        
+        # Сначала кэш ответов: версия расписания обычно уже в памяти, БД и сайт не нужны
+        ai_response = ai_service.get_cached_response(user_message, group_code, load_schedule_version(group_code))
+        schedule_data = exams_data = None
+        if not ai_response:
+            # Локальные ответы по общему кэшу расписаний не занимают пул AI
+            schedule_data = load_schedule_data(group_code)
+            ai_response, exams_data = local_answer(ai_service, user_message, group_code, schedule_data)
+        
+        # Статистика промпта этого запроса (заполняется, если вызывался LLM)
+        prompt_stats = {}
+        if not ai_response:
+            # Экзамены и LLM - в ограниченном пуле, поток веб-сервера только ждет результат
+            executor = get_ai_executor()
+            try:
+                ai_response = executor.run(
+                    answer_with_llm,
+                    user_message, group_code, schedule_data, exams_data, executor.deadline(), prompt_stats
+                )
+            except AIRequestRejected as e:
+                response = jsonify({'error': str(e), 'retry_after': 5})
+                response.headers['Retry-After'] = '5'
+                return response, 503
+            except AIRequestTimeout as e:
+                return jsonify({'error': str(e)}), 504
+        
+        ai_metrics.observe('chat_total_ms', (time.perf_counter() - started) * 1000)
+        return jsonify({
+            'response': ai_response,
+            'group_code': group_code,
+            'prompt': prompt_stats or None
+        }), 200
+        
+    except Exception as e:
+        print(f"Ошибка AI чата: {e}")
+        import traceback
+        traceback.print_exc()
+        return jsonify({'error': str(e)}), 500
+
+@ai_bp.route('/v1/ai/chat/stream', methods=['POST'])
+def ai_chat_stream():
+    """
+    AI чат с потоковым ответом (server-sent events)
+    
+    События:
+        data: {"token": "..."}                                   - фрагмент ответа
+        event: done, data: {"response", "cached", "local", ...}  - полный ответ и время
+                                                                   (cached - из кэша, local - без LLM)
+        event: error, data: {"error": "..."}                     - ошибка или истек срок
+    """
+    try:
+        data = request.get_json()
+        if not data:
+            return jsonify({'error': 'Необходимо передать JSON данные'}), 400
+        
+        user_message = data.get('message', '').strip()
+        group_code = data.get('group_code')
+        
+        if not user_message:
+            return jsonify({'error': 'Сообщение не может быть пустым'}), 400
+        
+        started = time.perf_counter()
+        ai_service = get_ai_service()
+        
+        # Ответ из кэша или локальный ответ отдается сразу, без пула AI
+        cached_response = ai_service.get_cached_response(user_message, group_code, load_schedule_version(group_code))
+        local_response = None
+        schedule_data = exams_data = None
+        if not cached_response:
+            schedule_data = load_schedule_data(group_code)
+            local_response, exams_data = local_answer(ai_service, user_message, group_code, schedule_data)
+        prompt_stats = {}
+        if cached_response or local_response:
+            tokens = iter([cached_response or local_response])
+        else:
+            executor = get_ai_executor()
+            try:
+                tokens = executor.stream(
+                    stream_with_llm,
+                    user_message, group_code, schedule_data, exams_data, executor.deadline(), prompt_stats
+                )
+            except AIRequestRejected as e:
+                response = jsonify({'error': str(e), 'retry_after': 5})
+                response.headers['Retry-After'] = '5'
+                return response, 503
+        
+        def generate():
+            parts = []
+            ttfb_ms = None
+            try:
+                for token in tokens:
+                    if ttfb_ms is None:
+                        ttfb_ms = (time.perf_counter() - started) * 1000
+                        ai_metrics.observe('stream_ttfb_ms', ttfb_ms)
+                    parts.append(token)
+                    yield sse_event({'token': token})
+            except AIRequestTimeout as e:
+                ai_metrics.increment('stream_timeouts')
+                yield sse_event({'error': str(e)}, event='error')
+                return
+            except Exception as e:
+                print(f"Ошибка потокового AI чата: {e}")
+                ai_metrics.increment('stream_errors')
+                yield sse_event({'error': str(e)}, event='error')
+                return
+            
+            total_ms = (time.perf_counter() - started) * 1000
+            ai_metrics.observe('stream_total_ms', total_ms)
+            yield sse_event({
+                'response': ''.join(parts).strip(),
+                'group_code': group_code,
+                'cached': bool(cached_response),
+                'local': bool(local_response),
+                'prompt': prompt_stats or None,
+                'ttfb_ms': round(ttfb_ms or total_ms, 1),
+                'total_ms': round(total_ms, 1)
+            }, event='done')
+        
+        return Response(generate(), mimetype='text/event-stream', headers={
+            'Cache-Control': 'no-cache',
+            # Отключает буферизацию ответа в nginx
+            'X-Accel-Buffering': 'no'
+        })
+        
+    except Exception as e:
+        print(f"Ошибка AI чата: {e}")
+        import traceback
+        traceback.print_exc()
+        return jsonify({'error': str(e)}), 500
+
+@ai_bp.route('/v1/ai/status', methods=['GET'])
+def ai_status():
+    """Проверка статуса AI сервиса"""
+    try:
+        ai_service = get_ai_service()
+        is_configured = ai_service.is_configured()
+        return jsonify({
+            'configured': is_configured,
+            'provider': ai_service.provider,
+            'executor': get_ai_executor().stats(),
+            'cache': ai_service.cache.stats(),
+            'metrics': ai_metrics.snapshot(),
+            'message': 'AI сервис настроен' if is_configured else 'AI сервис не настроен. Установите API ключ в переменных окружения.'
+        }), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@ai_bp.route('/v1/ai/find-next-lesson', methods=['POST'])
+def find_next_lesson():
+    """Найти следующее занятие по предмету"""
+    try:
+        data = request.get_json()
+        if not data:
+            return jsonify({'error': 'Необходимо передать JSON данные'}), 400
+        
+        subject_query = data.get('subject', '').strip()
+        group_code = data.get('group_code')
+        
+        if not subject_query or not group_code:
+            return jsonify({'error': 'Необходимо указать subject и group_code'}), 400
+        
+        schedule_data = get_schedule_cache().get_schedule(group_code)
+        if schedule_data is None:
+            return jsonify({'error': 'Group not found'}), 404
+        
+        # Копии: find_next_lesson дописывает поля в найденное занятие
+        lessons = [dict(l) for l in schedule_data['lessons']]
+        
+        from schedule_analytics import ScheduleAnalytics
+        next_lesson = ScheduleAnalytics.find_next_lesson(lessons, subject_query)
+        
+        if next_lesson:
+            return jsonify({
+                'found': True,
+                'lesson': next_lesson
+            }), 200
+        else:
+            return jsonify({
+                'found': False,
+                'message': f'Занятие по "{subject_query}" не найдено'
+            }), 200
+        
+    except Exception as e:
+        print(f"Ошибка поиска занятия: {e}")
+        import traceback
+        traceback.print_exc()
+        return jsonify({'error': str(e)}), 500
@@ -0,0 +1,914 @@
+"""
+Публичное API чтения расписания: факультеты, группы, расписание, экзамены, поиск
+"""
+from flask import Blueprint, jsonify, request
+from psycopg2.extras import RealDictCursor
+import os
+import json
+import hashlib
+from datetime import date
+from database import get_db_connection
+import bell_schedule
+import occurrences
+
+public_bp = Blueprint('public', __name__)
+
+# Ограничения пакетного запроса расписания
+MAX_BATCH_GROUPS = int(os.getenv('MAX_BATCH_GROUPS', '20'))
+MAX_BATCH_LESSONS = int(os.getenv('MAX_BATCH_LESSONS', '5000'))
+
+# Код группы -> ID (покрывающий индекс idx_groups_code)
+GROUP_ID_SQL = "SELECT id FROM groups WHERE code = %s AND is_active = TRUE"
+
+# Занятия для format_lesson; WHERE дописывается в обработчике, время пары -
+# из расписания звонков (bell_schedule.py), без соединения с bell_schedule
+LESSONS_SQL = """
+    SELECT
+        l.id,
+        l.group_id,
+        l.day_of_week,
+        l.lesson_number,
+        l.subject,
+        l.teacher,
+        l.classroom,
+        l.lesson_type,
+        l.week_parity,
+        l.building,
+        l.notes
+    FROM lesson_details l
+"""
+
+# Четность одним IN: условие входит в индекс idx_lessons_active_slot (миграция 005_read_indexes),
+# занятия без четности миграция заменила на 'both'
+PARITY_SQL = " AND l.week_parity IN (%s, 'both')"
+
+# Поиск по написаниям из справочников предметов, преподавателей и аудиторий (сотни строк):
+# ID подставляются массивами, поэтому занятия выбираются по индексам *_name_id (BitmapOr),
+# без LIKE по всей таблице lessons. Фильтр по группе (SEARCH_GROUP_SQL) дописывается
+# в обработчике подзапросом: соединение с groups для поиска по всем группам не нужно
+SEARCH_SQL = """
+    SELECT DISTINCT
+        l.id,
+        l.lesson_number,
+        l.day_of_week,
+        l.subject,
+        COALESCE(l.teacher, '') as teacher,
+        COALESCE(l.classroom, '') as classroom,
+        COALESCE(l.lesson_type, 'lecture') as lesson_type,
+        COALESCE(l.week_parity, 'both') as week_parity
+    FROM lesson_details l
+    WHERE (
+        l.subject_name_id = ANY(ARRAY(SELECT id FROM subject_names WHERE LOWER(name) LIKE LOWER(%s))) OR
+        l.teacher_name_id = ANY(ARRAY(SELECT id FROM teacher_names WHERE LOWER(name) LIKE LOWER(%s))) OR
+        l.classroom_name_id = ANY(ARRAY(SELECT id FROM classroom_names WHERE LOWER(name) LIKE LOWER(%s)))
+    )
+"""
+SEARCH_GROUP_SQL = " AND l.group_id IN (SELECT id FROM groups WHERE code = %s)"
+
+
+
+def format_lesson(l):
+    """Преобразует строку занятия из БД в формат, ожидаемый Android приложением"""
+    return {
+        'id': l['id'],
+        'groupId': l['group_id'],
+        'dayOfWeek': l['day_of_week'],
+        'lessonNumber': l['lesson_number'],
+        'subject': l['subject'],
+        'teacher': l['teacher'] or '',
+        'classroom': l['classroom'] or '',
+        'lessonType': l['lesson_type'] or 'lecture',  # Значение по умолчанию, если null
+        'weekParity': l['week_parity'] or 'both',  # Значение по умолчанию, если null
+        'building': l['building'] or '',
+        'notes': l['notes'] or '',
+        'timeStart': str(l['lesson_start']) if l['lesson_start'] else None,
+        'timeEnd': str(l['lesson_end']) if l['lesson_end'] else None
+    }
+
+def compute_etag(data):
+    """Вычисляет ETag для JSON данных"""
+    payload = json.dumps(data, ensure_ascii=False, sort_keys=True, separators=(',', ':'))
+    return hashlib.md5(payload.encode('utf-8')).hexdigest()
+
+@public_bp.route('/v1/faculties', methods=['GET'])
+def get_faculties():
+    """Получить список факультетов"""
+    try:
+        conn = get_db_connection()
+        cur = conn.cursor(cursor_factory=RealDictCursor)
+        
+        cur.execute("""
+            SELECT id, code, name_ru as name, name_en, description, is_active
+            FROM faculties
+            WHERE is_active = TRUE
+            ORDER BY code
+        """)
+        
+        faculties = cur.fetchall()
+        cur.close()
+        conn.close()
+        
+        return jsonify([dict(f) for f in faculties]), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@public_bp.route('/v1/faculties/<int:faculty_id>/departments', methods=['GET'])
+def get_departments(faculty_id):
+    """Получить кафедры факультета"""
+    try:
+        conn = get_db_connection()
+        cur = conn.cursor(cursor_factory=RealDictCursor)
+        
+        cur.execute("""
+            SELECT id, code, name_ru as name, name_en, faculty_id, description, is_active
+            FROM departments
+            WHERE faculty_id = %s AND is_active = TRUE
+            ORDER BY name_ru
+        """, (faculty_id,))
+        
+        departments = cur.fetchall()
+        cur.close()
+        conn.close()
+        
+        return jsonify([dict(d) for d in departments]), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@public_bp.route('/v1/departments', methods=['GET'])
+def get_all_departments():
+    """Получить все кафедры"""
+    try:
+        conn = get_db_connection()
+        cur = conn.cursor(cursor_factory=RealDictCursor)
+        
+        cur.execute("""
+            SELECT 
+                d.id, 
+                d.code, 
+                d.name_ru as name, 
+                d.name_en, 
+                d.faculty_id,
+                f.code as faculty_code,
+                f.name_ru as faculty_name,
+                d.description, 
+                d.is_active
+            FROM departments d
+            JOIN faculties f ON d.faculty_id = f.id
+            WHERE d.is_active = TRUE AND f.is_active = TRUE
+            ORDER BY f.code, d.name_ru
+        """)
+        
+        departments = cur.fetchall()
+        cur.close()
+        conn.close()
+        
+        return jsonify([dict(d) for d in departments]), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@public_bp.route('/v1/groups', methods=['GET'])
+def get_groups():
+    """Получить группы по факультету и форме обучения"""
+    try:
+        faculty_code = request.args.get('faculty')
+        education_form = request.args.get('form')
+        
+        conn = get_db_connection()
+        cur = conn.cursor(cursor_factory=RealDictCursor)
+        
+        query = """
+            SELECT 
+                g.id,
+                g.code,
+                g.name,
+                g.faculty_id,
+                f.code as faculty_code,
+                f.name_ru as faculty_name,
+                g.department_id,
+                d.name_ru as department_name,
+                g.specialization,
+                g.course,
+                g.education_form,
+                g.student_count,
+                g.is_active
+            FROM groups g
+            JOIN faculties f ON g.faculty_id = f.id
+            LEFT JOIN departments d ON g.department_id = d.id
+            WHERE g.is_active = TRUE
+        """
+        
+        params = []
+        if faculty_code:
+            query += " AND f.code = %s"
+            params.append(faculty_code)
+        
+        if education_form:
+            query += " AND g.education_form = %s"
+            params.append(education_form)
+        
+        query += " ORDER BY g.course, g.code"
+        
+        cur.execute(query, params)
+        groups = cur.fetchall()
+        cur.close()
+        conn.close()
+        
+        # Преобразуем в формат, ожидаемый Android приложением
+        result = []
+        for g in groups:
+            result.append({
+                'id': g['id'],
+                'code': g['code'],
+                'name': g['name'],
+                'facultyId': g['faculty_id'],
+                'facultyCode': g['faculty_code'],
+                'facultyName': g['faculty_name'],
+                'departmentId': g['department_id'],
+                'departmentName': g['department_name'],
+                'specialization': g['specialization'],
+                'course': g['course'],
+                'educationForm': g['education_form'],
+                'studentCount': g['student_count'] or 0,
+                'isActive': g['is_active']
+            })
+        
+        return jsonify(result), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@public_bp.route('/v1/groups/<code>', methods=['GET'])
+def get_group(code):
+    """Получить информацию о группе"""
+    try:
+        conn = get_db_connection()
+        cur = conn.cursor(cursor_factory=RealDictCursor)
+        
+        cur.execute("""
+            SELECT 
+                g.id,
+                g.code,
+                g.name,
+                g.faculty_id,
+                f.code as faculty_code,
+                f.name_ru as faculty_name,
+                g.department_id,
+                d.name_ru as department_name,
+                g.specialization,
+                g.course,
+                g.education_form,
+                g.student_count,
+                g.is_active
+            FROM groups g
+            JOIN faculties f ON g.faculty_id = f.id
+            LEFT JOIN departments d ON g.department_id = d.id
+            WHERE g.code = %s AND g.is_active = TRUE
+        """, (code,))
+        
+        group = cur.fetchone()
+        cur.close()
+        conn.close()
+        
+        if not group:
+            return jsonify({'error': 'Group not found'}), 404
+        
+        return jsonify({
+            'id': group['id'],
+            'code': group['code'],
+            'name': group['name'],
+            'facultyId': group['faculty_id'],
+            'facultyCode': group['faculty_code'],
+            'facultyName': group['faculty_name'],
+            'departmentId': group['department_id'],
+            'departmentName': group['department_name'],
+            'specialization': group['specialization'],
+            'course': group['course'],
+            'educationForm': group['education_form'],
+            'studentCount': group['student_count'] or 0,
+            'isActive': group['is_active']
+        }), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@public_bp.route('/v1/schedule/group/<code>/day/<int:day>', methods=['GET'])
+def get_day_schedule(code, day):
+    """Получить расписание на день"""
+    try:
+        week_parity = request.args.get('week')  # odd, even, или null для both
+        
+        conn = get_db_connection()
+        cur = conn.cursor(cursor_factory=RealDictCursor)
+        
+        # Получаем group_id по коду
+        cur.execute(GROUP_ID_SQL, (code,))
+        group_result = cur.fetchone()
+        
+        if not group_result:
+            cur.close()
+            conn.close()
+            return jsonify({'error': 'Group not found'}), 404
+        
+        group_id = group_result['id']
+        
+        # Получаем расписание
+        query = LESSONS_SQL + """
+            WHERE l.group_id = %s 
+                AND l.day_of_week = %s
+                AND l.is_active = TRUE
+        """
+        
+        params = [group_id, day]
+        
+        if week_parity:
+            query += PARITY_SQL
+            params.append(week_parity)
+        
+        query += " ORDER BY l.lesson_number"
+        
+        cur.execute(query, params)
+        lessons = cur.fetchall()
+        cur.close()
+        conn.close()
+        
+        bell_schedule.get_bell_schedule().attach(lessons)
+        result = [format_lesson(l) for l in lessons]
+        
+        return jsonify(result), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@public_bp.route('/v1/schedule/group/<code>/date/<date_str>', methods=['GET'])
+def get_date_schedule(code, date_str):
+    """Получить расписание на конкретную дату (YYYY-MM-DD) с учетом четности и занятий из АРМА"""
+    try:
+        lesson_date = date.fromisoformat(date_str)
+    except ValueError:
+        return jsonify({'error': 'Invalid date, expected YYYY-MM-DD'}), 400
+
+    try:
+        conn = get_db_connection()
+        try:
+            cur = conn.cursor(cursor_factory=RealDictCursor)
+            group_id, is_fresh, lessons = occurrences.read_date(cur, code, lesson_date)
+            if group_id is None:
+                cur.close()
+                return jsonify({'error': 'Group not found'}), 404
+
+            if not is_fresh:
+                # Семестр еще не построен или расписание группы изменилось
+                occurrences.materialize_group(conn.cursor(), group_id, code, lesson_date)
+                conn.commit()
+                _, _, lessons = occurrences.read_date(cur, code, lesson_date)
+            cur.close()
+        finally:
+            conn.close()
+
+        result = []
+        for l in lessons:
+            lesson = format_lesson({**l, 'day_of_week': lesson_date.isoweekday()})
+            lesson['date'] = lesson_date.isoformat()
+            lesson['source'] = l['source']
+            result.append(lesson)
+
+        return jsonify(result), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@public_bp.route('/v1/schedule/group/<code>/week', methods=['GET'])
+def get_week_schedule(code):
+    """Получить расписание на неделю"""
+    try:
+        week_parity = request.args.get('week')
+        
+        conn = get_db_connection()
+        cur = conn.cursor(cursor_factory=RealDictCursor)
+        
+        cur.execute(GROUP_ID_SQL, (code,))
+        group_result = cur.fetchone()
+        
+        if not group_result:
+            cur.close()
+            conn.close()
+            return jsonify({'error': 'Group not found'}), 404
+        
+        group_id = group_result['id']
+        
+        query = LESSONS_SQL + """
+            WHERE l.group_id = %s AND l.is_active = TRUE
+        """
+        
+        params = [group_id]
+        
+        if week_parity:
+            query += PARITY_SQL
+            params.append(week_parity)
+        
+        query += " ORDER BY l.day_of_week, l.lesson_number"
+        
+        cur.execute(query, params)
+        lessons = cur.fetchall()
+        cur.close()
+        conn.close()
+        
+        bell_schedule.get_bell_schedule().attach(lessons)
+        result = [format_lesson(l) for l in lessons]
+        
+        return jsonify(result), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@public_bp.route('/v1/schedule/batch', methods=['POST'])
+def get_batch_schedule():
+    """Получить расписание на неделю сразу для нескольких групп"""
+    try:
+        data = request.get_json(silent=True)
+        if not data or not isinstance(data, dict):
+            return jsonify({'error': 'Необходимо передать JSON данные'}), 400
+        
+        group_codes = data.get('groups')
+        week_parity = data.get('week')
+        known_etags = data.get('etags') or {}  # {код группы: ETag}, уже сохраненные на клиенте
+        
+        if not isinstance(group_codes, list) or not group_codes:
+            return jsonify({'error': 'Необходимо передать непустой список groups'}), 400
+        if not all(isinstance(c, str) for c in group_codes):
+            return jsonify({'error': 'Коды групп в groups должны быть строками'}), 400
+        if not isinstance(known_etags, dict):
+            return jsonify({'error': 'Параметр etags должен быть объектом {код группы: ETag}'}), 400
+        
+        # Убираем дубликаты, сохраняя порядок
+        group_codes = list(dict.fromkeys(group_codes))
+        if len(group_codes) > MAX_BATCH_GROUPS:
+            return jsonify({
+                'error': f'Слишком много групп в запросе (максимум {MAX_BATCH_GROUPS})'
+            }), 400
+        
+        if week_parity and week_parity not in ('odd', 'even'):
+            return jsonify({'error': 'Параметр week должен быть odd или even'}), 400
+        
+        conn = get_db_connection()
+        cur = conn.cursor(cursor_factory=RealDictCursor)
+        
+        # Все group_id одним запросом
+        cur.execute(
+            "SELECT id, code FROM groups WHERE code = ANY(%s) AND is_active = TRUE",
+            (group_codes,)
+        )
+        group_ids = {g['code']: g['id'] for g in cur.fetchall()}
+        
+        lessons = []
+        if group_ids:
+            query = LESSONS_SQL + """
+                WHERE l.group_id = ANY(%s) AND l.is_active = TRUE
+            """
+            
+            params = [list(group_ids.values())]
+            
+            if week_parity:
+                query += PARITY_SQL
+                params.append(week_parity)
+            
+            query += " ORDER BY l.group_id, l.day_of_week, l.lesson_number LIMIT %s"
+            params.append(MAX_BATCH_LESSONS + 1)
+            
+            cur.execute(query, params)
+            lessons = cur.fetchall()
+            bell_schedule.get_bell_schedule().attach(lessons)
+        
+        cur.close()
+        conn.close()
+        
+        if len(lessons) > MAX_BATCH_LESSONS:
+            return jsonify({
+                'error': f'Слишком большой ответ (больше {MAX_BATCH_LESSONS} занятий). Уменьшите количество групп'
+            }), 413
+        
+        lessons_by_group = {group_id: [] for group_id in group_ids.values()}
+        for l in lessons:
+            lessons_by_group[l['group_id']].append(format_lesson(l))
+        
+        schedules = {}
+        for code in group_codes:
+            if code not in group_ids:
+                continue
+            week = lessons_by_group[group_ids[code]]
+            etag = compute_etag(week)
+            if known_etags.get(code) == etag:
+                # Расписание группы не изменилось - не передаем его повторно
+                schedules[code] = {'etag': etag, 'notModified': True}
+            else:
+                schedules[code] = {'etag': etag, 'notModified': False, 'lessons': week}
+        
+        return jsonify({
+            'week': week_parity,
+            'schedules': schedules,
+            'notFound': [code for code in group_codes if code not in group_ids]
+        }), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@public_bp.route('/v1/sync', methods=['GET'])
+def sync_lessons():
+    """
+    Дельта-синхронизация расписания для мобильного клиента
+    
+    Возвращает занятия, добавленные, измененные или удаленные после курсора since,
+    и новый курсор для следующего запроса. since=0 (или отсутствует) - полная выгрузка.
+    """
+    try:
+        since_param = request.args.get('since', '0')
+        groups_param = request.args.get('groups', '')
+        
+        try:
+            since = int(since_param or 0)
+            if since < 0:
+                raise ValueError
+        except ValueError:
+            return jsonify({'error': 'Некорректный курсор since'}), 400
+        
+        group_codes = list(dict.fromkeys(c.strip() for c in groups_param.split(',') if c.strip()))
+        if not group_codes:
+            return jsonify({'error': 'Необходимо указать группы: groups={code},{code}'}), 400
+        if len(group_codes) > MAX_BATCH_GROUPS:
+            return jsonify({
+                'error': f'Слишком много групп в запросе (максимум {MAX_BATCH_GROUPS})'
+            }), 400
+        
+        conn = get_db_connection()
+        cur = conn.cursor(cursor_factory=RealDictCursor)
+        # Занятия и удаления читаются из одного снимка: иначе изменение, зафиксированное
+        # между запросами, попадет в курсор (через удаление) без самого занятия
+        cur.execute("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ, READ ONLY")
+        
+        cur.execute(
+            "SELECT id, code FROM groups WHERE code = ANY(%s) AND is_active = TRUE",
+            (group_codes,)
+        )
+        group_ids = {g['code']: g['id'] for g in cur.fetchall()}
+        codes_by_id = {group_id: code for code, group_id in group_ids.items()}
+        
+        changes = {code: {'upserted': [], 'removed': []} for code in group_ids}
+        cursor = since
+        
+        if group_ids:
+            ids = list(group_ids.values())
+            
+            query = """
+                SELECT 
+                    l.id,
+                    l.group_id,
+                    l.day_of_week,
+                    l.lesson_number,
+                    l.subject,
+                    l.teacher,
+                    l.classroom,
+                    l.lesson_type,
+                    l.week_parity,
+                    l.building,
+                    l.notes,
+                    l.is_active,
+                    l.revision
+                FROM lesson_details l
+                WHERE l.group_id = ANY(%s) AND l.revision > %s
+            """
+            if since == 0:
+                # Полная выгрузка: неактивные занятия клиенту не нужны
+                query += " AND l.is_active = TRUE"
+            query += " ORDER BY l.revision"
+            
+            cur.execute(query, (ids, since))
+            rows = cur.fetchall()
+            bell_schedule.get_bell_schedule().attach(rows)
+            for l in rows:
+                group_changes = changes[codes_by_id[l['group_id']]]
+                if l['is_active']:
+                    group_changes['upserted'].append(format_lesson(l))
+                else:
+                    group_changes['removed'].append(l['id'])
+                cursor = max(cursor, l['revision'])
+            
+            if since > 0:
+                cur.execute("""
+                    SELECT lesson_id, group_id, revision
+                    FROM lesson_tombstones
+                    WHERE group_id = ANY(%s) AND revision > %s
+                    ORDER BY revision
+                """, (ids, since))
+                for t in cur.fetchall():
+                    changes[codes_by_id[t['group_id']]]['removed'].append(t['lesson_id'])
+                    cursor = max(cursor, t['revision'])
+        
+        cur.close()
+        conn.close()
+        
+        return jsonify({
+            'cursor': str(cursor),
+            'full': since == 0,
+            'changes': changes,
+            'notFound': [code for code in group_codes if code not in group_ids]
+        }), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@public_bp.route('/v1/exams/group/<code>', methods=['GET'])
+def get_exams(code):
+    """Получить расписание экзаменов для группы"""
+    try:
+        from exam_parser import ExamScheduleParser
+        parser = ExamScheduleParser()
+        exams = parser.parse_exams(code, "exam")
+        
+        # Форматируем результат
+        result = []
+        for idx, exam in enumerate(exams, 1):
+            result.append({
+                'id': idx,
+                'groupId': code,
+                'subject': exam.get('subject', ''),
+                'teacher': exam.get('teacher', ''),
+                'date': exam.get('date', ''),
+                'time': exam.get('time', ''),
+                'classroom': exam.get('classroom', ''),
+                'examType': 'exam',
+                'notes': None
+            })
+        
+        return jsonify(result), 200
+    except Exception as e:
+        print(f"Ошибка получения экзаменов для группы {code}: {e}")
+        import traceback
+        traceback.print_exc()
+        return jsonify({'error': str(e), 'exams': []}), 200  # Возвращаем пустой список вместо ошибки
+
+@public_bp.route('/v1/tests/group/<code>', methods=['GET'])
+def get_tests(code):
+    """Получить расписание зачетов для группы"""
+    try:
+        from exam_parser import ExamScheduleParser
+        parser = ExamScheduleParser()
+        tests = parser.parse_exams(code, "test")
+        
+        # Форматируем результат
+        result = []
+        for idx, test in enumerate(tests, 1):
+            result.append({
+                'id': idx,
+                'groupId': code,
+                'subject': test.get('subject', ''),
+                'teacher': test.get('teacher', ''),
+                'date': test.get('date', ''),
+                'time': test.get('time', ''),
+                'classroom': test.get('classroom', ''),
+                'examType': 'test',
+                'notes': None
+            })
+        
+        return jsonify(result), 200
+    except Exception as e:
+        print(f"Ошибка получения зачетов для группы {code}: {e}")
+        import traceback
+        traceback.print_exc()
+        return jsonify({'error': str(e), 'tests': []}), 200  # Возвращаем пустой список вместо ошибки
+
+@public_bp.route('/v1/analytics/group/<code>', methods=['GET'])
+def get_schedule_analytics(code):
+    """Получить аналитику расписания для группы"""
+    try:
+        conn = get_db_connection()
+        cur = conn.cursor(cursor_factory=RealDictCursor)
+        
+        cur.execute(GROUP_ID_SQL, (code,))
+        group_result = cur.fetchone()
+        
+        if not group_result:
+            cur.close()
+            conn.close()
+            return jsonify({'error': 'Group not found'}), 404
+        
+        group_id = group_result['id']
+        
+        # Получаем все занятия
+        cur.execute("""
+            SELECT 
+                l.day_of_week,
+                l.lesson_number,
+                l.subject,
+                l.teacher,
+                l.classroom,
+                l.lesson_type,
+                l.week_parity
+            FROM lesson_details l
+            WHERE l.group_id = %s AND l.is_active = TRUE
+            ORDER BY l.day_of_week, l.lesson_number
+        """, (group_id,))
+        
+        lessons = [dict(l) for l in cur.fetchall()]
+        
+        # Получаем экзамены
+        exams_data = []
+        try:
+            from exam_parser import ExamScheduleParser
+            parser = ExamScheduleParser()
+            exams = parser.parse_exams(code, "exam")
+            exams_data = [dict(e) for e in exams]
+        except:
+            pass
+        
+        cur.close()
+        conn.close()
+        
+        # Вычисляем аналитику
+        from schedule_analytics import ScheduleAnalytics
+        schedule_analytics = ScheduleAnalytics()
+        weekly_load = schedule_analytics.calculate_weekly_load(lessons)
+        hour_balance = schedule_analytics.calculate_hour_balance(lessons)
+        priorities = schedule_analytics.identify_priorities(lessons, exams_data)
+        optimal_schedule = schedule_analytics.suggest_optimal_schedule(lessons)
+        
+        return jsonify({
+            'group_code': code,
+            'weekly_load': weekly_load,
+            'hour_balance': hour_balance,
+            'priorities': {
+                'high_priority': priorities['high_priority'][:5],
+                'medium_priority': priorities['medium_priority'][:5],
+                'upcoming_exams': priorities['upcoming_exams']
+            },
+            'optimization': optimal_schedule
+        }), 200
+        
+    except Exception as e:
+        print(f"Ошибка получения аналитики: {e}")
+        import traceback
+        traceback.print_exc()
+        return jsonify({'error': str(e)}), 500
+
+@public_bp.route('/v1/search', methods=['GET'])
+def search_lessons():
+    """Поиск занятий по запросу"""
+    try:
+        query = request.args.get('q', '').strip()
+        group_code = request.args.get('group', None)
+        
+        if not query:
+            return jsonify({
+                'error': 'Query parameter "q" is required'
+            }), 400
+        
+        conn = get_db_connection()
+        cur = conn.cursor(cursor_factory=RealDictCursor)
+        
+        # Ищем в предметах, преподавателях и аудиториях
+        search_pattern = f'%{query}%'
+        
+        sql = SEARCH_SQL
+        params = [search_pattern, search_pattern, search_pattern]
+        
+        # Если указана группа, фильтруем по ней
+        if group_code:
+            sql += SEARCH_GROUP_SQL
+            params.append(group_code)
+        
+        sql += " ORDER BY l.day_of_week, l.lesson_number"
+        
+        cur.execute(sql, params)
+        lessons = cur.fetchall()
+        
+        cur.close()
+        conn.close()
+        
+        # Преобразуем в JSON
+        bells = bell_schedule.get_bell_schedule()
+        result = []
+        for lesson in lessons:
+            start, end = bells.lesson_time(lesson['lesson_number'])
+            result.append({
+                'id': lesson['id'],
+                'lessonNumber': lesson['lesson_number'],
+                'dayOfWeek': lesson['day_of_week'],
+                'time': f"{start:%H:%M}-{end:%H:%M}" if start and end else '',
+                'subject': lesson['subject'],
+                'teacher': lesson['teacher'] or '',
+                'classroom': lesson['classroom'] or '',
+                'lessonType': lesson['lesson_type'],
+                'weekParity': lesson['week_parity']
+            })
+        
+        return jsonify(result), 200
+        
+    except Exception as e:
+        print(f"Ошибка поиска: {e}")
+        import traceback
+        traceback.print_exc()
+        return jsonify({
+            'error': str(e)
+        }), 500
+
+@public_bp.route('/v1/bell-schedule', methods=['GET'])
+def get_bell_schedule():
+    """Получить расписание звонков"""
+    try:
+        conn = get_db_connection()
+        cur = conn.cursor(cursor_factory=RealDictCursor)
+        
+        cur.execute("""
+            SELECT 
+                lesson_number,
+                lesson_start,
+                lesson_end,
+                break_time_minutes,
+                break_after_lesson_minutes,
+                description
+            FROM bell_schedule
+            ORDER BY lesson_number
+        """)
+        
+        bells = cur.fetchall()
+        cur.close()
+        conn.close()
+        
+        result = []
+        for b in bells:
+            # Преобразуем время в формат HH:MM (без секунд)
+            lesson_start = str(b['lesson_start'])[:5] if b['lesson_start'] else None
+            lesson_end = str(b['lesson_end'])[:5] if b['lesson_end'] else None
+            result.append({
+                'lessonNumber': b['lesson_number'],
+                'lessonStart': lesson_start,
+                'lessonEnd': lesson_end,
+                'breakTimeMinutes': b['break_time_minutes'],
+                'breakAfterLessonMinutes': b['break_after_lesson_minutes'],
+                'description': b['description'] or ''
+            })
+        
+        return jsonify(result), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@public_bp.route('/', methods=['GET'])
+def root():
+    """Корневой endpoint с информацией об API"""
+    return jsonify({
+        'service': 'BTEU Schedule API',
+        'version': '1.0',
+        'status': 'running',
+        'base_url': '/v1/',
+        'endpoints': {
+            'health': '/v1/health',
+            'faculties': '/v1/faculties',
+            'departments': '/v1/departments',
+            'groups': '/v1/groups?faculty={code}&form={form}',
+            'schedule': '/v1/schedule/group/{code}/week?week={parity}',
+            'exams': '/v1/exams/group/{code}',
+            'tests': '/v1/tests/group/{code}',
+            'bell_schedule': '/v1/bell-schedule',
+            'search': '/v1/search?q={query}&group={code}'
+        },
+        'documentation': 'Все API endpoints находятся под /v1/',
+        'example': 'http://localhost:8000/v1/health'
+    }), 200
+
+@public_bp.route('/v1/', methods=['GET'])
+def api_root():
+    """Корневой endpoint API с информацией об endpoints"""
+    return jsonify({
+        'service': 'BTEU Schedule API',
+        'version': '1.0',
+        'status': 'running',
+        'endpoints': {
+            'health': 'GET /v1/health - Проверка работоспособности',
+            'faculties': 'GET /v1/faculties - Список факультетов',
+            'departments': 'GET /v1/departments - Все кафедры',
+            'departments_by_faculty': 'GET /v1/faculties/{id}/departments - Кафедры факультета',
+            'groups': 'GET /v1/groups?faculty={code}&form={form} - Список групп',
+            'group_info': 'GET /v1/groups/{code} - Информация о группе',
+            'schedule_day': 'GET /v1/schedule/group/{code}/day/{day}?week={parity} - Расписание на день',
+            'schedule_week': 'GET /v1/schedule/group/{code}/week?week={parity} - Расписание на неделю',
+            'schedule_date': 'GET /v1/schedule/group/{code}/date/{yyyy-mm-dd} - Расписание на дату',
+            'schedule_batch': 'POST /v1/schedule/batch - Расписание на неделю для нескольких групп',
+            'sync': 'GET /v1/sync?since={cursor}&groups={code},{code} - Изменения расписания после курсора',
+            'exams': 'GET /v1/exams/group/{code} - Экзамены группы',
+            'tests': 'GET /v1/tests/group/{code} - Зачеты группы',
+            'bell_schedule': 'GET /v1/bell-schedule - Расписание звонков',
+            'search': 'GET /v1/search?q={query}&group={code} - Поиск по расписанию',
+            'conflicts': 'GET /v1/admin/conflicts?type={teacher|classroom}&group={code} - Конфликты расписания'
+        }
+    }), 200
+
+@public_bp.route('/v1/health', methods=['GET'])
+def health_check():
+    """Проверка работоспособности сервера и БД"""
+    try:
+        conn = get_db_connection()
+        cur = conn.cursor()
+        cur.execute("SELECT 1")
+        cur.close()
+        conn.close()
+        return jsonify({'status': 'ok', 'database': 'connected'}), 200
+    except Exception as e:
+        return jsonify({'status': 'error', 'database': 'disconnected', 'error': str(e)}), 500
+
+# Обработчик для OPTIONS запросов (CORS preflight)
+@public_bp.route('/v1/<path:path>', methods=['OPTIONS'])
+def handle_options(path):
+    """Обработка CORS preflight запросов"""
+    return '', 200
@@ -0,0 +1,212 @@
+"""
+Общий кэш расписаний и экзаменов групп для AI ассистента
+
+Версия расписания группы - максимальная ревизия ее занятий и удалений (миграция
+001_lesson_revisions) и отпечаток расписания звонков (время пар в занятиях).
+Ревизия хранится в памяти и перепроверяется в БД не чаще раза в
+AI_SCHEDULE_VERSION_TTL секунд, поэтому повторный вопрос, ответ на который
+уже в кэше, не обращается ни к БД, ни к сайту с экзаменами.
+
+Группы хранятся в LRU на AI_SCHEDULE_CACHE_GROUPS записей: коды групп приходят
+от клиентов, и несуществующие коды не должны расти в памяти без предела.
+"""
+import os
+import time
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from psycopg2.extras import RealDictCursor
+
+from bell_schedule import get_bell_schedule
+from database import get_db_connection
+
+
+class GroupScheduleCache:
+    """Расписания и экзамены групп, кэшируемые по версии расписания"""
+
+    def __init__(self, version_ttl: float = 30, exams_ttl: float = 6 * 3600, max_groups: int = 1000):
+        """
+        Args:
+            version_ttl: Как долго доверять известной версии расписания, секунд
+            exams_ttl: Время жизни списка экзаменов (парсинг сайта), секунд
+            max_groups: Максимум групп в каждом словаре (версии, расписания, экзамены)
+        """
+        self.version_ttl = version_ttl
+        self.exams_ttl = exams_ttl
+        self.max_groups = max_groups
+        self._versions: "OrderedDict[str, Tuple[Optional[int], Optional[int], float]]" = OrderedDict()
+        self._schedules: "OrderedDict[str, Dict]" = OrderedDict()
+        self._exams: "OrderedDict[str, Tuple[List[Dict], float]]" = OrderedDict()
+        # Блокировка ключа и число ее пользователей: удаляется, когда ключ никто не ждет
+        self._locks: Dict[str, List] = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def _group_lock(self, key: str) -> Iterator[None]:
+        with self._lock:
+            entry = self._locks.get(key)
+            if entry is None:
+                entry = self._locks[key] = [threading.Lock(), 0]
+            entry[1] += 1
+        try:
+            with entry[0]:
+                yield
+        finally:
+            with self._lock:
+                entry[1] -= 1
+                if not entry[1]:
+                    del self._locks[key]
+
+    def _remember(self, entries: OrderedDict, group_code: str, value):
+        """Запоминает значение группы, вытесняя самые давние группы сверх max_groups"""
+        with self._lock:
+            entries[group_code] = value
+            entries.move_to_end(group_code)
+            while len(entries) > self.max_groups:
+                entries.popitem(last=False)
+
+    def get_version(self, group_code: str) -> Optional[str]:
+        """Версия расписания группы: ревизия и отпечаток звонков (None, если группа не найдена)"""
+        revision = self._get_revision(group_code)
+        if revision is None:
+            return None
+        # Время пар берется из расписания звонков: его смена тоже меняет версию
+        return f"{revision}-{get_bell_schedule().version}"
+
+    def _get_revision(self, group_code: str) -> Optional[int]:
+        """Ревизия расписания группы (None, если группа не найдена)"""
+        entry = self._versions.get(group_code)
+        if entry is not None and time.monotonic() - entry[2] < self.version_ttl:
+            return entry[1]
+
+        with self._group_lock(f"version:{group_code}"):
+            entry = self._versions.get(group_code)
+            if entry is not None and time.monotonic() - entry[2] < self.version_ttl:
+                return entry[1]
+
+            conn = get_db_connection()
+            try:
+                cur = conn.cursor()
+                cur.execute("""
+                    SELECT
+                        g.id,
+                        GREATEST(
+                            COALESCE((SELECT MAX(revision) FROM lessons WHERE group_id = g.id), 0),
+                            COALESCE((SELECT MAX(revision) FROM lesson_tombstones WHERE group_id = g.id), 0)
+                        )
+                    FROM groups g
+                    WHERE g.code = %s AND g.is_active = TRUE
+                """, (group_code,))
+                row = cur.fetchone()
+                cur.close()
+            finally:
+                conn.close()
+
+            group_id, version = row if row else (None, None)
+            self._remember(self._versions, group_code, (group_id, version, time.monotonic()))
+            return version
+
+    def get_schedule(self, group_code: str) -> Optional[Dict]:
+        """
+        Расписание группы для AI: {'group_code', 'version', 'lessons'}
+
+        Занятия перечитываются из БД только при смене версии.
+        """
+        version = self.get_version(group_code)
+        if version is None:
+            return None
+
+        cached = self._schedules.get(group_code)
+        if cached is not None and cached['version'] == version:
+            return cached
+
+        with self._group_lock(f"schedule:{group_code}"):
+            cached = self._schedules.get(group_code)
+            if cached is not None and cached['version'] == version:
+                return cached
+
+            entry = self._versions.get(group_code)
+            if entry is None:
+                # Группу вытеснили из LRU между get_version и блокировкой
+                self._get_revision(group_code)
+                entry = self._versions.get(group_code) or (None,)
+            group_id = entry[0]
+            if group_id is None:
+                return None
+            conn = get_db_connection()
+            try:
+                cur = conn.cursor(cursor_factory=RealDictCursor)
+                cur.execute("""
+                    SELECT
+                        l.day_of_week,
+                        l.lesson_number,
+                        l.subject,
+                        l.teacher,
+                        l.classroom,
+                        l.lesson_type,
+                        l.week_parity,
+                        l.building
+                    FROM lesson_details l
+                    WHERE l.group_id = %s AND l.is_active = TRUE
+                    ORDER BY l.day_of_week, l.lesson_number
+                """, (group_id,))
+                lessons = [dict(l) for l in cur.fetchall()]
+                cur.close()
+            finally:
+                conn.close()
+            get_bell_schedule().attach(lessons)
+
+            schedule = {'group_code': group_code, 'version': version, 'lessons': lessons}
+            self._remember(self._schedules, group_code, schedule)
+            return schedule
+
+    def get_exams(self, group_code: str) -> List[Dict]:
+        """Экзамены группы (парсинг сайта не чаще раза в exams_ttl, для неизвестной группы - [])"""
+        if self._get_revision(group_code) is None:
+            return []
+        cached = self._exams.get(group_code)
+        if cached is not None and time.monotonic() - cached[1] < self.exams_ttl:
+            return cached[0]
+
+        with self._group_lock(f"exams:{group_code}"):
+            cached = self._exams.get(group_code)
+            if cached is not None and time.monotonic() - cached[1] < self.exams_ttl:
+                return cached[0]
+            try:
+                from exam_parser import ExamScheduleParser
+                parser = ExamScheduleParser()
+                exams = [dict(e) for e in parser.parse_exams(group_code, "exam")]
+            except Exception as e:
+                print(f"Ошибка получения экзаменов группы {group_code}: {e}")
+                # Не повторяем неудачный парсинг на каждом вопросе
+                exams = cached[0] if cached else []
+            self._remember(self._exams, group_code, (exams, time.monotonic()))
+            return exams
+
+    def invalidate(self, group_code: Optional[str] = None):
+        """Сбрасывает известные версии (например, после загрузки расписания в этом процессе)"""
+        with self._lock:
+            if group_code is None:
+                self._versions.clear()
+            else:
+                self._versions.pop(group_code, None)
+
+
+_cache: Optional[GroupScheduleCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_schedule_cache() -> GroupScheduleCache:
+    """Возвращает общий для процесса кэш расписаний"""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = GroupScheduleCache(
+                    version_ttl=float(os.getenv('AI_SCHEDULE_VERSION_TTL', '30')),
+                    exams_ttl=float(os.getenv('AI_EXAMS_TTL', str(6 * 3600))),
+                    max_groups=int(os.getenv('AI_SCHEDULE_CACHE_GROUPS', '1000'))
+                )
+    return _cache
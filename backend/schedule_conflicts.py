@@ -0,0 +1,224 @@
+"""
+Поиск конфликтов расписания между группами
+Находит преподавателей и аудитории, занятые одновременно у разных групп
+"""
+import re
+from collections import defaultdict
+from typing import List, Dict, Optional, Iterable
+
+
+# Четность занятия -> недели, в которые оно проходит
+# 'both' пересекается и с нечетной, и с четной неделей
+PARITY_WEEKS = {
+    'odd': ('odd',),
+    'even': ('even',),
+    'both': ('odd', 'even'),
+}
+
+DAY_NAMES = {
+    1: 'Понедельник',
+    2: 'Вторник',
+    3: 'Среда',
+    4: 'Четверг',
+    5: 'Пятница',
+    6: 'Суббота'
+}
+
+_SPACES_RE = re.compile(r'\s+')
+
+
+def normalize_key(value: Optional[str]) -> str:
+    """Нормализует строку для сравнения (регистр, пробелы, точки)"""
+    if not value:
+        return ''
+    value = _SPACES_RE.sub(' ', str(value)).strip().lower()
+    # "доц.Иванов И.И." и "доц. Иванов И.И." - один и тот же преподаватель
+    return value.replace('. ', '.')
+
+
+class ScheduleConflictDetector:
+    """
+    Детектор конфликтов расписания
+
+    Все занятия раскладываются в хэш по ключу (день, пара, неделя, ресурс)
+    за один проход, поэтому время работы линейно от количества занятий.
+    """
+
+    RESOURCES = ('teacher', 'classroom')
+
+    @staticmethod
+    def _session_signature(lesson: Dict) -> tuple:
+        """
+        Подпись занятия: потоковая лекция у нескольких групп (тот же предмет,
+        преподаватель и аудитория) - это одно занятие, а не конфликт
+        """
+        return (
+            normalize_key(lesson.get('subject')),
+            normalize_key(lesson.get('teacher')),
+            normalize_key(lesson.get('classroom'))
+        )
+
+    @classmethod
+    def find_conflicts(cls, lessons: Iterable[Dict], resources: Optional[Iterable[str]] = None) -> Dict:
+        """
+        Находит конфликты по преподавателям и аудиториям
+
+        Args:
+            lessons: Занятия всех групп (group_id, group_code, day_of_week,
+                lesson_number, week_parity, subject, teacher, classroom)
+            resources: Какие ресурсы проверять ('teacher', 'classroom')
+
+        Returns:
+            {
+                'teacher': List[Dict],
+                'classroom': List[Dict],
+                'lessons_checked': int,
+                'total_conflicts': int
+            }
+        """
+        resources = tuple(resources) if resources else cls.RESOURCES
+        buckets = {resource: defaultdict(list) for resource in resources}
+        lessons_checked = 0
+
+        for lesson in lessons:
+            day = lesson.get('day_of_week')
+            pair = lesson.get('lesson_number')
+            if not day or not pair:
+                continue
+            lessons_checked += 1
+            weeks = PARITY_WEEKS.get(lesson.get('week_parity') or 'both', PARITY_WEEKS['both'])
+
+            for resource in resources:
+                resource_key = normalize_key(lesson.get(resource))
+                if not resource_key:
+                    continue
+                for week in weeks:
+                    buckets[resource][(day, pair, week, resource_key)].append(lesson)
+
+        result = {resource: [] for resource in resources}
+        for resource in resources:
+            seen = set()
+            for (day, pair, week, resource_key), bucket in buckets[resource].items():
+                if len(bucket) < 2:
+                    continue
+                signatures = {cls._session_signature(l) for l in bucket}
+                groups = {l.get('group_id') for l in bucket}
+                if len(signatures) < 2 or len(groups) < 2:
+                    continue
+
+                # Занятия 'both' попадают в обе недели - не дублируем конфликт
+                lesson_ids = tuple(sorted(l.get('id') or id(l) for l in bucket))
+                if (resource, lesson_ids) in seen:
+                    continue
+                seen.add((resource, lesson_ids))
+
+                result[resource].append({
+                    'resource': resource,
+                    'value': bucket[0].get(resource),
+                    'dayOfWeek': day,
+                    'dayName': DAY_NAMES.get(day, ''),
+                    'lessonNumber': pair,
+                    # Если все занятия 'both', конфликт есть каждую неделю
+                    'week': 'both' if all((l.get('week_parity') or 'both') == 'both' for l in bucket) else week,
+                    'lessons': [
+                        {
+                            'id': l.get('id'),
+                            'groupId': l.get('group_id'),
+                            'groupCode': l.get('group_code'),
+                            'subject': l.get('subject'),
+                            'teacher': l.get('teacher') or '',
+                            'classroom': l.get('classroom') or '',
+                            'weekParity': l.get('week_parity') or 'both'
+                        }
+                        for l in bucket
+                    ]
+                })
+
+            result[resource].sort(key=lambda c: (c['dayOfWeek'], c['lessonNumber'], normalize_key(c['value'])))
+
+        result['lessons_checked'] = lessons_checked
+        result['total_conflicts'] = sum(len(result[resource]) for resource in resources)
+        return result
+
+
+def load_active_lessons(cur) -> List[Dict]:
+    """
+    Загружает активные занятия всех групп одним запросом
+
+    Args:
+        cur: Курсор с RealDictCursor
+    """
+    cur.execute("""
+        SELECT
+            l.id,
+            l.group_id,
+            g.code as group_code,
+            l.day_of_week,
+            l.lesson_number,
+            l.week_parity,
+            l.subject,
+            l.teacher,
+            l.classroom
+        FROM lesson_details l
+        JOIN groups g ON l.group_id = g.id
+        WHERE l.is_active = TRUE AND g.is_active = TRUE
+    """)
+    return cur.fetchall()
+
+
+def detect_conflicts(conn, resources: Optional[Iterable[str]] = None) -> Dict:
+    """
+    Пост-обработка после загрузки расписания: ищет конфликты по всем группам
+
+    Args:
+        conn: Подключение к БД
+        resources: Какие ресурсы проверять ('teacher', 'classroom')
+    """
+    from psycopg2.extras import RealDictCursor
+
+    cur = conn.cursor(cursor_factory=RealDictCursor)
+    try:
+        lessons = load_active_lessons(cur)
+    finally:
+        cur.close()
+    return ScheduleConflictDetector.find_conflicts(lessons, resources)
+
+
+if __name__ == '__main__':
+    import os
+    import sys
+    import io
+    import psycopg2
+    from dotenv import load_dotenv
+
+    # Исправление кодировки для Windows
+    if sys.platform == 'win32':
+        sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+
+    load_dotenv()
+
+    DB_CONFIG = {
+        'host': os.getenv('DB_HOST', 'localhost'),
+        'port': int(os.getenv('DB_PORT', '5432')),
+        'database': os.getenv('DB_NAME', 'postgres'),
+        'user': os.getenv('DB_USER', 'postgres'),
+        'password': os.getenv('DB_PASSWORD', '7631')
+    }
+
+    conn = psycopg2.connect(**DB_CONFIG)
+    report = detect_conflicts(conn)
+    conn.close()
+
+    print("=" * 60)
+    print("КОНФЛИКТЫ РАСПИСАНИЯ ПО ВСЕМ ГРУППАМ")
+    print("=" * 60)
+    print(f"Проверено занятий: {report['lessons_checked']}")
+
+    titles = {'teacher': 'Преподаватели', 'classroom': 'Аудитории'}
+    for resource in ScheduleConflictDetector.RESOURCES:
+        conflicts = report[resource]
+        print(f"\n{titles[resource]}: {len(conflicts)} конфликтов")
+        for conflict in conflicts:
+            print(f"  {conflict['dayName']}, пара {conflict['lessonNumber']} ({conflict['week']}): {conflict['value']}")
+            for lesson in conflict['lessons']:
+                print(f"    - {lesson['groupCode']}: {lesson['subject'][:50]} ({lesson['weekParity']})")
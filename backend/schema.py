@@ -0,0 +1,396 @@
+"""
+Миграции схемы БД расписания
+Каждая миграция применяется один раз, примененные записываются в schema_migrations
+
+Использование:
+    python schema.py            # применить новые миграции
+    python schema.py --status   # показать примененные миграции
+"""
+import os
+import sys
+from typing import List, Tuple
+
+
+# Ревизии занятий для дельта-синхронизации (/v1/sync)
+# Триггер выдает новую ревизию при вставке и при изменении значимых полей,
+# удаленные занятия (и занятия, перенесенные в другую группу) попадают в
+# lesson_tombstones со своей ревизией. Ревизии выдаются под транзакционной
+# advisory-блокировкой: пишущие транзакции получают ревизии по очереди и
+# фиксируются в том же порядке, поэтому клиент, увидевший ревизию N, уже видит
+# все ревизии меньше N и курсор синхронизации не перескакивает через изменения
+LESSON_REVISIONS = """
+    CREATE SEQUENCE IF NOT EXISTS lesson_revision_seq;
+
+    CREATE OR REPLACE FUNCTION next_lesson_revision() RETURNS BIGINT AS $$
+    BEGIN
+        PERFORM pg_advisory_xact_lock(hashtext('lesson_revision'));
+        RETURN nextval('lesson_revision_seq');
+    END;
+    $$ LANGUAGE plpgsql;
+
+    ALTER TABLE lessons ADD COLUMN IF NOT EXISTS revision BIGINT;
+    UPDATE lessons SET revision = nextval('lesson_revision_seq') WHERE revision IS NULL;
+    ALTER TABLE lessons ALTER COLUMN revision SET DEFAULT nextval('lesson_revision_seq');
+    ALTER TABLE lessons ALTER COLUMN revision SET NOT NULL;
+
+    CREATE INDEX IF NOT EXISTS idx_lessons_group_revision ON lessons (group_id, revision);
+
+    CREATE TABLE IF NOT EXISTS lesson_tombstones (
+        lesson_id INTEGER NOT NULL,
+        group_id INTEGER NOT NULL,
+        revision BIGINT NOT NULL DEFAULT next_lesson_revision(),
+        deleted_at TIMESTAMP NOT NULL DEFAULT NOW(),
+        PRIMARY KEY (lesson_id, group_id)
+    );
+    CREATE INDEX IF NOT EXISTS idx_lesson_tombstones_group_revision ON lesson_tombstones (group_id, revision);
+
+    CREATE OR REPLACE FUNCTION lessons_bump_revision() RETURNS trigger AS $$
+    BEGIN
+        -- Значимые поля - все, кроме служебных (колонки занятия меняет и миграция 004)
+        IF TG_OP = 'UPDATE' AND
+            to_jsonb(NEW) - ARRAY['revision', 'created_at', 'updated_at']
+            = to_jsonb(OLD) - ARRAY['revision', 'created_at', 'updated_at']
+        THEN
+            -- Повторная загрузка того же файла не должна менять ревизию
+            NEW.revision := OLD.revision;
+            RETURN NEW;
+        END IF;
+
+        NEW.revision := next_lesson_revision();
+        IF TG_OP = 'UPDATE' AND NEW.group_id IS DISTINCT FROM OLD.group_id THEN
+            -- Для клиентов старой группы занятие удалено
+            INSERT INTO lesson_tombstones (lesson_id, group_id, revision)
+            VALUES (OLD.id, OLD.group_id, NEW.revision)
+            ON CONFLICT (lesson_id, group_id) DO UPDATE
+                SET revision = EXCLUDED.revision, deleted_at = NOW();
+        END IF;
+        IF TG_OP = 'INSERT' OR NEW.group_id IS DISTINCT FROM OLD.group_id THEN
+            -- Занятие вернулось в группу: прежнее удаление больше не действует
+            DELETE FROM lesson_tombstones WHERE lesson_id = NEW.id AND group_id = NEW.group_id;
+        END IF;
+        RETURN NEW;
+    END;
+    $$ LANGUAGE plpgsql;
+
+    DROP TRIGGER IF EXISTS lessons_revision ON lessons;
+    CREATE TRIGGER lessons_revision
+        BEFORE INSERT OR UPDATE ON lessons
+        FOR EACH ROW EXECUTE FUNCTION lessons_bump_revision();
+
+    CREATE OR REPLACE FUNCTION lessons_tombstone() RETURNS trigger AS $$
+    BEGIN
+        INSERT INTO lesson_tombstones (lesson_id, group_id)
+        VALUES (OLD.id, OLD.group_id)
+        ON CONFLICT (lesson_id, group_id) DO UPDATE
+            SET revision = next_lesson_revision(), deleted_at = NOW();
+        RETURN OLD;
+    END;
+    $$ LANGUAGE plpgsql;
+
+    DROP TRIGGER IF EXISTS lessons_tombstone ON lessons;
+    CREATE TRIGGER lessons_tombstone
+        AFTER DELETE ON lessons
+        FOR EACH ROW EXECUTE FUNCTION lessons_tombstone();
+"""
+
+
+# Датированные занятия из АРМА (tmp_graf, fraspz) для инкрементальной синхронизации
+# Строка идентифицируется хэшем содержимого: изменение занятия = удаление старого хэша
+# и вставка нового, поэтому синхронизация пишет только отличия
+ARMA_LESSONS = """
+    CREATE TABLE IF NOT EXISTS arma_lessons (
+        id SERIAL PRIMARY KEY,
+        study_form VARCHAR(20) NOT NULL,
+        lesson_date DATE NOT NULL,
+        lesson_number INTEGER NOT NULL,
+        group_code VARCHAR(50),
+        stream_number VARCHAR(50),
+        subject_id VARCHAR(50),
+        subject_name TEXT,
+        lesson_type_id VARCHAR(50),
+        lesson_type_name TEXT,
+        teacher1_id VARCHAR(50),
+        teacher1_name TEXT,
+        teacher2_id VARCHAR(50),
+        teacher2_name TEXT,
+        teacher3_id VARCHAR(50),
+        teacher3_name TEXT,
+        audience1_id VARCHAR(50),
+        audience1_name TEXT,
+        audience2_id VARCHAR(50),
+        audience2_name TEXT,
+        audience3_id VARCHAR(50),
+        audience3_name TEXT,
+        building_number VARCHAR(50),
+        time_start TIME,
+        time_end TIME,
+        academic_year VARCHAR(20),
+        semester INTEGER,
+        row_hash CHAR(32) NOT NULL,
+        synced_at TIMESTAMP NOT NULL DEFAULT NOW(),
+        UNIQUE (study_form, lesson_date, row_hash)
+    );
+    CREATE INDEX IF NOT EXISTS idx_arma_lessons_group_date ON arma_lessons (group_code, lesson_date);
+"""
+
+
+# Занятия по датам: недельный шаблон (lessons) с учетом четности и датированные занятия АРМА
+# Таблица секционирована по дате, секцию на семестр создают задания (occurrences.ensure_partition),
+# до этого строки попадают в секцию по умолчанию; occurrence_ranges помнит, для какой ревизии
+# занятий группы семестр материализован
+LESSON_OCCURRENCES = """
+    CREATE TABLE IF NOT EXISTS lesson_occurrences (
+        group_id INTEGER NOT NULL,
+        lesson_date DATE NOT NULL,
+        lesson_number INTEGER NOT NULL,
+        source VARCHAR(10) NOT NULL,
+        lesson_id INTEGER,
+        subject TEXT NOT NULL,
+        teacher TEXT,
+        classroom TEXT,
+        lesson_type VARCHAR(20),
+        week_parity VARCHAR(10),
+        building TEXT,
+        notes TEXT,
+        time_start TIME,
+        time_end TIME
+    ) PARTITION BY RANGE (lesson_date);
+
+    CREATE TABLE IF NOT EXISTS lesson_occurrences_default PARTITION OF lesson_occurrences DEFAULT;
+    CREATE INDEX IF NOT EXISTS idx_lesson_occurrences_group_date
+        ON lesson_occurrences (group_id, lesson_date, lesson_number);
+
+    CREATE TABLE IF NOT EXISTS occurrence_ranges (
+        group_id INTEGER NOT NULL,
+        semester_key VARCHAR(10) NOT NULL,
+        source_revision BIGINT NOT NULL,
+        materialized_at TIMESTAMP NOT NULL DEFAULT NOW(),
+        PRIMARY KEY (group_id, semester_key)
+    );
+"""
+
+
+
+# Справочники предметов, преподавателей и аудиторий: lessons хранит только ID
+# subjects/teachers/classrooms - одна строка на нормализованный ключ name_key (регистр, пробелы),
+# subject_names/teacher_names/classroom_names - написания из расписания со ссылкой на нее.
+# lessons ссылается на написание, поэтому вывод API совпадает с исходным текстом байт в байт;
+# текст занятия читается из представления lesson_details. Пустой текст - NULL
+LESSON_DIMENSIONS = """
+    CREATE OR REPLACE FUNCTION lesson_name_key(value TEXT) RETURNS TEXT AS $$
+        SELECT lower(regexp_replace(btrim(value), '\\s+', ' ', 'g'))
+    $$ LANGUAGE sql IMMUTABLE;
+
+    CREATE TABLE IF NOT EXISTS subjects (
+        id SERIAL PRIMARY KEY,
+        name TEXT NOT NULL,
+        name_key TEXT NOT NULL UNIQUE
+    );
+    CREATE TABLE IF NOT EXISTS teachers (
+        id SERIAL PRIMARY KEY,
+        name TEXT NOT NULL,
+        name_key TEXT NOT NULL UNIQUE
+    );
+    CREATE TABLE IF NOT EXISTS classrooms (
+        id SERIAL PRIMARY KEY,
+        name TEXT NOT NULL,
+        name_key TEXT NOT NULL UNIQUE
+    );
+    CREATE TABLE IF NOT EXISTS subject_names (
+        id SERIAL PRIMARY KEY,
+        name TEXT NOT NULL UNIQUE,
+        subject_id INTEGER NOT NULL REFERENCES subjects (id)
+    );
+    CREATE TABLE IF NOT EXISTS teacher_names (
+        id SERIAL PRIMARY KEY,
+        name TEXT NOT NULL UNIQUE,
+        teacher_id INTEGER NOT NULL REFERENCES teachers (id)
+    );
+    CREATE TABLE IF NOT EXISTS classroom_names (
+        id SERIAL PRIMARY KEY,
+        name TEXT NOT NULL UNIQUE,
+        classroom_id INTEGER NOT NULL REFERENCES classrooms (id)
+    );
+    CREATE INDEX IF NOT EXISTS idx_subject_names_subject_id ON subject_names (subject_id);
+    CREATE INDEX IF NOT EXISTS idx_teacher_names_teacher_id ON teacher_names (teacher_id);
+    CREATE INDEX IF NOT EXISTS idx_classroom_names_classroom_id ON classroom_names (classroom_id);
+
+    -- Каноническое название ключа - первое по порядку написание
+    INSERT INTO subjects (name, name_key)
+        SELECT DISTINCT ON (lesson_name_key(subject)) subject, lesson_name_key(subject)
+        FROM lessons WHERE lesson_name_key(subject) <> ''
+        ORDER BY lesson_name_key(subject), subject
+        ON CONFLICT (name_key) DO NOTHING;
+    INSERT INTO teachers (name, name_key)
+        SELECT DISTINCT ON (lesson_name_key(teacher)) teacher, lesson_name_key(teacher)
+        FROM lessons WHERE lesson_name_key(teacher) <> ''
+        ORDER BY lesson_name_key(teacher), teacher
+        ON CONFLICT (name_key) DO NOTHING;
+    INSERT INTO classrooms (name, name_key)
+        SELECT DISTINCT ON (lesson_name_key(classroom)) classroom, lesson_name_key(classroom)
+        FROM lessons WHERE lesson_name_key(classroom) <> ''
+        ORDER BY lesson_name_key(classroom), classroom
+        ON CONFLICT (name_key) DO NOTHING;
+
+    INSERT INTO subject_names (name, subject_id)
+        SELECT DISTINCT l.subject, d.id FROM lessons l JOIN subjects d ON d.name_key = lesson_name_key(l.subject)
+        ON CONFLICT (name) DO NOTHING;
+    INSERT INTO teacher_names (name, teacher_id)
+        SELECT DISTINCT l.teacher, d.id FROM lessons l JOIN teachers d ON d.name_key = lesson_name_key(l.teacher)
+        ON CONFLICT (name) DO NOTHING;
+    INSERT INTO classroom_names (name, classroom_id)
+        SELECT DISTINCT l.classroom, d.id FROM lessons l JOIN classrooms d ON d.name_key = lesson_name_key(l.classroom)
+        ON CONFLICT (name) DO NOTHING;
+
+    ALTER TABLE lessons ADD COLUMN IF NOT EXISTS subject_name_id INTEGER REFERENCES subject_names (id);
+    ALTER TABLE lessons ADD COLUMN IF NOT EXISTS teacher_name_id INTEGER REFERENCES teacher_names (id);
+    ALTER TABLE lessons ADD COLUMN IF NOT EXISTS classroom_name_id INTEGER REFERENCES classroom_names (id);
+
+    -- Содержимое занятий не меняется: ревизии остаются прежними
+    ALTER TABLE lessons DISABLE TRIGGER lessons_revision;
+    UPDATE lessons l SET
+        subject_name_id = (SELECT id FROM subject_names WHERE name = l.subject),
+        teacher_name_id = (SELECT id FROM teacher_names WHERE name = l.teacher),
+        classroom_name_id = (SELECT id FROM classroom_names WHERE name = l.classroom);
+    ALTER TABLE lessons ENABLE TRIGGER lessons_revision;
+
+    ALTER TABLE lessons DROP COLUMN subject, DROP COLUMN teacher, DROP COLUMN classroom;
+
+    CREATE INDEX IF NOT EXISTS idx_lessons_subject_name_id ON lessons (subject_name_id);
+    CREATE INDEX IF NOT EXISTS idx_lessons_teacher_name_id ON lessons (teacher_name_id);
+    CREATE INDEX IF NOT EXISTS idx_lessons_classroom_name_id ON lessons (classroom_name_id);
+
+    -- Занятия с текстом (API, задания, скрипты); *_id - ID канонической строки справочника
+    CREATE OR REPLACE VIEW lesson_details AS
+        SELECT l.*,
+               COALESCE(sn.name, '') AS subject, tn.name AS teacher, cn.name AS classroom,
+               sn.subject_id, tn.teacher_id, cn.classroom_id
+        FROM lessons l
+        LEFT JOIN subject_names sn ON sn.id = l.subject_name_id
+        LEFT JOIN teacher_names tn ON tn.id = l.teacher_name_id
+        LEFT JOIN classroom_names cn ON cn.id = l.classroom_name_id;
+"""
+
+
+# Индексы путей чтения API: занятия группы (день, неделя, пакет, кэш для AI,
+# материализация по датам) и код группы -> ID.
+# Четность становится обязательной ('both' по умолчанию): условие по четности
+# в запросах - один IN по колонке индекса, без OR с IS NULL
+READ_INDEXES = """
+    UPDATE lessons SET week_parity = 'both' WHERE week_parity IS NULL;
+    ALTER TABLE lessons ALTER COLUMN week_parity SET DEFAULT 'both';
+    ALTER TABLE lessons ALTER COLUMN week_parity SET NOT NULL;
+
+    -- Частичный: API и загрузка читают только активные занятия, порядок ключа совпадает
+    -- с ORDER BY day_of_week, lesson_number и с DISTINCT ON в ingest.save_lessons
+    CREATE INDEX IF NOT EXISTS idx_lessons_active_slot
+        ON lessons (group_id, day_of_week, lesson_number, week_parity)
+        WHERE is_active = TRUE;
+
+    -- Покрывающий: поиск ID группы без чтения таблицы (index-only scan)
+    -- is_active в INCLUDE, а не в условии индекса: поиск фильтрует группу по коду без is_active
+    CREATE INDEX IF NOT EXISTS idx_groups_code
+        ON groups (code) INCLUDE (id, is_active);
+"""
+
+# Порядок важен: миграции применяются строго по списку
+MIGRATIONS: List[Tuple[str, str]] = [
+    ('001_lesson_revisions', LESSON_REVISIONS),
+    ('002_arma_lessons', ARMA_LESSONS),
+    ('003_lesson_occurrences', LESSON_OCCURRENCES),
+    ('004_lesson_dimensions', LESSON_DIMENSIONS),
+    ('005_read_indexes', READ_INDEXES),
+]
+
+
+def get_applied_migrations(conn) -> List[str]:
+    """Возвращает список уже примененных миграций"""
+    cur = conn.cursor()
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            name VARCHAR(100) PRIMARY KEY,
+            applied_at TIMESTAMP NOT NULL DEFAULT NOW()
+        )
+    """)
+    cur.execute("SELECT name FROM schema_migrations ORDER BY name")
+    applied = [row[0] for row in cur.fetchall()]
+    cur.close()
+    conn.commit()
+    return applied
+
+
+def apply_migrations(conn) -> List[str]:
+    """
+    Применяет новые миграции, каждую в своей транзакции
+
+    Args:
+        conn: Подключение к БД
+
+    Returns:
+        Список примененных в этот запуск миграций
+    """
+    applied = set(get_applied_migrations(conn))
+    newly_applied = []
+
+    for name, sql in MIGRATIONS:
+        if name in applied:
+            continue
+        cur = conn.cursor()
+        try:
+            cur.execute(sql)
+            cur.execute("INSERT INTO schema_migrations (name) VALUES (%s)", (name,))
+            conn.commit()
+            newly_applied.append(name)
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            cur.close()
+
+    return newly_applied
+
+
+def main():
+    """Главная функция"""
+    import argparse
+    import psycopg2
+    from dotenv import load_dotenv
+
+    # Исправление кодировки для Windows
+    if sys.platform == 'win32':
+        import io
+        sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+
+    load_dotenv()
+
+    parser = argparse.ArgumentParser(description='Миграции схемы БД расписания')
+    parser.add_argument('--status', action='store_true', help='Показать примененные миграции')
+    args = parser.parse_args()
+
+    conn = psycopg2.connect(
+        host=os.getenv('DB_HOST', 'localhost'),
+        port=int(os.getenv('DB_PORT', '5432')),
+        database=os.getenv('DB_NAME', 'postgres'),
+        user=os.getenv('DB_USER', 'postgres'),
+        password=os.getenv('DB_PASSWORD', '7631')
+    )
+
+    try:
+        if args.status:
+            applied = set(get_applied_migrations(conn))
+            for name, _ in MIGRATIONS:
+                print(f"  {'✓' if name in applied else '·'} {name}")
+            return
+
+        newly_applied = apply_migrations(conn)
+        if newly_applied:
+            for name in newly_applied:
+                print(f"✓ Применена миграция: {name}")
+        else:
+            print("✓ Схема актуальна, новых миграций нет")
+    finally:
+        conn.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+"""
+Продакшен запуск API сервера через waitress (Windows и Linux)
+
+Использование:
+    python serve.py
+Параметры задаются переменными окружения: HOST, PORT, WEB_THREADS, DB_POOL_SIZE
+"""
+import os
+import sys
+from database import DB_CONFIG, DB_POOL_SIZE, close_pool
+
+# Устанавливаем UTF-8 для вывода на Windows
+if sys.platform == 'win32':
+    import io
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+
+
+def main():
+    """Главная функция"""
+    try:
+        from waitress import serve
+    except ImportError:
+        print("[ERROR] waitress не установлен. Установите: pip install waitress")
+        sys.exit(1)
+
+    # Приложение уже собрано при импорте server.py, create_app() собрал бы второе
+    from server import app
+
+    host = os.getenv('HOST', '0.0.0.0')
+    port = int(os.getenv('PORT', '8000'))
+    # waitress - один процесс: потоки = размер пула соединений с БД
+    threads = int(os.getenv('WEB_THREADS', max(DB_POOL_SIZE, 1)))
+
+    print("=" * 50)
+    print("BTEU Schedule API Server (waitress)")
+    print("=" * 50)
+    print(f"Database: {DB_CONFIG['host']}:{DB_CONFIG['port']}/{DB_CONFIG['database']}")
+    print(f"Threads: {threads}, DB pool: {DB_POOL_SIZE}")
+    print(f"Components: {', '.join(app.config['API_COMPONENTS'])}")
+    print(f"Listening on http://{host}:{port}")
+    print("=" * 50)
+
+    try:
+        serve(
+            app,
+            host=host,
+            port=port,
+            threads=threads,
+            connection_limit=int(os.getenv('WEB_CONNECTION_LIMIT', '200')),
+            channel_timeout=int(os.getenv('WEB_TIMEOUT', '60')),
+            ident='bteu-schedule'
+        )
+    finally:
+        close_pool()
+
+
+if __name__ == '__main__':
+    main()
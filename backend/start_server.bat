@@ -40,7 +40,7 @@ if not exist .env (
 
 REM Проверка зависимостей
 echo Проверка зависимостей...
-python -c "import flask" >nul 2>&1
+python -c "import flask, waitress" >nul 2>&1
 if errorlevel 1 (
     echo [WARNING] Flask не установлен!
     echo Установка зависимостей...
@@ -65,7 +65,12 @@ echo Для остановки нажмите Ctrl+C
 echo ========================================
 echo.
 
-python server.py
+REM start_server.bat dev - встроенный сервер Flask для разработки
+if /i "%~1"=="dev" (
+    python server.py
+) else (
+    python serve.py
+)
 
 if errorlevel 1 (
     echo.
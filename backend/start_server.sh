@@ -16,7 +16,31 @@ if [ ! -f .env ]; then
     read -p "Press enter to continue..."
 fi
 
-echo "Starting server..."
+# Режим запуска: ./start_server.sh dev - встроенный сервер Flask для разработки
+if [ "$1" = "dev" ]; then
+    echo "Starting development server..."
+    echo ""
+    exec python3 server.py
+fi
+
+if command -v gunicorn >/dev/null 2>&1; then
+    echo "Starting production server (gunicorn)..."
+    # С preload (по умолчанию) HUP перезапускает воркеры со старым кодом: новый код - только заменой мастера
+    PRELOAD="${WEB_PRELOAD:-$(grep -E '^WEB_PRELOAD=' .env 2>/dev/null | tail -n 1 | cut -d= -f2-)}"
+    case "$(echo "${PRELOAD:-on}" | tr '[:upper:]' '[:lower:]')" in
+        1|true|yes|on)
+            echo "Graceful reload: kill -USR2 \$(cat gunicorn.pid)"
+            echo "  then, when new workers are up: kill -QUIT \$(cat gunicorn.pid.oldbin)"
+            ;;
+        *)
+            echo "Graceful reload: kill -HUP \$(cat gunicorn.pid)"
+            ;;
+    esac
+    echo ""
+    exec gunicorn -c gunicorn.conf.py
+fi
+
+echo "[WARNING] gunicorn not found, starting waitress..."
 echo ""
-python3 server.py
+exec python3 serve.py
 
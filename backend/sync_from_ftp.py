@@ -15,15 +15,11 @@ from ftplib import FTP
 # Добавляем путь к модулям
 sys.path.insert(0, os.path.dirname(__file__))
 
-from download_from_ftp import download_from_ftp, FTP_HOST, FTP_USER, FTP_PASS, FTP_FOLDER
-
-# Импорты для обработки файлов
-try:
-    from batch_parser import main as batch_parse_main
-    BATCH_PARSER_AVAILABLE = True
-except ImportError:
-    BATCH_PARSER_AVAILABLE = False
-    print("⚠ batch_parser.py не найден, автоматическая обработка недоступна")
+from download_from_ftp import (
+    download_from_ftp, create_ftp_sync,
+    FTP_HOST, FTP_USER, FTP_PASS, FTP_FOLDER
+)
+from ftp_sync import format_report as format_download_report
 
 
 def log(message: str):
@@ -76,54 +72,44 @@ def sync_from_ftp(auto_process: bool = False, download_dir: str = None):
         log("  - Доступность FTP сервера")
         return False
     
-    # Скачивание файлов
-    log("\n" + "=" * 70)
-    log("ШАГ 1: СКАЧИВАНИЕ ФАЙЛОВ С FTP")
-    log("=" * 70)
-    
-    downloaded = download_from_ftp(download_dir)
-    
-    if downloaded == 0:
-        log("\n⚠ Новых файлов не найдено")
-        log("Файлы могут быть уже скачаны или сервер пуст")
-    else:
-        log(f"\n✓ Скачано файлов: {downloaded}")
-    
-    # Автоматическая обработка
-    if auto_process and BATCH_PARSER_AVAILABLE and downloaded > 0:
+    if auto_process:
+        # Скачивание и обработка одним конвейером: файлы разбираются и пишутся в БД,
+        # пока остальные еще скачиваются
+        from pipeline import IngestPipeline, format_report
+        
         log("\n" + "=" * 70)
-        log("ШАГ 2: ОБРАБОТКА ФАЙЛОВ")
+        log("СКАЧИВАНИЕ И ОБРАБОТКА ФАЙЛОВ")
         log("=" * 70)
         
-        if download_dir is None:
-            download_dir = os.path.join(os.path.dirname(__file__), "..", "ftp_download")
-        
-        log(f"Обработка файлов из: {download_dir}")
-        
+        engine = create_ftp_sync(download_dir)
+        pipeline = IngestPipeline(store=engine.store, log=log)
+        engine.on_change = pipeline.submit
         try:
-            # Сохраняем аргументы командной строки
-            old_argv = sys.argv
-            
-            # Устанавливаем аргументы для batch_parser
-            sys.argv = ['batch_parser.py', '--dir', download_dir]
-            
-            # Запускаем обработку
-            batch_parse_main()
-            
-            # Восстанавливаем аргументы
-            sys.argv = old_argv
-            
-            log("\n✓ Обработка завершена!")
+            report = pipeline.run(download=engine.sync)
         except Exception as e:
             log(f"\n✗ Ошибка обработки файлов: {e}")
             import traceback
             traceback.print_exc()
-            sys.argv = old_argv
-    elif auto_process and not BATCH_PARSER_AVAILABLE:
-        log("\n⚠ Автоматическая обработка недоступна")
-        log("batch_parser.py не найден")
-    elif auto_process and downloaded == 0:
-        log("\n⏭ Автоматическая обработка пропущена (нет новых файлов)")
+            return False
+        
+        downloaded = engine.stats['changed']
+        log(format_download_report(engine.stats))
+        log(format_report(report))
+        if report['failed']:
+            log(f"⚠ Файлов с ошибками: {report['failed']} (будут повторно обработаны при следующем запуске)")
+    else:
+        # Скачивание файлов
+        log("\n" + "=" * 70)
+        log("ШАГ 1: СКАЧИВАНИЕ ФАЙЛОВ С FTP")
+        log("=" * 70)
+        
+        downloaded = download_from_ftp(download_dir)
+        
+        if downloaded == 0:
+            log("\n⚠ Новых файлов не найдено")
+            log("Файлы могут быть уже скачаны или сервер пуст")
+        else:
+            log(f"\n✓ Скачано файлов: {downloaded}")
     
     # Итоги
     log("\n" + "=" * 70)
@@ -133,11 +119,11 @@ def sync_from_ftp(auto_process: bool = False, download_dir: str = None):
     if downloaded > 0:
         log(f"✓ Скачано файлов: {downloaded}")
         if not auto_process:
-            log("\nСледующий шаг: обработайте файлы вручную:")
+            log("\nСледующий шаг: обработайте файлы:")
             if download_dir:
-                log(f"  python backend/batch_parser.py --dir \"{download_dir}\"")
+                log(f"  python backend/sync_from_ftp.py --auto-process --dir \"{download_dir}\"")
             else:
-                log("  python backend/batch_parser.py --dir ftp_download")
+                log("  python backend/sync_from_ftp.py --auto-process")
     else:
         log("✓ Все файлы актуальны")
     
@@ -3,9 +3,12 @@
 """
 
 import logging
+import time
 from datetime import date, datetime, timedelta
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Iterator, Optional
 from db_connection import get_connector, ARMAPostgreSQLConnector
+from arma_references import ReferenceCache, REFERENCE_TABLES
+from bell_schedule import get_bell_schedule
 
 logger = logging.getLogger(__name__)
 
@@ -23,159 +26,135 @@ class ScheduleSync:
             arma_connector: Коннектор к БД АРМА
         """
         self.arma = arma_connector
+        self.references = ReferenceCache()
     
-    def sync_references(self):
+    def sync_references(self, max_workers: Optional[int] = None) -> Dict[str, Dict[str, Any]]:
         """
-        Синхронизация справочников
-        """
-        logger.info("Начало синхронизации справочников...")
-        
-        # Синхронизация групп
-        self._sync_groups()
+        Синхронизация справочников (sgrupp, spred, sprep, saudit, fvzan, sfak)
         
-        # Синхронизация предметов
-        self._sync_subjects()
+        Справочники загружаются в self.references параллельно по соединениям пула АРМА;
+        неизменившиеся таблицы не перечитываются.
         
-        # Синхронизация преподавателей
-        self._sync_teachers()
+        Args:
+            max_workers: Число параллельных запросов (по умолчанию - размер пула АРМА)
         
-        # Синхронизация аудиторий
-        self._sync_audiences()
+        Returns:
+            Отчет по справочникам: {имя: {rows, changed, attempts, seconds, error}}
+        """
+        logger.info("Начало синхронизации справочников...")
+        started = time.perf_counter()
         
-        # Синхронизация видов занятий
-        self._sync_lesson_types()
+        report = self.references.load(self.arma, REFERENCE_TABLES, max_workers=max_workers)
         
-        # Синхронизация факультетов
-        self._sync_faculties()
+        for name, result in report.items():
+            status = 'ошибка' if result['error'] else ('загружен' if result['changed'] else 'без изменений')
+            logger.info(
+                f"  {REFERENCE_TABLES[name][0]:<10} {result['rows']:>6} записей  "
+                f"{result['seconds']:>6.2f} с  попыток {result['attempts']}  {status}"
+            )
         
-        logger.info("Синхронизация справочников завершена")
-    
-    def _sync_groups(self):
-        """Синхронизация групп из таблицы SGRUP"""
-        try:
-            query = """
-                SELECT 
-                    okgrup as code,
-                    qkfak as faculty_id,
-                    qkolstud as student_count,
-                    qnsemest as semester,
-                    qgod as academic_year,
-                    qsp as specialty_code,
-                    qspcl as specialization_code
-                FROM sgrupp
-                WHERE qgod = (SELECT MAX(qgod) FROM sgrupp)
-            """
-            
-            groups = self.arma.execute_query(query)
-            logger.info(f"Найдено групп: {len(groups)}")
-            
-            # Здесь должна быть логика сохранения в вашу БД
-            # Например:
-            # for group in groups:
-            #     save_group_to_api_db(group)
-            
-        except Exception as e:
-            logger.error(f"Ошибка синхронизации групп: {e}")
+        logger.info(f"Синхронизация справочников завершена за {time.perf_counter() - started:.2f} с")
+        return report
     
-    def _sync_subjects(self):
-        """Синхронизация предметов из таблицы SPRED"""
-        try:
-            query = """
-                SELECT 
-                    qkod as id,
-                    qkrnam as short_name,
-                    qpnam as full_name,
-                    qkaf as department_id
-                FROM spred
-            """
-            
-            subjects = self.arma.execute_query(query)
-            logger.info(f"Найдено предметов: {len(subjects)}")
-            
-        except Exception as e:
-            logger.error(f"Ошибка синхронизации предметов: {e}")
-    
-    def _sync_teachers(self):
-        """Синхронизация преподавателей из таблицы SPREP"""
-        try:
-            query = """
-                SELECT 
-                    qtnprep as id,
-                    qfiopr as full_name,
-                    qprfpr as position,
-                    qkaf as department_id,
-                    qus as academic_degree,
-                    quz as academic_title
-                FROM sprep
-            """
-            
-            teachers = self.arma.execute_query(query)
-            logger.info(f"Найдено преподавателей: {len(teachers)}")
-            
-        except Exception as e:
-            logger.error(f"Ошибка синхронизации преподавателей: {e}")
+    def enrichment_version(self) -> str:
+        """
+        Версия данных, которыми дополняются строки расписания: справочники занятий и звонки
+        
+        Справочники загружаются (неизменившиеся не перечитываются). Если версия изменилась,
+        сохраненные занятия содержат устаревшие названия или время и должны быть перезаписаны.
+        
+        Raises:
+            ReferenceLoadError: справочник не загрузился и прежних строк нет
+        """
+        self.references.require(self.references.load(self.arma))
+        return f"{self.references.version()}-{get_bell_schedule().version}"
     
-    def _sync_audiences(self):
-        """Синхронизация аудиторий из таблицы SAUDIT"""
-        try:
-            query = """
-                SELECT 
-                    qkaud as id,
-                    qiaud as name,
-                    onkorp as building_number,
-                    qkolmest as capacity,
-                    qpk as is_computer_lab
-                FROM saudit
-            """
-            
-            audiences = self.arma.execute_query(query)
-            logger.info(f"Найдено аудиторий: {len(audiences)}")
-            
-        except Exception as e:
-            logger.error(f"Ошибка синхронизации аудиторий: {e}")
+    # Таблица АРМА и дополнительные колонки для каждой формы обучения
+    SCHEDULE_SOURCES = {
+        'full_time': ('tmp_graf', ",\n                    qnpot as stream_number"),
+        'extramural': ('fraspz', ''),
+    }
     
-    def _sync_lesson_types(self):
-        """Синхронизация видов занятий из таблицы FVZAN"""
-        try:
-            query = """
-                SELECT 
-                    okvzan as id,
-                    qivzan as name
-                FROM fvzan
-            """
-            
-            lesson_types = self.arma.execute_query(query)
-            logger.info(f"Найдено видов занятий: {len(lesson_types)}")
-            
-        except Exception as e:
-            logger.error(f"Ошибка синхронизации видов занятий: {e}")
+    # Колонки расписания, общие для дневной (tmp_graf) и заочной (fraspz) форм
+    SCHEDULE_COLUMNS = """
+                    qdate as lesson_date,
+                    qnurok as lesson_number,
+                    qkgrup as group_code,
+                    qkpred as subject_id,
+                    qkvzan as lesson_type_id,
+                    qkprep1 as teacher1_id,
+                    qkprep2 as teacher2_id,
+                    qkprep3 as teacher3_id,
+                    qkaud1 as audience1_id,
+                    qkaud2 as audience2_id,
+                    qkaud3 as audience3_id"""
     
-    def _sync_faculties(self):
-        """Синхронизация факультетов из таблицы SFAK"""
-        try:
-            query = """
-                SELECT 
-                    qkod as id,
-                    oname as name,
-                    qkotd as department_code
-                FROM sfak
+    def _iter_schedule(
+        self,
+        table: str,
+        extra_columns: str,
+        study_form: str,
+        academic_year: str,
+        semester: int,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        dates: Optional[List[date]] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Построчное чтение расписания из таблицы АРМА (серверный курсор)
+        
+        Каждая строка дополняется временем занятия, названиями из справочников
+        и атрибутами синхронизации и сразу отдается дальше, не накапливаясь в памяти.
+        Если передан dates, читаются только эти дни.
+        
+        Raises:
+            ReferenceLoadError: справочник не загрузился (обрыв VPN, ошибка АРМА) и прежних
+                строк нет - строки не отдаются, чтобы не записать занятия без названий
+        """
+        # Справочники - один раз на синхронизацию (перечитываются только при изменении)
+        self.references.require(self.references.load(self.arma))
+        
+        query = f"""
+                SELECT {self.SCHEDULE_COLUMNS}{extra_columns}
+                FROM {table}
+                WHERE 1=1
             """
-            
-            faculties = self.arma.execute_query(query)
-            logger.info(f"Найдено факультетов: {len(faculties)}")
-            
-        except Exception as e:
-            logger.error(f"Ошибка синхронизации факультетов: {e}")
+        
+        params = []
+        
+        # Фильтр по датам
+        if start_date:
+            query += " AND qdate >= %s"
+            params.append(start_date)
+        
+        if end_date:
+            query += " AND qdate <= %s"
+            params.append(end_date)
+        
+        if dates is not None:
+            query += " AND qdate = ANY(%s)"
+            params.append(list(dates))
+        
+        query += " ORDER BY qdate, qnurok"
+        
+        rows = self.arma.stream_query(query, tuple(params) if params else None)
+        for lesson in self.references.enrich(rows):
+            # Добавить время начала/окончания по номеру урока
+            lesson['time_start'], lesson['time_end'] = self._get_lesson_time(lesson['lesson_number'])
+            lesson['study_form'] = study_form
+            lesson['academic_year'] = academic_year
+            lesson['semester'] = semester
+            yield lesson
     
-    def sync_schedule_full_time(
+    def iter_schedule_full_time(
         self,
         academic_year: str,
         semester: int,
         start_date: Optional[date] = None,
         end_date: Optional[date] = None
-    ) -> List[Dict[str, Any]]:
+    ) -> Iterator[Dict[str, Any]]:
         """
-        Синхронизация расписания для дневного обучения из TMP_GRAF
+        Расписание дневного обучения из TMP_GRAF, построчно
         
         Args:
             academic_year: Учебный год (например, "2023-2024")
@@ -183,53 +162,57 @@ class ScheduleSync:
             start_date: Начальная дата (опционально)
             end_date: Конечная дата (опционально)
         
-        Returns:
-            Список занятий
+        Yields:
+            Занятия в порядке даты и номера пары
         """
         logger.info(f"Синхронизация расписания дневного обучения: {academic_year}, семестр {semester}")
+        return self._iter_schedule(
+            *self.SCHEDULE_SOURCES['full_time'], 'full_time',
+            academic_year, semester, start_date, end_date
+        )
+    
+    def iter_schedule_extramural(
+        self,
+        academic_year: str,
+        semester: int,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Расписание заочного обучения из FRASPZ, построчно
+        
+        Args:
+            academic_year: Учебный год
+            semester: Номер семестра
+            start_date: Начальная дата
+            end_date: Конечная дата
         
+        Yields:
+            Занятия в порядке даты и номера пары
+        """
+        logger.info(f"Синхронизация расписания заочного обучения: {academic_year}, семестр {semester}")
+        return self._iter_schedule(
+            *self.SCHEDULE_SOURCES['extramural'], 'extramural',
+            academic_year, semester, start_date, end_date
+        )
+    
+    def sync_schedule_full_time(
+        self,
+        academic_year: str,
+        semester: int,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Синхронизация расписания для дневного обучения из TMP_GRAF
+        
+        Загружает все занятия списком; для больших периодов используйте iter_schedule_full_time.
+        
+        Returns:
+            Список занятий
+        """
         try:
-            # Базовый запрос
-            query = """
-                SELECT 
-                    qdate as lesson_date,
-                    qnurok as lesson_number,
-                    qkgrup as group_code,
-                    qkpred as subject_id,
-                    qkvzan as lesson_type_id,
-                    qkprep1 as teacher1_id,
-                    qkprep2 as teacher2_id,
-                    qkprep3 as teacher3_id,
-                    qkaud1 as audience1_id,
-                    qkaud2 as audience2_id,
-                    qkaud3 as audience3_id,
-                    qnpot as stream_number
-                FROM tmp_graf
-                WHERE 1=1
-            """
-            
-            params = []
-            
-            # Фильтр по датам
-            if start_date:
-                query += " AND qdate >= %s"
-                params.append(start_date)
-            
-            if end_date:
-                query += " AND qdate <= %s"
-                params.append(end_date)
-            
-            query += " ORDER BY qdate, qnurok"
-            
-            lessons = self.arma.execute_query(query, tuple(params) if params else None)
-            
-            # Добавить время начала/окончания по номеру урока
-            for lesson in lessons:
-                lesson['time_start'], lesson['time_end'] = self._get_lesson_time(lesson['lesson_number'])
-                lesson['study_form'] = 'full_time'
-                lesson['academic_year'] = academic_year
-                lesson['semester'] = semester
-            
+            lessons = list(self.iter_schedule_full_time(academic_year, semester, start_date, end_date))
             logger.info(f"Найдено занятий: {len(lessons)}")
             return lessons
             
@@ -245,59 +228,15 @@ class ScheduleSync:
         end_date: Optional[date] = None
     ) -> List[Dict[str, Any]]:
         """
-        Синхронизация расписания для заочного обучения из FRASPZ/FGRAFIKZ
+        Синхронизация расписания для заочного обучения из FRASPZ
         
-        Args:
-            academic_year: Учебный год
-            semester: Номер семестра
-            start_date: Начальная дата
-            end_date: Конечная дата
+        Загружает все занятия списком; для больших периодов используйте iter_schedule_extramural.
         
         Returns:
             Список занятий
         """
-        logger.info(f"Синхронизация расписания заочного обучения: {academic_year}, семестр {semester}")
-        
         try:
-            # Попробовать найти таблицу для заочников
-            # Возможно, это fraspz или fgrafikz
-            query = """
-                SELECT 
-                    qdate as lesson_date,
-                    qnurok as lesson_number,
-                    qkgrup as group_code,
-                    qkpred as subject_id,
-                    qkvzan as lesson_type_id,
-                    qkprep1 as teacher1_id,
-                    qkprep2 as teacher2_id,
-                    qkprep3 as teacher3_id,
-                    qkaud1 as audience1_id,
-                    qkaud2 as audience2_id,
-                    qkaud3 as audience3_id
-                FROM fraspz
-                WHERE 1=1
-            """
-            
-            params = []
-            
-            if start_date:
-                query += " AND qdate >= %s"
-                params.append(start_date)
-            
-            if end_date:
-                query += " AND qdate <= %s"
-                params.append(end_date)
-            
-            query += " ORDER BY qdate, qnurok"
-            
-            lessons = self.arma.execute_query(query, tuple(params) if params else None)
-            
-            for lesson in lessons:
-                lesson['time_start'], lesson['time_end'] = self._get_lesson_time(lesson['lesson_number'])
-                lesson['study_form'] = 'extramural'
-                lesson['academic_year'] = academic_year
-                lesson['semester'] = semester
-            
+            lessons = list(self.iter_schedule_extramural(academic_year, semester, start_date, end_date))
             logger.info(f"Найдено занятий для заочников: {len(lessons)}")
             return lessons
             
@@ -409,22 +348,12 @@ class ScheduleSync:
         Получение времени начала и окончания занятия по номеру урока
         
         Args:
-            lesson_number: Номер урока (1-6)
+            lesson_number: Номер урока (1-7)
         
         Returns:
-            Кортеж (time_start, time_end)
+            Кортеж (time_start, time_end) из расписания звонков, (None, None) для неизвестной пары
         """
-        # Стандартное расписание (можно настроить)
-        schedule = {
-            1: ("08:00:00", "09:30:00"),
-            2: ("09:45:00", "11:15:00"),
-            3: ("11:30:00", "13:00:00"),
-            4: ("13:30:00", "15:00:00"),
-            5: ("15:15:00", "16:45:00"),
-            6: ("17:00:00", "18:30:00"),
-        }
-        
-        return schedule.get(lesson_number, ("08:00:00", "09:30:00"))
+        return get_bell_schedule().lesson_time(lesson_number)
 
 
 if __name__ == "__main__":
@@ -451,18 +380,23 @@ if __name__ == "__main__":
         week_start = today - timedelta(days=today.weekday())
         week_end = week_start + timedelta(days=6)
         
-        lessons = sync.sync_schedule_full_time(
+        # Занятия читаются построчно серверным курсором
+        count = 0
+        first_lesson = None
+        for lesson in sync.iter_schedule_full_time(
             academic_year="2023-2024",
             semester=1,
             start_date=week_start,
             end_date=week_end
-        )
+        ):
+            count += 1
+            first_lesson = first_lesson or lesson
         
-        print(f"\n✅ Найдено занятий на неделю: {len(lessons)}")
+        print(f"\n✅ Найдено занятий на неделю: {count}")
         
-        if lessons:
+        if first_lesson:
             print("\nПример занятия:")
-            print(lessons[0])
+            print(first_lesson)
     
     connector.close()
 
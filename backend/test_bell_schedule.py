@@ -0,0 +1,81 @@
+"""Тест расписания звонков (bell_schedule.BellSchedule)
+
+Проверяет номер пары по времени из ячейки Excel (обе половины пары, перемена,
+нераспознанное время), время пары по номеру и отпечаток звонков.
+Запуск: python test_bell_schedule.py
+"""
+import sys
+import io
+from datetime import time
+
+# Исправление кодировки для Windows
+if sys.platform == 'win32':
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+
+from bell_schedule import DEFAULT_BELLS, BellSchedule
+
+BELLS = BellSchedule(DEFAULT_BELLS)
+
+
+def test_number_from_text():
+    """Обе половины пары относятся к одной паре"""
+    cases = {
+        '9.00-9.45': 1, '9:50-10:35': 1,
+        '10.50-11.35': 2, '11:40-12:25': 2,
+        '15.30 - 16.15': 4,
+        '19.50-20.35': 7, '20:40-21:25': 7,
+    }
+    for text, expected in cases.items():
+        assert BELLS.lesson_number_from_text(text) == expected, (text, BELLS.lesson_number_from_text(text))
+
+
+def test_break_and_unknown_time():
+    """Время на перемене - следующая пара, после последней и без времени - 0"""
+    assert BELLS.lesson_number_from_text('12.30-13.15') == 3
+    assert BELLS.lesson_number_from_text('8.00-8.45') == 1
+    assert BELLS.lesson_number_from_text('22.00-22.45') == 0
+    assert BELLS.lesson_number_from_text('ауд. 101') == 0
+
+
+def test_lesson_time():
+    """Время пары по номеру, для неизвестной пары - (None, None)"""
+    assert BELLS.lesson_time(4) == (time(14, 40), time(16, 15))
+    assert BELLS.lesson_time(9) == (None, None)
+    lessons = [{'lesson_number': 2}, {'lesson_number': 9}]
+    BELLS.attach(lessons)
+    assert lessons[0]['lesson_start'] == time(10, 50) and lessons[0]['lesson_end'] == time(12, 25)
+    assert lessons[1]['lesson_start'] is None and lessons[1]['lesson_end'] is None
+
+
+def test_version():
+    """Отпечаток звонков не зависит от порядка строк и меняется при изменении времени"""
+    shuffled = BellSchedule(reversed(DEFAULT_BELLS))
+    assert shuffled.version == BELLS.version
+    changed = BellSchedule(DEFAULT_BELLS[:-1] + ((7, time(19, 55), time(21, 30)),))
+    assert changed.version != BELLS.version
+
+
+TESTS = (
+    test_number_from_text,
+    test_break_and_unknown_time,
+    test_lesson_time,
+    test_version,
+)
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("ТЕСТ РАСПИСАНИЯ ЗВОНКОВ")
+    print("=" * 60)
+
+    failed = False
+    for test in TESTS:
+        try:
+            test()
+            print(f"✓ {test.__doc__}")
+        except AssertionError as e:
+            failed = True
+            print(f"[X] {test.__doc__}")
+            print(f"    {e}")
+
+    sys.exit(1 if failed else 0)
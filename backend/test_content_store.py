@@ -0,0 +1,127 @@
+"""Тест манифеста хранилища (content_store.ContentStore)
+
+Проверяет, что save() нескольких экземпляров (и процессов) объединяет манифест:
+источники, записанные другими, и отметки о разборе не теряются,
+а prune() не удаляет объекты, еще не сохраненные другим экземпляром.
+Запуск: python test_content_store.py
+"""
+import os
+import sys
+import io
+import shutil
+import subprocess
+import tempfile
+
+# Исправление кодировки для Windows
+if sys.platform == 'win32':
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+
+from content_store import ContentStore
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Процесс, который записывает свои источники и сохраняет манифест
+WRITER = """
+import sys
+from content_store import ContentStore
+root, prefix = sys.argv[1], sys.argv[2]
+for i in range(10):
+    store = ContentStore(root)
+    store.store_chunks(f'{prefix}/{i}', [f'{prefix} {i}'.encode()], f'{prefix}-{i}.xlsx')
+    store.save()
+"""
+
+
+def test_instances_merge():
+    """Источники двух экземпляров сохраняются оба"""
+    root = tempfile.mkdtemp(prefix='store-')
+    try:
+        first, second = ContentStore(root), ContentStore(root)
+        first.store_chunks('site/a', [b'a'], 'a.xlsx')
+        second.store_chunks('ftp/b', [b'b'], 'b.xlsx')
+        first.save()
+        second.save()
+
+        store = ContentStore(root)
+        assert sorted(store.sources) == ['ftp/b', 'site/a'], sorted(store.sources)
+        assert sorted(p.name for _, p in store.pending()) == ['a.xlsx', 'b.xlsx']
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+def test_processed_mark_kept():
+    """Отметка о разборе не отменяется сохранением устаревшего экземпляра"""
+    root = tempfile.mkdtemp(prefix='store-')
+    try:
+        downloader = ContentStore(root)
+        _, path, _ = downloader.store_chunks('site/a', [b'a'], 'a.xlsx')
+        downloader.save()
+
+        pipeline, watcher = ContentStore(root), ContentStore(root)
+        pipeline.mark_processed(path)
+        pipeline.save()
+        # Наблюдатель загрузил манифест до отметки и сохраняет свои изменения позже
+        watcher.store_chunks('site/b', [b'b'], 'b.xlsx')
+        watcher.save()
+
+        assert [p.name for _, p in ContentStore(root).pending()] == ['b.xlsx']
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+def test_processes_merge():
+    """Одновременные сохранения из нескольких процессов не теряют источники"""
+    root = tempfile.mkdtemp(prefix='store-')
+    try:
+        processes = [
+            subprocess.Popen([sys.executable, '-c', WRITER, root, f'p{n}'], cwd=BACKEND_DIR)
+            for n in range(4)
+        ]
+        for process in processes:
+            assert process.wait(timeout=60) == 0
+        store = ContentStore(root)
+        assert len(store.sources) == 40, len(store.sources)
+        assert len(store.pending()) == 40, len(store.pending())
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+def test_prune_keeps_unsaved_objects():
+    """prune() не удаляет объект, записанный другим экземпляром до его save()"""
+    root = tempfile.mkdtemp(prefix='store-')
+    try:
+        downloader, watcher = ContentStore(root), ContentStore(root)
+        _, path, _ = downloader.store_chunks('site/a', [b'a'], 'a.xlsx')
+        removed = watcher.prune()
+
+        assert removed == 0, f"удалено файлов: {removed}"
+        assert path.exists(), f"удален {path}"
+        assert 'site/a' in watcher.sources, sorted(watcher.sources)
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+TESTS = (
+    test_instances_merge,
+    test_processed_mark_kept,
+    test_processes_merge,
+    test_prune_keeps_unsaved_objects,
+)
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("ТЕСТ МАНИФЕСТА ХРАНИЛИЩА")
+    print("=" * 60)
+
+    failed = False
+    for test in TESTS:
+        try:
+            test()
+            print(f"✓ {test.__doc__}")
+        except AssertionError as e:
+            failed = True
+            print(f"[X] {test.__doc__}")
+            print(f"    {e}")
+
+    sys.exit(1 if failed else 0)
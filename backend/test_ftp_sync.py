@@ -0,0 +1,169 @@
+"""Тест синхронизации с FTP (ftp_sync.FtpSync)
+
+Поднимает локальный FTP сервер (pyftpdlib) на временной папке и проверяет
+пропуск неизменившихся файлов, продолжение обрыва и обнаружение правок.
+Запуск: python test_ftp_sync.py
+"""
+import os
+import sys
+import io
+import logging
+import shutil
+import tempfile
+import threading
+from contextlib import contextmanager
+
+# Исправление кодировки для Windows
+if sys.platform == 'win32':
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+
+from ftp_sync import FtpSync, RemoteFile
+
+try:
+    from pyftpdlib.authorizers import DummyAuthorizer
+    from pyftpdlib.handlers import FTPHandler
+    from pyftpdlib.servers import ThreadedFTPServer
+except ImportError:
+    ThreadedFTPServer = None
+
+USER, PASSWORD = 'user', 'secret'
+
+# Журнал сервера не нужен в выводе теста
+logging.getLogger('pyftpdlib').addHandler(logging.NullHandler())
+logging.getLogger('pyftpdlib').setLevel(logging.WARNING)
+
+
+@contextmanager
+def ftp_server():
+    """Локальный FTP сервер: (папка сервера, локальное хранилище, функция создания FtpSync)"""
+    if ThreadedFTPServer is None:
+        import pytest
+        pytest.skip("pyftpdlib не установлен")
+    remote_dir = tempfile.mkdtemp(prefix='ftp-remote-')
+    local_dir = tempfile.mkdtemp(prefix='ftp-local-')
+    authorizer = DummyAuthorizer()
+    authorizer.add_user(USER, PASSWORD, remote_dir, perm='elr')
+    handler = type('Handler', (FTPHandler,), {'authorizer': authorizer})
+    server = ThreadedFTPServer(('127.0.0.1', 0), handler)
+    port = server.socket.getsockname()[1]
+    thread = threading.Thread(target=server.serve_forever, kwargs={'handle_exit': False}, daemon=True)
+    thread.start()
+
+    def make_sync():
+        return FtpSync(local_dir, '127.0.0.1', USER, PASSWORD, port=port, workers=2, log=lambda message: None)
+
+    try:
+        yield remote_dir, local_dir, make_sync
+    finally:
+        server.close_all()
+        shutil.rmtree(remote_dir, ignore_errors=True)
+        shutil.rmtree(local_dir, ignore_errors=True)
+
+
+def write_remote(remote_dir, name, content, mtime=None):
+    path = os.path.join(remote_dir, name)
+    with open(path, 'wb') as f:
+        f.write(content)
+    if mtime is not None:
+        os.utime(path, (mtime, mtime))
+
+
+def stored_content(sync, name):
+    entry = sync.store.get(sync.source(name))
+    with open(os.path.join(sync.store.root, entry['path']), 'rb') as f:
+        return f.read()
+
+
+def test_unchanged_files_skipped():
+    """Повторный запуск не скачивает файлы с тем же размером и временем изменения"""
+    with ftp_server() as (remote_dir, _, make_sync):
+        write_remote(remote_dir, '1ДК.xlsx', b'a' * 1000)
+        write_remote(remote_dir, '2ДК.xlsx', b'b' * 2000)
+
+        first = make_sync().sync()
+        assert first['downloaded'] == 2 and first['changed'] == 2, first
+
+        sync = make_sync()
+        second = sync.sync()
+        assert second['downloaded'] == 0 and second['skipped'] == 2, second
+        assert stored_content(sync, '2ДК.xlsx') == b'b' * 2000
+
+
+def test_partial_download_resumed():
+    """Обрыв продолжается с места остановки (REST), файл собирается целиком"""
+    with ftp_server() as (remote_dir, _, make_sync):
+        content = bytes(range(256)) * 400
+        write_remote(remote_dir, '3ДК.xlsx', content)
+
+        sync = make_sync()
+        ftp = sync.connect()
+        remote = next(f for f in sync.list_files(ftp) if f.name == '3ДК.xlsx')
+        ftp.quit()
+        sync.partial_dir.mkdir(parents=True, exist_ok=True)
+        sync._partial_path(remote).write_bytes(content[:30000])
+
+        report = sync.sync()
+        assert report['resumed'] == 1 and report['failed'] == 0, report
+        assert report['bytes'] == len(content) - 30000, report
+        assert stored_content(sync, '3ДК.xlsx') == content
+        assert not list(sync.partial_dir.glob('*.part'))
+
+
+def test_changed_file_detected():
+    """Правка того же размера обнаруживается по времени изменения и хэшу"""
+    with ftp_server() as (remote_dir, _, make_sync):
+        write_remote(remote_dir, '4ДК.xlsx', b'x' * 500, mtime=1_700_000_000)
+        make_sync().sync()
+
+        write_remote(remote_dir, '4ДК.xlsx', b'y' * 500, mtime=1_700_000_600)
+        sync = make_sync()
+        report = sync.sync()
+        assert report['downloaded'] == 1 and report['changed'] == 1, report
+        assert report['pruned'] == 1, report
+        assert stored_content(sync, '4ДК.xlsx') == b'y' * 500
+        assert [path.name for _, path in sync.store.pending()] == ['4ДК.xlsx']
+
+
+def test_stale_partial_discarded():
+    """Обрывок версии, которой уже нет на сервере, не продолжается"""
+    with ftp_server() as (remote_dir, _, make_sync):
+        write_remote(remote_dir, '5ДК.xlsx', b'new' * 100)
+        sync = make_sync()
+        sync.partial_dir.mkdir(parents=True, exist_ok=True)
+        stale = sync._partial_path(RemoteFile('5ДК.xlsx', 300, '20000101000000'))
+        stale.write_bytes(b'old')
+
+        report = sync.sync()
+        assert report['resumed'] == 0 and report['changed'] == 1, report
+        assert stored_content(sync, '5ДК.xlsx') == b'new' * 100
+        assert not stale.exists()
+
+
+TESTS = (
+    test_unchanged_files_skipped,
+    test_partial_download_resumed,
+    test_changed_file_detected,
+    test_stale_partial_discarded,
+)
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("ТЕСТ СИНХРОНИЗАЦИИ С FTP")
+    print("=" * 60)
+
+    if ThreadedFTPServer is None:
+        print("pyftpdlib не установлен (pip install pyftpdlib) - тест пропущен")
+        sys.exit(0)
+
+    failed = False
+    for test in TESTS:
+        try:
+            test()
+            print(f"✓ {test.__doc__}")
+        except AssertionError as e:
+            failed = True
+            print(f"[X] {test.__doc__}")
+            print(f"    {e}")
+
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,95 @@
+"""Тест времени холодного запуска API сервера
+
+Проверяет, что импорт server.py не тянет тяжелые модули (openpyxl, bs4, AI SDK)
+и укладывается в бюджет времени. Запуск: python test_import_time.py
+"""
+import os
+import sys
+import io
+import json
+import subprocess
+
+# Исправление кодировки для Windows
+if sys.platform == 'win32':
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Бюджет на импорт server.py и создание приложения (мс)
+IMPORT_BUDGET_MS = float(os.getenv('IMPORT_BUDGET_MS', '1500'))
+
+# Модули, которые должны загружаться только при первом использовании
+HEAVY_MODULES = [
+    'openpyxl',
+    'xlrd',
+    'bs4',
+    'requests',
+    'openai',
+    'google.generativeai',
+    'excel_parser',
+    'excel_parser_v2',
+    'exam_parser',
+    'ai_service',
+    'schedule_analytics',
+]
+
+# Выполняется в отдельном процессе, чтобы измерить именно холодный запуск
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import server
+elapsed_ms = (time.perf_counter() - start) * 1000
+print(json.dumps({'elapsed_ms': elapsed_ms, 'modules': sorted(sys.modules)}))
+"""
+
+
+def measure_cold_import():
+    """Импортирует server в новом интерпретаторе и возвращает время и загруженные модули"""
+    result = subprocess.run(
+        [sys.executable, '-c', PROBE],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True,
+        encoding='utf-8'
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Не удалось импортировать server.py:\n{result.stderr}")
+    # Последняя строка - JSON, выше может быть вывод модулей
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def test_heavy_modules_not_imported():
+    """Тяжелые модули не загружаются при импорте server.py"""
+    probe = measure_cold_import()
+    loaded = [m for m in HEAVY_MODULES if m in probe['modules']]
+    assert not loaded, f"При запуске загружены тяжелые модули: {', '.join(loaded)}"
+
+
+def test_import_time_budget():
+    """Импорт server.py укладывается в бюджет (лучшее из 3 запусков)"""
+    best_ms = min(measure_cold_import()['elapsed_ms'] for _ in range(3))
+    assert best_ms <= IMPORT_BUDGET_MS, (
+        f"Импорт server.py занял {best_ms:.0f} мс (бюджет {IMPORT_BUDGET_MS:.0f} мс)"
+    )
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("ТЕСТ ВРЕМЕНИ ЗАПУСКА СЕРВЕРА")
+    print("=" * 60)
+
+    failed = False
+    for test in (test_heavy_modules_not_imported, test_import_time_budget):
+        try:
+            test()
+            print(f"✓ {test.__doc__}")
+        except AssertionError as e:
+            failed = True
+            print(f"[X] {test.__doc__}")
+            print(f"    {e}")
+
+    probe = measure_cold_import()
+    print(f"\nВремя импорта: {probe['elapsed_ms']:.0f} мс (бюджет {IMPORT_BUDGET_MS:.0f} мс)")
+    print(f"Загружено модулей: {len(probe['modules'])}")
+
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,215 @@
+"""Тест планов запросов чтения расписания (индексы миграции 005_read_indexes)
+
+Создает во временной схеме локальной БД (настройки DB_* из .env) таблицы groups
+и lessons, заполняет их, применяет миграции schema.py и выполняет
+запросы API через EXPLAIN (ANALYZE, BUFFERS). Тест падает, если groups или lessons
+читаются последовательным сканированием. Без доступной БД тест пропускается.
+Запуск: python test_query_plans.py
+"""
+import os
+import sys
+import io
+import json
+
+# Исправление кодировки для Windows
+if sys.platform == 'win32':
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+
+import psycopg2
+
+from database import DB_CONFIG
+from routes_public import GROUP_ID_SQL, LESSONS_SQL, PARITY_SQL, SEARCH_GROUP_SQL, SEARCH_SQL
+from schema import MIGRATIONS
+
+SCHEMA = f'plan_test_{os.getpid()}'
+GROUPS = 2000
+
+# Таблицы, которые не должны читаться целиком (справочники - сотни строк)
+CHECKED_TABLES = {'groups', 'lessons'}
+
+BASE_TABLES = """
+    CREATE TABLE groups (
+        id SERIAL PRIMARY KEY,
+        code VARCHAR(50) NOT NULL,
+        name TEXT,
+        is_active BOOLEAN NOT NULL DEFAULT TRUE
+    );
+    CREATE TABLE lessons (
+        id SERIAL PRIMARY KEY,
+        group_id INTEGER NOT NULL REFERENCES groups (id),
+        day_of_week INTEGER NOT NULL,
+        lesson_number INTEGER NOT NULL,
+        subject TEXT NOT NULL,
+        teacher TEXT,
+        classroom TEXT,
+        lesson_type VARCHAR(20),
+        week_parity VARCHAR(10),
+        building TEXT,
+        notes TEXT,
+        is_active BOOLEAN NOT NULL DEFAULT TRUE,
+        created_at TIMESTAMP DEFAULT NOW(),
+        updated_at TIMESTAMP DEFAULT NOW()
+    );
+"""
+
+SEED = """
+    INSERT INTO groups (code, name, is_active)
+        SELECT 'PT-' || g, 'Группа ' || g, g %% 20 <> 0 FROM generate_series(1, %(groups)s) g;
+    INSERT INTO lessons (group_id, day_of_week, lesson_number, subject, teacher, classroom,
+                         lesson_type, week_parity, is_active)
+        SELECT g.id, d, n,
+               'Предмет ' || ((g.id * 7 + d * 3 + n) %% 300),
+               'Преподаватель ' || ((g.id + d * n) %% 500),
+               (100 + (g.id * n) %% 400)::text,
+               'lecture',
+               CASE WHEN (g.id + d + n) %% 17 = 0 THEN NULL
+                    ELSE (ARRAY['both', 'odd', 'even'])[1 + (g.id + d + n) %% 3] END,
+               (g.id + d + n) %% 10 <> 0
+        FROM groups g, generate_series(1, 6) d, generate_series(1, 5) n;
+"""
+
+_conn = None
+
+
+def database():
+    """Соединение с заполненной временной схемой (создается один раз на запуск)"""
+    global _conn
+    if _conn is not None:
+        return _conn
+    try:
+        conn = psycopg2.connect(**DB_CONFIG, connect_timeout=3)
+    except psycopg2.OperationalError as e:
+        import pytest
+        pytest.skip(f"PostgreSQL недоступен: {e}")
+    # VACUUM (карта видимости для index-only scan) нельзя выполнять в транзакции
+    conn.autocommit = True
+    cur = conn.cursor()
+    cur.execute(f"CREATE SCHEMA {SCHEMA}")
+    cur.execute(f"SET search_path TO {SCHEMA}")
+    cur.execute(BASE_TABLES)
+    cur.execute(SEED, {'groups': GROUPS})
+    for _, sql in MIGRATIONS:
+        cur.execute(sql)
+    cur.execute("VACUUM ANALYZE")
+    cur.close()
+
+    import atexit
+    atexit.register(drop_schema, conn)
+    _conn = conn
+    return conn
+
+
+def drop_schema(conn):
+    cur = conn.cursor()
+    cur.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+    conn.close()
+
+
+def explain(sql, params):
+    """План запроса: (узлы последовательного сканирования проверяемых таблиц, план целиком)"""
+    cur = database().cursor()
+    cur.execute("EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) " + sql, params)
+    plan = cur.fetchone()[0]
+    cur.close()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    root = plan[0]['Plan']
+
+    seq_scans = []
+    nodes = [root]
+    while nodes:
+        node = nodes.pop()
+        if node['Node Type'] == 'Seq Scan' and node.get('Relation Name') in CHECKED_TABLES:
+            seq_scans.append(node['Relation Name'])
+        nodes.extend(node.get('Plans', []))
+    return seq_scans, root
+
+
+def format_plan(node, depth=0):
+    """Дерево плана для сообщения об ошибке: узел, таблица, строк, блоков"""
+    blocks = node.get('Shared Hit Blocks', 0) + node.get('Shared Read Blocks', 0)
+    relation = f" on {node['Relation Name']}" if 'Relation Name' in node else ''
+    index = f" using {node['Index Name']}" if 'Index Name' in node else ''
+    lines = [f"{'  ' * depth}{node['Node Type']}{relation}{index} "
+             f"(строк {node.get('Actual Rows')}, блоков {blocks})"]
+    for child in node.get('Plans', []):
+        lines.append(format_plan(child, depth + 1))
+    return "\n".join(lines)
+
+
+def assert_no_seq_scan(sql, params):
+    seq_scans, root = explain(sql, params)
+    assert not seq_scans, f"последовательное сканирование {', '.join(seq_scans)}\n" + format_plan(root)
+
+
+def group_id(code):
+    cur = database().cursor()
+    cur.execute(GROUP_ID_SQL, (code,))
+    result = cur.fetchone()[0]
+    cur.close()
+    return result
+
+
+def test_group_lookup():
+    """Код группы -> ID по индексу"""
+    assert_no_seq_scan(GROUP_ID_SQL, ('PT-777',))
+
+
+def test_day_schedule():
+    """Расписание на день, с четностью и без"""
+    query = LESSONS_SQL + " WHERE l.group_id = %s AND l.day_of_week = %s AND l.is_active = TRUE"
+    assert_no_seq_scan(query + PARITY_SQL, (group_id('PT-777'), 3, 'odd'))
+    assert_no_seq_scan(query, (group_id('PT-777'), 3))
+
+
+def test_week_schedule():
+    """Расписание на неделю с четностью"""
+    query = LESSONS_SQL + " WHERE l.group_id = %s AND l.is_active = TRUE" + PARITY_SQL
+    assert_no_seq_scan(query + " ORDER BY l.day_of_week, l.lesson_number", (group_id('PT-777'), 'even'))
+
+
+def test_batch_schedule():
+    """Пакетный запрос расписания нескольких групп"""
+    ids = [group_id(f'PT-{n}') for n in (11, 222, 1333)]
+    query = LESSONS_SQL + " WHERE l.group_id = ANY(%s) AND l.is_active = TRUE" + PARITY_SQL
+    assert_no_seq_scan(query + " ORDER BY l.group_id, l.day_of_week, l.lesson_number", (ids, 'odd'))
+
+
+def test_search():
+    """Поиск по справочникам выбирает занятия по индексам ID"""
+    pattern = '%Преподаватель 42%'
+    assert_no_seq_scan(SEARCH_SQL + SEARCH_GROUP_SQL, (pattern, pattern, pattern, 'PT-777'))
+    assert_no_seq_scan(SEARCH_SQL, ('%Предмет 299%', '%Предмет 299%', '%Предмет 299%'))
+
+
+TESTS = (
+    test_group_lookup,
+    test_day_schedule,
+    test_week_schedule,
+    test_batch_schedule,
+    test_search,
+)
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("ТЕСТ ПЛАНОВ ЗАПРОСОВ")
+    print("=" * 60)
+
+    try:
+        psycopg2.connect(**DB_CONFIG, connect_timeout=3).close()
+    except psycopg2.OperationalError as e:
+        print(f"PostgreSQL недоступен ({e}) - тест пропущен")
+        sys.exit(0)
+
+    failed = False
+    for test in TESTS:
+        try:
+            test()
+            print(f"✓ {test.__doc__}")
+        except AssertionError as e:
+            failed = True
+            print(f"[X] {test.__doc__}")
+            print(f"    {e}")
+
+    sys.exit(1 if failed else 0)
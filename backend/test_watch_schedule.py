@@ -0,0 +1,127 @@
+"""Тест наблюдения за папкой расписания (watch_schedule.DirectoryWatcher)
+
+Проверяет, что файл, записываемый частями, уходит на разбор один раз после
+тишины, а файлы без изменений содержимого и файлы блокировки Excel не разбираются.
+Загрузка в БД заменена записью списка файлов. Запуск: python test_watch_schedule.py
+"""
+import os
+import sys
+import io
+import shutil
+import tempfile
+import threading
+import time
+
+# Исправление кодировки для Windows
+if sys.platform == 'win32':
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+
+from watch_schedule import DirectoryWatcher
+
+DEBOUNCE = 0.3
+
+
+def start_watcher(directory, poll):
+    """Наблюдение в фоновом потоке; возвращает (watcher, поток, список разобранных пакетов)"""
+    batches = []
+
+    def ingest(files, store):
+        batches.append(sorted(p.name for p in files))
+        return {'results': [{'file': p.name, 'success': True} for p in files]}
+
+    watcher = DirectoryWatcher(directory, ingest=ingest, debounce=DEBOUNCE, poll=poll,
+                               poll_interval=0.05, log=lambda message: None)
+    thread = threading.Thread(target=watcher.run, daemon=True)
+    thread.start()
+    time.sleep(0.2)
+    return watcher, thread, batches
+
+
+def write_in_parts(path, parts, pause):
+    with open(path, 'wb') as f:
+        for part in parts:
+            f.write(part)
+            f.flush()
+            time.sleep(pause)
+
+
+def check_watcher(poll):
+    directory = tempfile.mkdtemp(prefix='watch-')
+    try:
+        watcher, thread, batches = start_watcher(directory, poll)
+
+        # Запись частями с паузами меньше debounce - один разбор после тишины
+        write_in_parts(os.path.join(directory, 'p-1 (01.09.25).xlsx'), [b'a' * 100] * 4, DEBOUNCE / 3)
+        with open(os.path.join(directory, '~$p-1 (01.09.25).xlsx'), 'wb') as f:
+            f.write(b'lock')
+        time.sleep(DEBOUNCE * 3)
+        assert batches == [['p-1 (01.09.25).xlsx']], batches
+
+        # Перезапись тем же содержимым - не разбирается
+        write_in_parts(os.path.join(directory, 'p-1 (01.09.25).xlsx'), [b'a' * 400], 0)
+        time.sleep(DEBOUNCE * 3)
+        assert len(batches) == 1, batches
+
+        # Новое содержимое - разбирается
+        write_in_parts(os.path.join(directory, 'p-1 (01.09.25).xlsx'), [b'b' * 400], 0)
+        time.sleep(DEBOUNCE * 3)
+        assert batches[1:] == [['p-1 (01.09.25).xlsx']], batches
+
+        watcher.stop()
+        thread.join(timeout=5)
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def test_watch_polling():
+    """Опрос папки: тишина перед разбором, только изменившееся содержимое"""
+    check_watcher(poll=True)
+
+
+def test_watch_inotify():
+    """inotify (Linux): тишина перед разбором, только изменившееся содержимое"""
+    if not sys.platform.startswith('linux'):
+        return
+    check_watcher(poll=False)
+
+
+def test_initial_scan_uses_state():
+    """При запуске разбираются только файлы, изменившиеся с прошлой успешной загрузки"""
+    directory = tempfile.mkdtemp(prefix='watch-')
+    try:
+        for name, content in (('p-1.xlsx', b'one'), ('e-2.xlsx', b'two')):
+            with open(os.path.join(directory, name), 'wb') as f:
+                f.write(content)
+        batches = []
+
+        def ingest(files, store):
+            batches.append(sorted(p.name for p in files))
+            return {'results': [{'file': p.name, 'success': p.name != 'e-2.xlsx'} for p in files]}
+
+        DirectoryWatcher(directory, ingest=ingest, log=lambda message: None).initial_scan()
+        DirectoryWatcher(directory, ingest=ingest, log=lambda message: None).initial_scan()
+        # e-2 не загрузился - повторяется, p-1 больше не разбирается
+        assert batches == [['e-2.xlsx', 'p-1.xlsx'], ['e-2.xlsx']], batches
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+TESTS = (test_watch_polling, test_watch_inotify, test_initial_scan_uses_state)
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("ТЕСТ НАБЛЮДЕНИЯ ЗА ПАПКОЙ")
+    print("=" * 60)
+
+    failed = False
+    for test in TESTS:
+        try:
+            test()
+            print(f"✓ {test.__doc__}")
+        except AssertionError as e:
+            failed = True
+            print(f"[X] {test.__doc__}")
+            print(f"    {e}")
+
+    sys.exit(1 if failed else 0)
@@ -45,7 +45,7 @@ try:
             ) as time,
             l.subject,
             l.week_parity
-        FROM lessons l
+        FROM lesson_details l
         LEFT JOIN bell_schedule bs ON l.lesson_number = bs.lesson_number
         WHERE l.group_id = %s
         ORDER BY l.day_of_week, l.lesson_number, l.week_parity
@@ -77,7 +77,7 @@ try:
     
     # Проверяем, что номера пар в диапазоне 1-7
     cur.execute("""
-        SELECT COUNT(*) FROM lessons
+        SELECT COUNT(*) FROM lesson_details
         WHERE group_id = %s AND (lesson_number < 1 OR lesson_number > 7)
     """, (group_id,))
     
@@ -89,7 +89,7 @@ try:
     
     # Проверяем, есть ли занятия без времени
     cur.execute("""
-        SELECT COUNT(*) FROM lessons l
+        SELECT COUNT(*) FROM lesson_details l
         LEFT JOIN bell_schedule bs ON l.lesson_number = bs.lesson_number
         WHERE l.group_id = %s AND bs.lesson_number IS NULL
     """, (group_id,))
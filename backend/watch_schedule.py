@@ -0,0 +1,317 @@
+"""
+Наблюдение за папкой с Excel файлами и загрузка изменившихся файлов в БД
+
+На Linux изменения приходят от ядра (inotify через ctypes), на остальных системах
+папка опрашивается раз в WATCH_POLL_INTERVAL секунд. Файл отправляется на разбор,
+когда по нему WATCH_DEBOUNCE_SECONDS не было событий (Excel и копирование пишут файл
+частями), и только если изменился его SHA-256 с прошлой успешной загрузки.
+
+Папка загрузчика (content_store) обрабатывается по манифесту: после каждой записи
+.manifest.json разбираются файлы из очереди хранилища (pending).
+
+Использование:
+    python watch_schedule.py --dir "D:\\Excel file" [--debounce 2] [--poll]
+"""
+import ctypes
+import ctypes.util
+import hashlib
+import json
+import os
+import select
+import struct
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Set
+
+from content_store import MANIFEST_NAME, ContentStore, is_content_store
+
+EXCEL_EXTENSIONS = ('.xlsx', '.xls')
+STATE_NAME = '.watch_state.json'
+
+# inotify(7)
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = 0o2000000
+WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+EVENT_HEADER = struct.Struct('iIII')
+
+
+class PollingBackend:
+    """Изменения папки по сравнению снимков (размер, время изменения)"""
+
+    def __init__(self, directory: Path, interval: float):
+        self.directory = directory
+        self.interval = interval
+        self._snapshot = self._scan()
+
+    def _scan(self) -> Dict[str, tuple]:
+        snapshot = {}
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                if entry.is_file():
+                    stat = entry.stat()
+                    snapshot[entry.name] = (stat.st_size, stat.st_mtime_ns)
+        return snapshot
+
+    def wait(self, timeout: float) -> Set[str]:
+        """Имена изменившихся файлов (ждет не дольше timeout)"""
+        time.sleep(min(timeout, self.interval))
+        snapshot = self._scan()
+        changed = {
+            name for name in snapshot.keys() | self._snapshot.keys()
+            if snapshot.get(name) != self._snapshot.get(name)
+        }
+        self._snapshot = snapshot
+        return changed
+
+    def close(self):
+        pass
+
+
+class InotifyBackend:
+    """События папки от ядра Linux (inotify)"""
+
+    def __init__(self, directory: Path):
+        self.directory = directory
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_init1')
+        if libc.inotify_add_watch(self.fd, os.fsencode(str(directory)), WATCH_MASK) < 0:
+            errno = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(errno, f'inotify_add_watch {directory}')
+        # При переполнении очереди ядра список событий неполный - сверяемся со снимком
+        self._fallback = PollingBackend(directory, 0)
+
+    def wait(self, timeout: float) -> Set[str]:
+        """Имена изменившихся файлов (ждет не дольше timeout)"""
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        if not readable:
+            return set()
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return set()
+
+        changed, offset, overflow = set(), 0, False
+        while offset + EVENT_HEADER.size <= len(data):
+            _, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size
+            name = data[offset:offset + length].rstrip(b'\0')
+            offset += length
+            if mask & IN_Q_OVERFLOW:
+                overflow = True
+            elif name:
+                changed.add(os.fsdecode(name))
+        if overflow:
+            changed |= self._fallback.wait(0)
+        return changed
+
+    def close(self):
+        os.close(self.fd)
+
+
+def create_backend(directory: Path, poll: bool = False, interval: float = 1.0):
+    """inotify на Linux, иначе (или при ошибке) - опрос папки"""
+    if not poll and sys.platform.startswith('linux'):
+        try:
+            return InotifyBackend(directory)
+        except (OSError, AttributeError) as e:
+            print(f"⚠ inotify недоступен ({e}), используется опрос папки")
+    return PollingBackend(directory, interval)
+
+
+def file_sha256(path: Path) -> str:
+    hasher = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+def run_pipeline(files: List[Path], store: Optional[ContentStore]) -> Dict:
+    """Загрузка файлов через конвейер разбора и записи в БД"""
+    from pipeline import IngestPipeline, format_report
+
+    # Процессы разбора окупаются только на нескольких файлах
+    report = IngestPipeline(store=store, processes=len(files) > 1).run(files=files)
+    print(format_report(report))
+    return report
+
+
+class DirectoryWatcher:
+    """Наблюдение за папкой расписания"""
+
+    def __init__(
+        self,
+        directory: str,
+        ingest: Callable[[List[Path], Optional[ContentStore]], Dict] = run_pipeline,
+        debounce: Optional[float] = None,
+        poll: bool = False,
+        poll_interval: Optional[float] = None,
+        log: Callable[[str], None] = print
+    ):
+        """
+        Args:
+            directory: Папка с Excel файлами или папка загрузчика (content_store)
+            ingest: Загрузка файлов (files, store) -> отчет конвейера
+            debounce: Тишина по файлу перед разбором, секунд (WATCH_DEBOUNCE_SECONDS, по умолчанию 2)
+            poll: Опрашивать папку вместо inotify
+            poll_interval: Период опроса, секунд (WATCH_POLL_INTERVAL, по умолчанию 1)
+            log: Функция логирования
+        """
+        self.directory = Path(directory)
+        self.ingest = ingest
+        self.debounce = debounce if debounce is not None else float(os.getenv('WATCH_DEBOUNCE_SECONDS', '2'))
+        self.poll = poll
+        self.poll_interval = poll_interval or float(os.getenv('WATCH_POLL_INTERVAL', '1'))
+        self.log = log
+        self.store_mode = is_content_store(str(self.directory))
+        self.state_path = self.directory / STATE_NAME
+        self.state: Dict[str, str] = {}
+        if not self.store_mode and self.state_path.exists():
+            try:
+                self.state = json.loads(self.state_path.read_text(encoding='utf-8'))
+            except (OSError, ValueError):
+                self.state = {}
+        self._pending: Dict[str, float] = {}
+        self._stopped = False
+
+    @staticmethod
+    def is_schedule_file(name: str) -> bool:
+        # ~$file.xlsx - файл блокировки Excel, .name - служебные и временные файлы
+        return name.lower().endswith(EXCEL_EXTENSIONS) and not name.startswith(('~$', '.'))
+
+    def _relevant(self, name: str) -> bool:
+        if self.store_mode:
+            return name == MANIFEST_NAME
+        return self.is_schedule_file(name)
+
+    def _save_state(self):
+        tmp_path = self.state_path.with_suffix('.tmp')
+        tmp_path.write_text(json.dumps(self.state, ensure_ascii=False, indent=2), encoding='utf-8')
+        os.replace(tmp_path, self.state_path)
+
+    def changed_files(self, names: Iterable[str]) -> Dict[Path, str]:
+        """Файлы, содержимое которых отличается от последней успешной загрузки: {путь: sha256}"""
+        files = {}
+        for name in sorted(names):
+            path = self.directory / name
+            try:
+                sha256 = file_sha256(path)
+            except OSError:
+                # Файл удален или переименован, пока ждали тишины
+                self.state.pop(name, None)
+                continue
+            if self.state.get(name) != sha256:
+                files[path] = sha256
+        return files
+
+    def process(self, names: Iterable[str]) -> Optional[Dict]:
+        """Загружает изменившиеся файлы (или очередь хранилища в папке загрузчика)"""
+        if self.store_mode:
+            store = ContentStore(str(self.directory))
+            pending = store.pending()
+            if not pending:
+                return None
+            self.log(f"Изменился манифест хранилища: файлов к разбору {len(pending)}")
+            return self.ingest([], store)
+
+        files = self.changed_files(names)
+        if not files:
+            return None
+        self.log(f"Изменились файлы: {', '.join(p.name for p in files)}")
+        report = self.ingest(list(files), None)
+        hashes = {path.name: sha256 for path, sha256 in files.items()}
+        for result in report.get('results', []):
+            if result.get('success') and result['file'] in hashes:
+                self.state[result['file']] = hashes[result['file']]
+        self._save_state()
+        return report
+
+    def initial_scan(self) -> Optional[Dict]:
+        """Файлы, изменившиеся, пока наблюдение не работало"""
+        if self.store_mode:
+            return self.process([])
+        names = [p.name for p in self.directory.iterdir() if p.is_file() and self.is_schedule_file(p.name)]
+        return self.process(names)
+
+    def stop(self):
+        self._stopped = True
+
+    def run(self, max_seconds: Optional[float] = None):
+        """
+        Наблюдает за папкой до stop() (или max_seconds)
+
+        События копятся по имени файла; файл уходит на разбор, когда по нему
+        debounce секунд не было событий.
+        """
+        backend = create_backend(self.directory, self.poll, self.poll_interval)
+        started = time.monotonic()
+        self.log(f"Наблюдение за {self.directory} ({type(backend).__name__}, тишина {self.debounce} с)")
+        try:
+            self.initial_scan()
+            while not self._stopped:
+                if max_seconds is not None and time.monotonic() - started >= max_seconds:
+                    break
+                # Ждем до ближайшего момента, когда какой-то файл "затихнет"
+                now = time.monotonic()
+                timeout = min(
+                    [self.debounce] + [max(0.05, t + self.debounce - now) for t in self._pending.values()]
+                )
+                events = backend.wait(timeout)
+                now = time.monotonic()
+                for name in events:
+                    if self._relevant(name):
+                        self._pending[name] = now
+
+                ready = [name for name, last in self._pending.items() if now - last >= self.debounce]
+                for name in ready:
+                    del self._pending[name]
+                if ready:
+                    try:
+                        self.process(ready)
+                    except Exception as e:
+                        # Наблюдение не прерывается: файлы будут разобраны при следующем изменении
+                        self.log(f"✗ Ошибка загрузки: {e}")
+        finally:
+            backend.close()
+
+
+def main():
+    """Главная функция"""
+    import argparse
+
+    # Исправление кодировки для Windows
+    if sys.platform == 'win32':
+        import io
+        sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+
+    parser = argparse.ArgumentParser(description='Наблюдение за папкой с расписанием и загрузка изменений в БД')
+    parser.add_argument('--dir', required=True, help='Папка с Excel файлами (или папка загрузчика)')
+    parser.add_argument('--debounce', type=float, default=None,
+                        help='Сколько секунд файл не должен меняться перед разбором (по умолчанию: WATCH_DEBOUNCE_SECONDS или 2)')
+    parser.add_argument('--poll', action='store_true', help='Опрашивать папку вместо inotify')
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.dir):
+        print(f"❌ Директория не существует: {args.dir}")
+        sys.exit(1)
+
+    watcher = DirectoryWatcher(args.dir, debounce=args.debounce, poll=args.poll)
+    try:
+        watcher.run()
+    except KeyboardInterrupt:
+        print("\nНаблюдение остановлено")
+
+
+if __name__ == '__main__':
+    main()